@@ -1,10 +1,19 @@
-from flask import Flask, request, render_template   # type: ignore
+from flask import Flask, Response, request, render_template, jsonify   # type: ignore
 from pydantic import BaseModel, conint, confloat    # type: ignore
-import pandas as pd                                 # type: ignore
-import joblib                                       # type: ignore
 import os
+import sys
+import hmac
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.inference import predict_records_cached, load_model as load_model_artifact, prepare_model, smoke_test, DEFAULT_THRESHOLD
+from src.batching import MicroBatcher
+from src.model_registry import ModelRegistry
+from src.memory_utils import memory_breakdown
+from src.prediction_cache import PredictionCache
+from src.metrics import metrics, instrument_flask, CONTENT_TYPE as METRICS_CONTENT_TYPE
+
 # ============================================================
 # KONFIG
 # ============================================================
@@ -13,11 +22,35 @@ MODEL_PATH = os.path.join(
     "models", "logisticregression_best_pipeline.joblib"
 )
 
+# Model lain (?model=xgbclassifier dsb.) diambil dari models/python-models
+SHARED_MODEL_DIR = os.environ.get(
+    "MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "models", "python-models")
+)
+MODEL_CACHE_SIZE = int(os.environ.get("MODEL_CACHE_SIZE", "2"))
+
+# Hot reload: polling file model tiap N detik (0 = mati) & token untuk /admin/reload
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Berbagi memori antar worker gunicorn: model di PRELOAD_MODELS di-load saat import
+# (di master jika preload_app aktif), MODEL_MMAP=1 -> joblib.load(..., mmap_mode='r')
+PRELOAD_MODELS = [m.strip() for m in os.environ.get("PRELOAD_MODELS", "").split(",") if m.strip()]
+MODEL_MMAP = os.environ.get("MODEL_MMAP", "0") == "1"
+
+# Cache hasil prediksi untuk input identik (0 = mati), TTL dalam detik (0 = tanpa TTL)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+
 FEATURE_NAMES = [
     "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
     "thalch", "exang", "oldpeak", "slope", "ca", "thal"
 ]
 
+# Micro-batching (opsional): gabungkan request bersamaan jadi satu predict_proba
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "5"))
+
 # ============================================================
 # VALIDASI INPUT
 # ============================================================
@@ -39,12 +72,40 @@ class HeartInput(BaseModel):
 # ============================================================
 # LOAD MODEL
 # ============================================================
-def load_model():
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"Model not found: {MODEL_PATH}")
-    return joblib.load(MODEL_PATH)
+if not os.path.exists(MODEL_PATH):
+    raise FileNotFoundError(f"Model not found: {MODEL_PATH}")
+
+# Model di-load saat pertama kali dipakai (lazy), app/models diprioritaskan
+registry = ModelRegistry(
+    [os.path.dirname(MODEL_PATH), SHARED_MODEL_DIR],
+    max_loaded=MODEL_CACHE_SIZE,
+    default="logisticregression",
+    loader=load_model_artifact,
+    prepare=prepare_model,
+    smoke_test=smoke_test,
+    watch_interval=MODEL_WATCH_INTERVAL,
+    mmap_mode="r" if MODEL_MMAP else None
+)
+registry.preload(PRELOAD_MODELS)
+
+def load_model(name=None):
+    return registry.get(name)
+
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_SIZE, ttl_s=PREDICTION_CACHE_TTL
+) if PREDICTION_CACHE_SIZE > 0 else None
+
+def predict_batch(records, model_name=None):
+    model, version = registry.get_versioned(model_name)
+    return predict_records_cached(
+        model, records, FEATURE_NAMES, prediction_cache, version, threshold=DEFAULT_THRESHOLD
+    )
 
-model = load_model()
+batcher = MicroBatcher(
+    predict_batch,
+    max_batch_size=MICROBATCH_MAX_SIZE,
+    max_wait_ms=MICROBATCH_MAX_WAIT_MS
+) if MICROBATCH_ENABLED else None
 
 DISCLAIMER = "⚠️ This demo does not store patient data. Prediction results are not a medical diagnosis."
 
@@ -66,6 +127,8 @@ DISPLAY_MAP = {
 # FLASK APP
 # ============================================================
 app = Flask(__name__)
+# Histogram per tahap + counter request/error, dibaca lewat GET /metrics
+instrument_flask(app)
 
 @app.route("/")
 def index():
@@ -76,30 +139,34 @@ def predict():
     try:
         form_data = request.form.to_dict()
 
-        # langsung cast ke int/float
-        input_dict = {
-            "age": int(form_data["age"]),
-            "sex": int(form_data["sex"]),
-            "cp": int(form_data["cp"]),
-            "trestbps": int(form_data["trestbps"]),
-            "chol": int(form_data["chol"]),
-            "fbs": int(form_data["fbs"]),
-            "restecg": int(form_data["restecg"]),
-            "thalch": int(form_data["thalch"]),
-            "exang": int(form_data["exang"]),
-            "oldpeak": float(form_data["oldpeak"]),
-            "slope": int(form_data["slope"]),
-            "ca": int(form_data["ca"]),
-            "thal": int(form_data["thal"]),
-        }
-
-        # Validasi
-        HeartInput(**input_dict)
+        with metrics.stage("validation"):
+            # langsung cast ke int/float
+            input_dict = {
+                "age": int(form_data["age"]),
+                "sex": int(form_data["sex"]),
+                "cp": int(form_data["cp"]),
+                "trestbps": int(form_data["trestbps"]),
+                "chol": int(form_data["chol"]),
+                "fbs": int(form_data["fbs"]),
+                "restecg": int(form_data["restecg"]),
+                "thalch": int(form_data["thalch"]),
+                "exang": int(form_data["exang"]),
+                "oldpeak": float(form_data["oldpeak"]),
+                "slope": int(form_data["slope"]),
+                "ca": int(form_data["ca"]),
+                "thal": int(form_data["thal"]),
+            }
+
+            # Validasi
+            HeartInput(**input_dict)
 
         # Prediksi
-        df = pd.DataFrame([input_dict], columns=FEATURE_NAMES)
-        pred = model.predict(df)[0]
-        prob = model.predict_proba(df)[0] if hasattr(model, "predict_proba") else None
+        model_name = request.args.get("model") or form_data.get("model") or None
+        if batcher is not None and model_name in (None, registry.default):
+            pred, prob = batcher.predict(input_dict)
+        else:
+            preds, probs = predict_batch([input_dict], model_name)
+            pred, prob = preds[0], probs[0]
 
         # buat display-friendly
         form_display = {}
@@ -109,17 +176,19 @@ def predict():
             else:
                 form_display[k] = v
 
-        return render_template(
-            "result.html",
-            prediction=int(pred),
-            probability=prob.tolist() if prob is not None else None,
-            disclaimer=DISCLAIMER,
-            form_data=form_display,  # kirim yg sudah readable
-            feature_names=FEATURE_NAMES,
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        )
+        with metrics.stage("render"):
+            return render_template(
+                "result.html",
+                prediction=int(pred),
+                probability=prob.tolist(),
+                disclaimer=DISCLAIMER,
+                form_data=form_display,  # kirim yg sudah readable
+                feature_names=FEATURE_NAMES,
+                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            )
 
     except Exception as e:
+        metrics.count_error("/predict-form", type(e).__name__)
         return render_template(
             "result.html",
             error=str(e),
@@ -129,5 +198,45 @@ def predict():
             timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
 
+@app.route("/models")
+def list_models():
+    return jsonify({"default": registry.default, "models": registry.stats()})
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    token = request.headers.get("X-Admin-Token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+
+    model_name = request.args.get("model") or registry.default
+    try:
+        stats = registry.reload(model_name)
+    except KeyError as e:
+        return jsonify({"error": str(e.args[0])}), 404
+    except Exception as e:
+        # Model lama tetap dipakai
+        return jsonify({"reloaded": False, "model": model_name, "error": str(e)}), 500
+    return jsonify({"reloaded": True, "model": model_name, **stats})
+
+@app.route("/stats/memory")
+def memory_stats():
+    return jsonify({"pid": os.getpid(), "loaded_models": registry.loaded(), **memory_breakdown()})
+
+@app.route("/stats/cache")
+def cache_stats():
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **prediction_cache.stats()})
+
+@app.route("/stats/batching")
+def batching_stats():
+    if batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **batcher.stats()})
+
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(registry), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,64 @@
+# benchmarks/bench_data_cache.py
+"""
+Benchmark load dataset: pd.read_csv vs read_dataset (cache Parquet/Feather).
+
+Contoh (dari root repo):
+    python benchmarks/bench_data_cache.py
+    python benchmarks/bench_data_cache.py --scale 2000 --repeat 5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import pandas as pd # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_cache import read_dataset, build_cache, CACHE_FORMATS
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "heart_disease_uci_cleaned.csv")
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs cache kolumnar.")
+    parser.add_argument("--scale", type=int, default=1000, help="Salinan dataset (299 baris x scale)")
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="bench_data_cache_")
+    try:
+        csv_path = os.path.join(workdir, "data.csv")
+        pd.concat([pd.read_csv(DATA_PATH)] * args.scale, ignore_index=True).to_csv(csv_path, index=False)
+        print(f"{args.scale * 299:,} baris, CSV {os.path.getsize(csv_path) / 1e6:.1f} MB")
+
+        baseline, csv_s = timed(lambda: pd.read_csv(csv_path), args.repeat)
+        csv_mb = baseline.memory_usage(deep=True).sum() / 1e6
+        print(f"{'read_csv':<18}: {csv_s:6.3f} s | {csv_mb:7.1f} MB di memori")
+        for fmt in CACHE_FORMATS:
+            build_cache(csv_path, fmt)
+            df, cache_s = timed(lambda: read_dataset(csv_path, fmt), args.repeat)
+            mb = df.memory_usage(deep=True).sum() / 1e6
+            pd.testing.assert_frame_equal(df.astype(baseline.dtypes.to_dict()), baseline)
+            print(f"{'cache ' + fmt:<18}: {cache_s:6.3f} s | {mb:7.1f} MB di memori | "
+                  f"speedup {csv_s / cache_s:4.1f}x (termasuk hash sumber)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
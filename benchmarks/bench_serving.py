@@ -0,0 +1,329 @@
+# benchmarks/bench_serving.py
+"""
+Benchmark serving: per artefak di models/python-models dan end-to-end lewat app.
+
+Per model (tiap model di subprocess sendiri agar load dingin & peak RSS terpisah):
+- load_s            : load_artifact + prepare_model (sesuai --mode / INFERENCE_MODE) di proses
+                      baru, termasuk import modul yang dipicu unpickle (sklearn, xgboost)
+- reload_s          : load kedua (import sudah hangat), murni deserialisasi + prepare
+- single_row        : latensi predict_records 1 record (p50/p99/mean, ms)
+- batch             : throughput predict_proba DataFrame per ukuran batch (baris/detik)
+- rss_load_bytes    : kenaikan RSS setelah load, peak_rss_bytes: puncak RSS proses
+Per app (test client in-process, juga di subprocess):
+- startup_s / first_request_ms : import modul app & request pertama (model di-load lazy)
+- flask   : POST /predict-form (app/app.py)
+- fastapi : POST /diagnose & /diagnose/batch (src/api_doc.py)
+
+Hasil ditulis sebagai JSON (--output). Dengan --compare baseline.json setiap metrik
+dibandingkan dengan baseline; perubahan lebih buruk dari --tolerance dilaporkan sebagai
+regresi dan exit code 1.
+
+Contoh (dari root repo):
+    python benchmarks/bench_serving.py --output baseline.json
+    python benchmarks/bench_serving.py --models logisticregression svc --quick
+    INFERENCE_MODE=onnx python benchmarks/bench_serving.py --compare baseline.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+
+import numpy as np # type: ignore
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+MODEL_DIR = os.path.join(ROOT_DIR, "models", "python-models")
+DATA_PATH = os.path.join(ROOT_DIR, "data", "test-data", "X_test_raw.csv")
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+QUICK_BATCH_SIZES = [1, 100, 10_000]
+APPS = ("flask", "fastapi")
+
+# Record valid untuk skema input app (nilai kode integer)
+APP_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 1,
+    "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+
+# ============================================================
+# STATISTIK
+# ============================================================
+def latency_stats(samples_s) -> dict:
+    samples_ms = np.asarray(samples_s) * 1e3
+    return {
+        "p50_ms": float(np.percentile(samples_ms, 50)), "p99_ms": float(np.percentile(samples_ms, 99)),
+        "mean_ms": float(samples_ms.mean()), "n": int(len(samples_ms)),
+    }
+
+
+def time_calls(fn, n: int, warmup: int = 5) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return latency_stats(samples)
+
+
+def throughput(fn, n_rows: int, min_time_s: float) -> dict:
+    """Ulang fn sampai min_time_s terlewati (minimal 1x), return baris/detik."""
+    fn()
+    calls, started = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time_s:
+            break
+    return {"rows_per_s": n_rows * calls / elapsed, "calls": calls, "seconds_per_call": elapsed / calls}
+
+
+# ============================================================
+# WORKER (jalan di subprocess)
+# ============================================================
+def bench_model(model_path: str, batch_sizes, n_single: int, min_time_s: float) -> dict:
+    import pandas as pd # type: ignore
+    from src.model_registry import load_artifact
+    from src.inference import prepare_model, predict_records, predict_with_proba, FEATURE_NAMES
+    from src.memory_utils import current_rss_bytes, peak_rss_bytes
+
+    X = pd.read_csv(DATA_PATH)
+    records = X.astype(object).where(X.notna(), None).to_dict("records")
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    model = prepare_model(load_artifact(model_path), path=model_path)
+    load_s = time.perf_counter() - started
+    rss_after = current_rss_bytes()
+    started = time.perf_counter()
+    prepare_model(load_artifact(model_path), path=model_path)
+    reload_s = time.perf_counter() - started
+
+    i = iter(range(1 << 62))
+    single = time_calls(lambda: predict_records(model, [records[next(i) % len(records)]], FEATURE_NAMES), n_single)
+    batch = {}
+    for size in batch_sizes:
+        frame = X.iloc[np.arange(size) % len(X)].reset_index(drop=True)
+        batch[str(size)] = throughput(lambda: predict_with_proba(model, frame), size, min_time_s)
+    return {
+        "backend": type(model).__name__, "load_s": load_s, "reload_s": reload_s,
+        "rss_load_bytes": (rss_after - rss_before) if rss_before and rss_after else None,
+        "single_row": single, "batch": batch, "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def bench_app(name: str, n_requests: int, batch_records: int) -> dict:
+    from src.memory_utils import peak_rss_bytes
+    started = time.perf_counter()
+    results = {}
+    if name == "flask":
+        from app.app import app
+        startup_s = time.perf_counter() - started
+        client = app.test_client()
+        form = {k: str(v) for k, v in APP_RECORD.items()}
+
+        def predict_form():
+            response = client.post("/predict-form", data=form)
+            if response.status_code != 200 or b"error" in response.data.lower():
+                raise RuntimeError(f"/predict-form gagal: {response.status_code}")
+        first = time.perf_counter()
+        predict_form()
+        results["first_request_ms"] = (time.perf_counter() - first) * 1e3
+        results["predict_form"] = time_calls(predict_form, n_requests)
+    else:
+        from fastapi.testclient import TestClient # type: ignore
+        from src.api_doc import app
+        startup_s = time.perf_counter() - started
+        client = TestClient(app)
+        body = {"features": APP_RECORD}
+        batch_body = {"records": [APP_RECORD] * batch_records}
+
+        def post(path, payload):
+            def call():
+                response = client.post(path, json=payload)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} gagal: {response.status_code} {response.text[:200]}")
+            return call
+        first = time.perf_counter()
+        post("/diagnose", body)()
+        results["first_request_ms"] = (time.perf_counter() - first) * 1e3
+        results["diagnose"] = time_calls(post("/diagnose", body), n_requests)
+        batch = time_calls(post("/diagnose/batch", batch_body), max(n_requests // 10, 5))
+        batch["rows_per_s"] = batch_records / (batch["mean_ms"] / 1e3)
+        results[f"diagnose_batch_{batch_records}"] = batch
+    return {"startup_s": startup_s, **results, "peak_rss_bytes": peak_rss_bytes()}
+
+
+def run_worker(kind: str, target: str, args) -> dict:
+    """Jalankan satu benchmark di subprocess baru, return dict hasil (JSON dari stdout)."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", kind, target,
+           "--n-single", str(args.n_single), "--min-time", str(args.min_time),
+           "--batch-sizes", *map(str, args.batch_sizes), "--batch-records", str(args.batch_records)]
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    if args.mode:
+        env["INFERENCE_MODE"] = args.mode
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=ROOT_DIR)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "exit code non-zero"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ============================================================
+# PERBANDINGAN BASELINE
+# ============================================================
+def flatten(results: dict, prefix: str = "") -> dict:
+    """{'models': {'svc': {'load_s': 1}}} -> {'models.svc.load_s': 1} (hanya angka)."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_s")
+
+
+def is_compared(metric: str) -> bool:
+    leaf = metric.rsplit(".", 1)[-1]
+    return leaf.endswith(("_ms", "_s", "_bytes", "_per_s")) and leaf != "seconds_per_call"
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> dict:
+    """
+    Bandingkan metrik yang ada di kedua hasil. Rasio > 1 berarti lebih buruk
+    (latensi/memori naik atau throughput turun); > 1 + tolerance = regresi.
+    """
+    now, base = flatten(current.get("results", current)), flatten(baseline.get("results", baseline))
+    rows = []
+    for metric in sorted(set(now) & set(base)):
+        if not is_compared(metric) or not base[metric] or not now[metric]:
+            continue
+        ratio = base[metric] / now[metric] if higher_is_better(metric) else now[metric] / base[metric]
+        status = "regression" if ratio > 1 + tolerance else "improved" if ratio < 1 / (1 + tolerance) else "ok"
+        rows.append({"metric": metric, "baseline": base[metric], "current": now[metric],
+                     "ratio": ratio, "status": status})
+    return {"tolerance": tolerance, "rows": rows,
+            "regressions": [r["metric"] for r in rows if r["status"] == "regression"]}
+
+
+def environment() -> dict:
+    import sklearn # type: ignore
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=ROOT_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"), "git_commit": commit,
+        "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+        "sklearn": sklearn.__version__, "numpy": np.__version__,
+        "inference_mode": os.environ.get("INFERENCE_MODE", "sklearn"),
+    }
+
+
+def print_summary(results: dict):
+    for name, r in results["models"].items():
+        if "error" in r:
+            print(f"{name:28s} GAGAL: {r['error']}")
+            continue
+        largest = max(r["batch"], key=int)
+        print(f"{name:28s} [{r['backend']}] load {r['load_s'] * 1e3:7.1f} ms (ulang "
+              f"{r['reload_s'] * 1e3:5.1f} ms) | 1 baris p50 "
+              f"{r['single_row']['p50_ms']:6.2f} ms p99 {r['single_row']['p99_ms']:6.2f} ms | "
+              f"batch {largest}: {r['batch'][largest]['rows_per_s']:>12,.0f} baris/s | "
+              f"peak RSS {(r['peak_rss_bytes'] or 0) / 1e6:6.1f} MB")
+    for name, r in results["apps"].items():
+        if "error" in r:
+            print(f"app {name:24s} GAGAL: {r['error']}")
+            continue
+        endpoints = {k: v for k, v in r.items() if isinstance(v, dict)}
+        parts = " | ".join(f"{k} p50 {v['p50_ms']:.2f} ms p99 {v['p99_ms']:.2f} ms" for k, v in endpoints.items())
+        print(f"app {name:24s} startup {r['startup_s']:.2f} s, request pertama "
+              f"{r['first_request_ms']:.0f} ms | {parts}")
+
+
+def print_comparison(report: dict):
+    for row in report["rows"]:
+        if row["status"] != "ok":
+            print(f"{row['status'].upper():10s} {row['metric']}: {row['baseline']:.4g} -> "
+                  f"{row['current']:.4g} (x{row['ratio']:.2f} lebih {'buruk' if row['ratio'] > 1 else 'baik'})")
+    print(f"{len(report['regressions'])} regresi dari {len(report['rows'])} metrik "
+          f"(toleransi {report['tolerance']:.0%})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark latensi/throughput model & app.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--models", nargs="+", default=None, help="Default: semua artefak di model-dir")
+    parser.add_argument("--apps", nargs="*", choices=APPS, default=list(APPS))
+    parser.add_argument("--mode", choices=["sklearn", "compiled", "onnx"], default=None,
+                        help="INFERENCE_MODE untuk semua worker (default: env)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--n-single", type=int, default=300, help="Jumlah panggilan untuk latensi 1 baris")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Durasi minimum per ukuran batch (detik)")
+    parser.add_argument("--batch-records", type=int, default=100, help="Record per request /diagnose/batch")
+    parser.add_argument("--quick", action="store_true", help="Batch lebih kecil & iterasi lebih sedikit")
+    parser.add_argument("--output", default=None, help="Simpan hasil ke file JSON")
+    parser.add_argument("--compare", default=None, help="File JSON baseline untuk deteksi regresi")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Batas perubahan relatif sebelum dianggap regresi")
+    parser.add_argument("--worker", nargs=2, metavar=("KIND", "TARGET"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        kind, target = args.worker
+        result = bench_model(target, args.batch_sizes, args.n_single, args.min_time) if kind == "model" \
+            else bench_app(target, args.n_single, args.batch_records)
+        print(json.dumps(result))
+        return result
+
+    if args.quick:
+        args.batch_sizes, args.n_single, args.min_time = QUICK_BATCH_SIZES, 100, 0.2
+
+    from src.model_registry import ARTIFACT_SUFFIX, model_name_from_path
+    paths = {model_name_from_path(f): os.path.join(args.model_dir, f)
+             for f in sorted(os.listdir(args.model_dir)) if f.endswith(ARTIFACT_SUFFIX)}
+    if args.models:
+        missing = [m for m in args.models if m not in paths]
+        if missing:
+            raise KeyError(f"Model tidak ditemukan di {args.model_dir}: {missing}")
+        paths = {m: paths[m] for m in args.models}
+
+    results = {
+        "models": {name: run_worker("model", path, args) for name, path in paths.items()},
+        "apps": {name: run_worker("app", name, args) for name in args.apps},
+    }
+    report = {"environment": environment(), "config": {
+        "batch_sizes": args.batch_sizes, "n_single": args.n_single, "min_time_s": args.min_time,
+        "batch_records": args.batch_records, "mode": args.mode}, "results": results}
+    if args.mode:
+        report["environment"]["inference_mode"] = args.mode
+    print_summary(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        print_comparison(report["comparison"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Hasil disimpan di {args.output}")
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
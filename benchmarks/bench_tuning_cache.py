@@ -0,0 +1,108 @@
+# benchmarks/bench_tuning_cache.py
+"""
+Benchmark tuning: GridSearchCV biasa vs FoldCachedSearchCV (preprocessor di-fit sekali per fold).
+
+Contoh (dari root repo):
+    python benchmarks/bench_tuning_cache.py
+    python benchmarks/bench_tuning_cache.py --scale 50 --n-jobs 1
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+
+from sklearn.model_selection import GridSearchCV # type: ignore
+from sklearn.pipeline import Pipeline # type: ignore
+from sklearn.compose import ColumnTransformer # type: ignore
+from sklearn.preprocessing import StandardScaler, OneHotEncoder # type: ignore
+from sklearn.impute import SimpleImputer # type: ignore
+from sklearn.linear_model import LogisticRegression # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.search import FoldCachedSearchCV
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "processed", "heart_disease_uci_cleaned.csv")
+
+NUM_COLS = ["age", "trestbps", "chol", "thalch", "oldpeak", "ca"]
+CAT_COLS = ["sex", "cp", "fbs", "restecg", "exang", "slope", "thal"]
+
+PARAM_GRID = {
+    "classifier__C": [0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30],
+    "classifier__class_weight": [None, "balanced"],
+}
+
+
+def build_preprocessor():
+    num_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="mean")),
+        ("scaler", StandardScaler())
+    ])
+    cat_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+    ])
+    return ColumnTransformer(transformers=[
+        ("num", num_transformer, NUM_COLS),
+        ("cat", cat_transformer, CAT_COLS)
+    ])
+
+
+def enlarge(df: pd.DataFrame, scale: int, random_state: int = 42) -> pd.DataFrame:
+    """Salinan sintetis: resample baris sebanyak `scale` kali + noise kecil pada kolom numerik."""
+    rng = np.random.default_rng(random_state)
+    big = df.sample(n=len(df) * scale, replace=True, random_state=random_state).reset_index(drop=True)
+    for col in NUM_COLS:
+        big[col] = big[col] + rng.normal(0, big[col].std() * 0.05, size=len(big))
+    return big
+
+
+def time_search(search_cls, X, y, cv: int, n_jobs: int):
+    pipe = Pipeline([("preprocessor", build_preprocessor()), ("classifier", LogisticRegression(max_iter=500))])
+    search = search_cls(pipe, PARAM_GRID, cv=cv, n_jobs=n_jobs)
+    started = time.perf_counter()
+    search.fit(X, y)
+    return time.perf_counter() - started, search.best_params_, search.best_score_
+
+
+def run(df: pd.DataFrame, label: str, cv: int, n_jobs: int) -> dict:
+    X = df.drop(columns=["num"])
+    y = df["num"]
+    plain_s, plain_params, plain_score = time_search(GridSearchCV, X, y, cv, n_jobs)
+    cached_s, cached_params, cached_score = time_search(FoldCachedSearchCV, X, y, cv, n_jobs)
+    if plain_params != cached_params or not np.isclose(plain_score, cached_score):
+        raise ValueError(f"Hasil tuning berbeda: {plain_params} vs {cached_params}")
+    result = {"dataset": label, "rows": len(df), "plain_s": plain_s, "cached_s": cached_s,
+              "speedup": plain_s / cached_s}
+    print(f"{label:<12} rows={len(df):>8,} | GridSearchCV {plain_s:7.2f} s | "
+          f"FoldCachedSearchCV {cached_s:7.2f} s | speedup {result['speedup']:.2f}x")
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cache preprocessor saat tuning.")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV hasil cleaning")
+    parser.add_argument("--scale", type=int, default=20, help="Faktor perbesaran dataset sintetis")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    df = pd.read_csv(args.data)
+    if "id" in df.columns:
+        df = df.drop(columns=["id"])
+    # SimpleImputer(most_frequent) butuh kolom object, bukan dtype string pandas
+    df[CAT_COLS] = df[CAT_COLS].astype(object)
+    n_candidates = len(PARAM_GRID["classifier__C"]) * len(PARAM_GRID["classifier__class_weight"])
+    print(f"{n_candidates} kandidat x {args.cv} fold, n_jobs={args.n_jobs}")
+    run(df, "original", args.cv, args.n_jobs)
+    run(enlarge(df, args.scale), f"x{args.scale}", args.cv, args.n_jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/load_test_api.py
+"""
+Load test src/api_doc.py: klien konkuren menembak POST /diagnose sambil health check
+GET / di-poll tiap --probe-ms. Dijalankan in-process (httpx.ASGITransport) pada satu
+event loop, sehingga inferensi yang memblok event loop langsung terlihat di latensi '/'.
+
+Setiap konfigurasi pool (INFERENCE_WORKERS/INFERENCE_MAX_QUEUE) x tingkat konkurensi
+dilaporkan: throughput, p50/p99 /diagnose (hanya 200), jumlah 503, p50/p99/max latensi '/'
+(dihitung dari jadwal probe sehingga event loop yang tertahan ikut terukur).
+workers=0 = perilaku lama (inferensi langsung di event loop).
+
+Contoh (dari root repo):
+    python benchmarks/load_test_api.py
+    python benchmarks/load_test_api.py --pools 0:0 4:32 2:2 --concurrency 1 8 64 --duration 3
+    python benchmarks/load_test_api.py --model xgbclassifier --output load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+import numpy as np # type: ignore
+import httpx # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import src.api_doc as api_doc
+from src.inference_pool import InferencePool
+
+
+def random_record(rng: random.Random) -> dict:
+    # Record berbeda tiap request agar cache prediksi (jika aktif) tidak membantu
+    return {
+        "age": rng.randint(30, 80), "sex": rng.randint(0, 1), "cp": rng.randint(0, 3),
+        "trestbps": rng.randint(100, 180), "chol": rng.randint(150, 400), "fbs": rng.randint(0, 1),
+        "restecg": rng.randint(0, 2), "thalch": rng.randint(90, 200), "exang": rng.randint(0, 1),
+        "oldpeak": round(rng.uniform(0, 4), 1), "slope": rng.randint(0, 2), "ca": rng.randint(0, 3),
+        "thal": rng.randint(0, 3),
+    }
+
+
+def percentiles(samples_s) -> dict:
+    if not samples_s:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    ms = np.asarray(samples_s) * 1e3
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max())}
+
+
+async def run_load(client, concurrency: int, duration_s: float, probe_ms: float, model: str) -> dict:
+    deadline = time.perf_counter() + duration_s
+    latencies, statuses, health = [], {}, []
+    params = {"model": model} if model else None
+
+    async def user(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.post("/diagnose", json={"features": random_record(rng)}, params=params)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 503:
+                # Klien yang sopan menunggu sebentar (di sini dipersingkat) sebelum mencoba lagi
+                await asyncio.sleep(0.01)
+
+    async def prober():
+        # Latensi dihitung dari jadwal kirim, bukan saat coroutine sempat jalan: jika event
+        # loop tertahan inferensi, keterlambatan itu ikut terukur (seperti timeout health check)
+        scheduled = time.perf_counter()
+        while scheduled < deadline:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await client.get("/")
+            finished = time.perf_counter()
+            health.append(finished - scheduled)
+            scheduled += probe_ms / 1e3
+            while scheduled < finished:
+                # Probe yang terlewat selama loop tertahan tetap dihitung terlambat
+                health.append(finished - scheduled)
+                scheduled += probe_ms / 1e3
+
+    started = time.perf_counter()
+    await asyncio.gather(prober(), *(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = statuses.get(200, 0)
+    return {
+        "concurrency": concurrency, "requests": sum(statuses.values()), "ok": ok,
+        "rejected_503": statuses.get(503, 0), "statuses": {str(k): v for k, v in statuses.items()},
+        "throughput_per_s": ok / elapsed, "diagnose": percentiles(latencies), "health": percentiles(health),
+        "health_probes": len(health),
+    }
+
+
+async def run_all(args) -> list:
+    results = []
+    transport = httpx.ASGITransport(app=api_doc.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+        # Warm-up: load model sebelum pengukuran
+        api_doc.inference_pool = InferencePool(workers=0)
+        await client.post("/diagnose", json={"features": random_record(random.Random(0))},
+                          params={"model": args.model} if args.model else None)
+        for spec in args.pools:
+            workers, max_queue = (int(v) for v in spec.split(":"))
+            for concurrency in args.concurrency:
+                api_doc.inference_pool = InferencePool(workers=workers, max_queue=max_queue)
+                result = await run_load(client, concurrency, args.duration, args.probe_ms, args.model)
+                api_doc.inference_pool.shutdown()
+                results.append({"workers": workers, "max_queue": max_queue, **result})
+                print(f"workers={workers:<2d} queue={max_queue:<3d} c={concurrency:<3d} "
+                      f"{result['throughput_per_s']:7.1f} req/s | /diagnose p50 {result['diagnose']['p50_ms']:7.1f} ms "
+                      f"p99 {result['diagnose']['p99_ms']:7.1f} ms | 503: {result['rejected_503']:<5d} | "
+                      f"'/' p50 {result['health']['p50_ms']:6.1f} ms p99 {result['health']['p99_ms']:6.1f} ms "
+                      f"max {result['health']['max_ms']:6.1f} ms")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test FastAPI /diagnose + responsivitas health check.")
+    parser.add_argument("--pools", nargs="+", default=["0:0", "4:32", "2:2"],
+                        help="Konfigurasi pool 'workers:max_queue' (0:0 = inferensi di event loop)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=3.0, help="Durasi per konfigurasi (detik)")
+    parser.add_argument("--probe-ms", type=float, default=50.0, help="Interval health check GET /")
+    parser.add_argument("--model", default=None, help="Nama model (?model=), default model API")
+    parser.add_argument("--output", default=None, help="Simpan hasil ke file JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run_all(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+        print(f"Hasil disimpan di {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# benchmarks/startup_profile.py
+"""
+Laporan cold start per entry point: berapa lama proses baru siap melayani prediksi.
+
+Tiap entry point x INFERENCE_MODE dijalankan di subprocess baru dengan `python -X importtime`
+(diulang --repeat kali, dilaporkan median):
+- import_s            : import modul entry point (app/app.py, src/api_doc.py, main.py)
+- first_prediction_s  : request/prediksi pertama setelah import, termasuk load model lazy
+                        (import sklearn/scipy/pandas lewat unpickle, atau onnxruntime)
+- ready_s             : import_s + first_prediction_s
+- heavy_at_import     : modul berat (HEAVY_MODULES) yang sudah ter-import setelah import entry point
+- breakdown           : waktu import (self time, ms) per paket top-level, untuk fase import
+                        dan fase prediksi pertama, diurutkan dari yang terbesar
+
+Budget (BUDGET, bisa diganti lewat flag) diperiksa untuk setiap baris; pelanggaran dicetak
+dan exit code 1, sehingga skrip bisa dipakai sebagai gate di CI/deploy.
+Entry point yang dependensinya tidak terpasang (mis. streamlit untuk main.py) dilewati.
+
+Contoh (dari root repo):
+    python benchmarks/startup_profile.py
+    python benchmarks/startup_profile.py --entries fastapi --modes onnx --repeat 5 --output startup.json
+    python benchmarks/startup_profile.py --budget-import 0.8 --budget-first onnx=0.2
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import importlib.util
+
+import numpy as np # type: ignore
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT_DIR)
+
+# Entry point -> (modul, paket yang wajib terpasang)
+ENTRIES = {
+    "flask": ("app.app", "flask"),
+    "fastapi": ("src.api_doc", "fastapi"),
+    "streamlit": ("main", "streamlit"),
+}
+MODES = ("sklearn", "onnx")
+# Tidak boleh ter-import hanya karena entry point di-import; baru saat model di-load
+HEAVY_MODULES = ("sklearn", "scipy", "pandas", "xgboost", "joblib", "onnxruntime")
+# Target cold start (detik). first_prediction per mode: sklearn wajib unpickle + import
+# sklearn/scipy/pandas (~1.5 s di 1 core), onnx hanya onnxruntime + sesi ONNX
+BUDGET = {
+    "import_s": 1.0,
+    "first_prediction_s": {"sklearn": 3.0, "onnx": 0.5, "compiled": 3.0},
+}
+
+PHASE_MARKER = "--- phase: "
+
+APP_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 1,
+    "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+
+# ============================================================
+# WORKER (jalan di subprocess dengan -X importtime)
+# ============================================================
+def _first_prediction(entry: str, module):
+    """Callable request/prediksi pertama lewat jalur yang dipakai entry point (client disiapkan dulu)."""
+    if entry == "flask":
+        client = module.app.test_client()
+        form = {k: str(v) for k, v in APP_RECORD.items()}
+
+        def call():
+            response = client.post("/predict-form", data=form)
+            if response.status_code != 200 or b"error" in response.data.lower():
+                raise RuntimeError(f"/predict-form gagal: {response.status_code}")
+        return call
+    if entry == "fastapi":
+        from fastapi.testclient import TestClient # type: ignore
+        client = TestClient(module.app)
+
+        def call():
+            response = client.post("/diagnose", json={"features": APP_RECORD})
+            if response.status_code != 200:
+                raise RuntimeError(f"/diagnose gagal: {response.status_code} {response.text[:200]}")
+        return call
+    from src.inference import predict_records_cached
+
+    def call():
+        model, version = module.registry.get_versioned()
+        predict_records_cached(model, [APP_RECORD], module.FEATURE_NAMES, module.prediction_cache, version)
+    return call
+
+
+def profile_entry(entry: str) -> dict:
+    import importlib
+    started = time.perf_counter()
+    module = importlib.import_module(ENTRIES[entry][0])
+    import_s = time.perf_counter() - started
+    heavy = [m for m in HEAVY_MODULES if m in sys.modules]
+    # Penanda di stderr memisahkan output -X importtime per fase; client test bukan bagian
+    # dari cold start produksi sehingga import-nya tidak diukur
+    print(f"{PHASE_MARKER}client", file=sys.stderr, flush=True)
+    call = _first_prediction(entry, module)
+    print(f"{PHASE_MARKER}first_prediction", file=sys.stderr, flush=True)
+    started = time.perf_counter()
+    call()
+    first_s = time.perf_counter() - started
+    return {"import_s": import_s, "first_prediction_s": first_s,
+            "backend": type(module.registry.get()).__name__, "heavy_at_import": heavy}
+
+
+# ============================================================
+# BREAKDOWN -X importtime
+# ============================================================
+def parse_importtime(stderr: str) -> dict:
+    """
+    Self time import (ms) per paket top-level, dipisah per fase: {'import': {...}, 'first_prediction': {...}}.
+    Baris -X importtime: 'import time: <self us> | <cumulative us> | <indent><modul>'.
+    """
+    phases = {"import": {}, "client": {}, "first_prediction": {}}
+    phase = phases["import"]
+    for line in stderr.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = phases[line[len(PHASE_MARKER):].strip()]
+            continue
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        package = name.strip().split(".")[0]
+        phase[package] = phase.get(package, 0.0) + int(self_us) / 1e3
+    return {k: dict(sorted(phases[k].items(), key=lambda kv: -kv[1])) for k in ("import", "first_prediction")}
+
+
+def run_worker(entry: str, mode: str) -> dict:
+    """Satu cold start di subprocess baru, return dict hasil + breakdown import."""
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--worker", entry]
+    env = {**os.environ, "PYTHONWARNINGS": "ignore", "INFERENCE_MODE": mode}
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=ROOT_DIR)
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines()
+                  if not line.startswith(("import time:", PHASE_MARKER))]
+        return {"error": errors[-1] if errors else "exit code non-zero"}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["breakdown"] = parse_importtime(proc.stderr)
+    return result
+
+
+def profile(entry: str, mode: str, repeat: int) -> dict:
+    runs = [run_worker(entry, mode) for _ in range(repeat)]
+    failed = [r for r in runs if "error" in r]
+    if failed:
+        return failed[0]
+    result = {key: float(np.median([r[key] for r in runs])) for key in ("import_s", "first_prediction_s")}
+    result["ready_s"] = result["import_s"] + result["first_prediction_s"]
+    # Breakdown & modul berat diambil dari run dengan ready_s median
+    median_run = sorted(runs, key=lambda r: r["import_s"] + r["first_prediction_s"])[len(runs) // 2]
+    result.update({"backend": median_run["backend"], "heavy_at_import": median_run["heavy_at_import"],
+                   "breakdown": median_run["breakdown"], "runs": len(runs)})
+    return result
+
+
+# ============================================================
+# BUDGET
+# ============================================================
+def check_budget(results: dict, budget: dict) -> list:
+    """Return list pelanggaran budget (string) untuk semua entry point x mode."""
+    violations = []
+    for entry, per_mode in results.items():
+        for mode, r in per_mode.items():
+            label = f"{entry}/{mode}"
+            if "error" in r:
+                violations.append(f"{label}: gagal ({r['error']})")
+                continue
+            if r["import_s"] > budget["import_s"]:
+                violations.append(f"{label}: import {r['import_s']:.2f} s > budget {budget['import_s']:.2f} s")
+            limit = budget["first_prediction_s"].get(mode)
+            if limit is not None and r["first_prediction_s"] > limit:
+                violations.append(f"{label}: prediksi pertama {r['first_prediction_s']:.2f} s > budget {limit:.2f} s")
+            if r["heavy_at_import"]:
+                violations.append(f"{label}: modul berat ter-import saat import entry point: {r['heavy_at_import']}")
+    return violations
+
+
+def print_report(results: dict, top: int):
+    for entry, per_mode in results.items():
+        for mode, r in per_mode.items():
+            if "error" in r:
+                print(f"{entry:9s} {mode:8s} GAGAL: {r['error']}")
+                continue
+            print(f"{entry:9s} {mode:8s} import {r['import_s']:.3f} s | prediksi pertama "
+                  f"{r['first_prediction_s']:.3f} s [{r['backend']}] | siap {r['ready_s']:.3f} s")
+            for phase, packages in r["breakdown"].items():
+                parts = ", ".join(f"{name} {ms:.0f}" for name, ms in list(packages.items())[:top])
+                print(f"    {phase:17s} ms: {parts}")
+
+
+def _mode_budget(values) -> dict:
+    budget = dict(BUDGET["first_prediction_s"])
+    for value in values or []:
+        mode, _, seconds = value.partition("=")
+        if not seconds:
+            raise ValueError(f"Format --budget-first harus MODE=DETIK, bukan '{value}'")
+        budget[mode] = float(seconds)
+    return budget
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Profil cold start entry point (import + prediksi pertama).")
+    parser.add_argument("--entries", nargs="+", choices=list(ENTRIES), default=list(ENTRIES))
+    parser.add_argument("--modes", nargs="+", choices=["sklearn", "compiled", "onnx"], default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah cold start per kombinasi (median)")
+    parser.add_argument("--top", type=int, default=8, help="Jumlah paket teratas di breakdown")
+    parser.add_argument("--budget-import", type=float, default=BUDGET["import_s"],
+                        help="Budget import entry point (detik)")
+    parser.add_argument("--budget-first", nargs="+", default=None, metavar="MODE=DETIK",
+                        help="Budget prediksi pertama per mode, mis. onnx=0.3")
+    parser.add_argument("--output", default=None, help="Simpan hasil ke file JSON")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        result = profile_entry(args.worker)
+        print(json.dumps(result))
+        return result
+
+    budget = {"import_s": args.budget_import, "first_prediction_s": _mode_budget(args.budget_first)}
+    results = {}
+    for entry in args.entries:
+        module_name, requirement = ENTRIES[entry]
+        if importlib.util.find_spec(requirement) is None:
+            print(f"{entry:9s} dilewati: paket '{requirement}' tidak terpasang")
+            continue
+        results[entry] = {mode: profile(entry, mode, args.repeat) for mode in args.modes}
+    print_report(results, args.top)
+
+    violations = check_budget(results, budget)
+    for violation in violations:
+        print(f"MELEBIHI BUDGET {violation}")
+    print(f"{len(violations)} pelanggaran budget (import {budget['import_s']:.2f} s, prediksi pertama "
+          + ", ".join(f"{m} {s:.2f} s" for m, s in budget["first_prediction_s"].items() if m in args.modes) + ")")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budget": budget, "results": results, "violations": violations}, f, indent=2)
+        print(f"Hasil disimpan di {args.output}")
+    if violations:
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
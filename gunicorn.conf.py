@@ -0,0 +1,39 @@
+# gunicorn.conf.py (otomatis dibaca gunicorn dari direktori kerja)
+import gc
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from src.memory_utils import memory_breakdown, format_bytes
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+
+# Import app (dan model di PRELOAD_MODELS) sekali di master sebelum fork,
+# sehingga worker berbagi halaman memori model secara copy-on-write
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def _log_memory(log, label):
+    mem = memory_breakdown()
+    log.info(
+        "[memory] %s pid=%s rss=%s pss=%s shared=%s private=%s", label, os.getpid(),
+        format_bytes(mem.get("rss")), format_bytes(mem.get("pss")),
+        format_bytes(mem.get("shared")), format_bytes(mem.get("private"))
+    )
+
+
+def when_ready(server):
+    if preload_app:
+        # Bekukan objek yang sudah ada agar GC di worker tidak menyentuh (dan menyalin) halamannya
+        gc.freeze()
+    _log_memory(server.log, "master ready")
+
+
+def post_fork(server, worker):
+    _log_memory(server.log, f"worker {worker.pid} after fork")
+
+
+def post_worker_init(worker):
+    _log_memory(worker.log, f"worker {worker.pid} after init")
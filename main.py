@@ -1,14 +1,18 @@
 # app_streamlit.py
 import streamlit as st # type: ignore
-import pandas as pd    # type: ignore
-import joblib          # type: ignore
 import os
 from pydantic import BaseModel, conint, confloat, ValidationError # type: ignore
 
+from src.inference import predict_records_cached, load_model, prepare_model, DEFAULT_THRESHOLD
+from src.model_registry import ModelRegistry
+from src.prediction_cache import PredictionCache
+from src.metrics import metrics, start_metrics_server
+
 # ============================================================
 # KONFIGURASI
 # ============================================================
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "models/python-models", "logisticregression_best_pipeline.joblib")
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "models/python-models")
+MODEL_PATH = os.path.join(MODEL_DIR, "logisticregression_best_pipeline.joblib")
 
 FEATURE_NAMES = [
     "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
@@ -37,13 +41,31 @@ class HeartInput(BaseModel):
 # LOAD MODEL
 # ============================================================
 @st.cache_resource
-def load_model():
+def load_registry():
     if not os.path.exists(MODEL_PATH):
         st.error(f"Model file not found: {MODEL_PATH}")
         return None
-    return joblib.load(MODEL_PATH)
+    # Model di-load saat dipilih, bukan semuanya di awal
+    return ModelRegistry(MODEL_DIR, max_loaded=2, default="logisticregression",
+                         loader=load_model, prepare=prepare_model)
+
+registry = load_registry()
 
-model = load_model()
+@st.cache_resource
+def load_prediction_cache():
+    # Tombol contoh kasus sering mengirim input yang sama persis
+    size = int(os.environ.get("PREDICTION_CACHE_SIZE", "1000"))
+    return PredictionCache(size, ttl_s=float(os.environ.get("PREDICTION_CACHE_TTL", "0"))) if size > 0 else None
+
+prediction_cache = load_prediction_cache()
+
+@st.cache_resource
+def load_metrics_server():
+    # Streamlit tidak punya router sendiri: /metrics dilayani di port terpisah (0 = mati)
+    port = int(os.environ.get("METRICS_PORT", "0"))
+    return start_metrics_server(port, registry) if port > 0 else None
+
+load_metrics_server()
 
 # ============================================================
 # MAPPING UNTUK INPUT USER-FRIENDLY
@@ -120,6 +142,12 @@ def main():
             "thal": "Normal"
         }
     
+    model_names = registry.available() if registry is not None else []
+    model_name = st.sidebar.selectbox(
+        "Model", model_names,
+        index=model_names.index("logisticregression") if "logisticregression" in model_names else 0
+    )
+
     st.title("Prediksi Penyakit Jantung ❤️")
     st.markdown("Aplikasi ini memprediksi kemungkinan penyakit jantung berdasarkan parameter medis.")
     
@@ -214,16 +242,23 @@ def main():
                 
                 # Validasi input
                 try:
-                    heart_input = HeartInput(**input_dict)
+                    with metrics.stage("validation"):
+                        heart_input = HeartInput(**input_dict)
                 except ValidationError as e:
+                    metrics.count_request("predict", "invalid")
+                    metrics.count_error("predict", type(e).__name__)
                     st.error(f"Error validasi input: {e}")
                     return
                 
                 # Prediksi
                 try:
-                    df = pd.DataFrame([input_dict], columns=FEATURE_NAMES)
-                    prediction = model.predict(df)[0]
-                    probability = model.predict_proba(df)[0] if hasattr(model, "predict_proba") else None
+                    model, version = registry.get_versioned(model_name)
+                    predictions, probabilities = predict_records_cached(
+                        model, [input_dict], FEATURE_NAMES, prediction_cache, version,
+                        threshold=DEFAULT_THRESHOLD
+                    )
+                    prediction, probability = predictions[0], probabilities[0]
+                    metrics.count_request("predict", "ok")
                     
                     # Tampilkan hasil
                     st.subheader("Hasil Prediksi")
@@ -246,6 +281,8 @@ def main():
                         st.progress(probability[1], text="Tingkat Risiko Penyakit Jantung")
                     
                 except Exception as e:
+                    metrics.count_request("predict", "error")
+                    metrics.count_error("predict", type(e).__name__)
                     st.error(f"Error dalam prediksi: {e}")
     
     with tab2:
@@ -1,10 +1,25 @@
 import os
-import joblib # type: ignore
-import pandas as pd # type: ignore
+import sys
+import hmac
+import math
+import time
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException # type: ignore
-from pydantic import BaseModel, conint, confloat # type: ignore
+from fastapi import FastAPI, Header, HTTPException, Query, Request # type: ignore
+from fastapi.exceptions import RequestValidationError # type: ignore
+from fastapi.exception_handlers import request_validation_exception_handler # type: ignore
+from fastapi.responses import PlainTextResponse # type: ignore
+from fastapi.concurrency import run_in_threadpool # type: ignore
+from pydantic import BaseModel, ValidationError, conint, confloat # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.inference import predict_records_cached, load_model, prepare_model, smoke_test, DEFAULT_THRESHOLD
+from src.model_registry import ModelRegistry
+from src.prediction_cache import PredictionCache
+from src.metrics import metrics, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.inference_pool import QueueFullError, pool_from_env
 
 # ============================================================
 # APP CONFIG
@@ -28,17 +43,101 @@ app = FastAPI(
         "name": "MIT",
     }
 )
+# Batas jumlah record per request /diagnose/batch
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "1000"))
+# Batas ukuran body (bytes) dicek sebelum JSON di-parse; default ~2 KB per record batch
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", str(MAX_BATCH_SIZE * 2048)))
+
+
+class BodySizeLimitMiddleware:
+    """
+    Tolak body lebih besar dari max_bytes dengan 413 sebelum FastAPI mem-parse & memvalidasi
+    seluruh payload. Content-Length dicek di depan; body tanpa Content-Length (chunked)
+    dihitung saat dibaca. max_bytes=0 mematikan batas.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_BODY_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_bytes:
+            await self.app(scope, receive, send)
+            return
+        detail = f"Body request melebihi batas {self.max_bytes} bytes"
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            from fastapi.responses import JSONResponse # type: ignore
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Diubah menjadi response 413 oleh exception handler FastAPI
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app.add_middleware(BodySizeLimitMiddleware)
+# Histogram per tahap + counter request/error, dibaca lewat GET /metrics
+# (ditambahkan terakhir = paling luar, sehingga 413 dari batas body ikut tercatat)
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(RequestValidationError)
+async def count_validation_error(request: Request, exc: RequestValidationError):
+    # Body tidak valid (422) ditangani FastAPI sebelum handler, catat di sini
+    metrics.count_error(getattr(request.scope.get("route"), "path", "unmatched"), type(exc).__name__)
+    return await request_validation_exception_handler(request, exc)
 
 # ============================================================
 # LOAD MODEL
 # ============================================================
-MODEL_PATH = os.path.join("../models/python-models", "logisticregression_best_pipeline.joblib")
+MODEL_DIR = os.environ.get(
+    "MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "models", "python-models")
+)
+DEFAULT_MODEL = os.environ.get("DEFAULT_MODEL", "logisticregression")
+MODEL_PATH = os.path.join(MODEL_DIR, f"{DEFAULT_MODEL}_best_pipeline.joblib")
 
-try:
-    model = joblib.load(MODEL_PATH)
-except Exception:
+if not os.path.exists(MODEL_PATH):
     raise RuntimeError(f"Model file not found at {MODEL_PATH}")
 
+# Model di-load saat pertama kali dipakai, maksimal MODEL_CACHE_SIZE model di memori.
+# File model yang diganti di-load ulang di background (MODEL_WATCH_INTERVAL detik, 0 = mati)
+registry = ModelRegistry(
+    MODEL_DIR,
+    max_loaded=int(os.environ.get("MODEL_CACHE_SIZE", "2")),
+    default=DEFAULT_MODEL,
+    loader=load_model,
+    prepare=prepare_model,
+    smoke_test=smoke_test,
+    watch_interval=float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+)
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Cache hasil prediksi untuk input identik (PREDICTION_CACHE_SIZE=0 -> mati)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_SIZE, ttl_s=float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Inferensi CPU-bound dijalankan di thread pool terbatas agar event loop tidak tertahan.
+# INFERENCE_WORKERS (0 = langsung di event loop), INFERENCE_MAX_QUEUE: antrian maksimum
+# sebelum request ditolak 503 + Retry-After (INFERENCE_RETRY_AFTER detik)
+inference_pool = pool_from_env()
+
+FEATURE_NAMES = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+    "thalch", "exang", "oldpeak", "slope", "ca", "thal"
+]
+
 # ============================================================
 # SCHEMA DEFINITIONS
 # ============================================================
@@ -86,6 +185,21 @@ class DiagnosisResult(BaseModel):
     timestamp: str
     notes: str = "Consult with a cardiologist for complete evaluation"
 
+class BatchPatientData(BaseModel):
+    # Record divalidasi satu per satu agar error tidak menggagalkan seluruh batch
+    records: List[Dict[str, Any]]
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[DiagnosisResult] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+class BatchDiagnosisResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
 # ============================================================
 # LABELS
 # ============================================================
@@ -94,6 +208,59 @@ DIAGNOSIS_LABELS = {
     1: {"diagnosis": "Coronary Artery Disease Detected", "risk_level": "High Risk"}
 }
 
+# ============================================================
+# HELPERS
+# ============================================================
+def build_result(prediction, proba, timestamp: str) -> DiagnosisResult:
+    return DiagnosisResult(
+        **DIAGNOSIS_LABELS[int(prediction)],
+        probability={"healthy": round(float(proba[0]), 4),
+                    "disease": round(float(proba[1]), 4)},
+        timestamp=timestamp
+    )
+
+def get_model(name: Optional[str] = None):
+    try:
+        return registry.get_versioned(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+def predict_rows(rows: List[Dict[str, Any]], model_name: Optional[str] = None):
+    """Load model (jika belum) + prediksi; dijalankan di inference_pool, bukan di event loop."""
+    model, version = get_model(model_name)
+    return predict_records_cached(
+        model, rows, FEATURE_NAMES, prediction_cache, version, threshold=DEFAULT_THRESHOLD
+    )
+
+async def run_inference(rows: List[Dict[str, Any]], model_name: Optional[str], endpoint: str):
+    """predict_rows lewat inference_pool: 503 + Retry-After jika antrian penuh, 500 jika prediksi gagal."""
+    try:
+        return await inference_pool.run(predict_rows, rows, model_name)
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        metrics.count_error(endpoint, type(e).__name__)
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after_s)))})
+    except Exception as e:
+        metrics.count_error(endpoint, type(e).__name__)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def observe_validation(request: Request):
+    """
+    Tahap 'validation' = awal request (middleware) s.d. handler: parsing body JSON +
+    validasi pydantic yang dijalankan FastAPI sebelum handler dipanggil.
+    """
+    started = getattr(request.state, "metrics_started", None)
+    if started is not None:
+        metrics.observe("validation", time.perf_counter() - started)
+
+def format_validation_errors(error: ValidationError) -> List[Dict[str, Any]]:
+    return [
+        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+        for err in error.errors()
+    ]
+
 # ============================================================
 # ROUTES
 # ============================================================
@@ -106,24 +273,101 @@ async def root():
         "redoc_url": "/redoc"
     }
 
+@app.get("/models", tags=["Health Check"])
+async def list_models():
+    """Daftar model yang tersedia beserta status load, waktu load & memori."""
+    return {"default": registry.default, "models": registry.stats()}
+
+@app.get("/stats/cache", tags=["Health Check"])
+async def cache_stats():
+    """Statistik cache prediksi (hit rate, ukuran, eviction)."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/metrics", tags=["Health Check"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Histogram durasi per tahap, jumlah request & error, model ter-load (format Prometheus)."""
+    return PlainTextResponse(metrics.render(registry), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/stats/pool", tags=["Health Check"])
+async def pool_stats():
+    """Status thread pool inferensi: jumlah berjalan/antri, selesai, ditolak (503)."""
+    return inference_pool.stats()
+
+@app.post("/admin/reload", tags=["Admin"])
+async def admin_reload(
+    model_name: Optional[str] = Query(None, alias="model"),
+    x_admin_token: str = Header("")
+):
+    """
+    Load ulang model dari disk, smoke test, lalu tukar tanpa restart.  
+    Butuh header `X-Admin-Token` sesuai env `ADMIN_TOKEN`.
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    model_name = model_name or registry.default
+    try:
+        # Unpickle + smoke test memblok; jalankan di threadpool agar request lain tetap dilayani
+        stats = await run_in_threadpool(registry.reload, model_name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        # Model lama tetap dipakai
+        raise HTTPException(status_code=500, detail=f"Reload gagal, model lama tetap dipakai: {e}")
+    return {"reloaded": True, "model": model_name, **stats}
+
 @app.post("/diagnose", response_model=DiagnosisResult, tags=["Prediction"])
-async def diagnose(patient: PatientData):
+async def diagnose(patient: PatientData, request: Request,
+                   model_name: Optional[str] = Query(None, alias="model")):
     """
     Prediksi penyakit jantung berdasarkan parameter klinis pasien.  
     Hasil berupa **diagnosis awal** + **tingkat risiko** + **probabilitas**.
     """
+    observe_validation(request)
+    predictions, probas = await run_inference([patient.features.dict()], model_name, "/diagnose")
+    with metrics.stage("render"):
+        return build_result(predictions[0], probas[0], datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    try:
-        input_data = pd.DataFrame([patient.features.dict()])
-        prediction = model.predict(input_data)[0]
-        proba = model.predict_proba(input_data)[0]
-
-        return DiagnosisResult(
-            **DIAGNOSIS_LABELS[int(prediction)],
-            probability={"healthy": round(float(proba[0]), 4),
-                        "disease": round(float(proba[1]), 4)},
-            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+@app.post("/diagnose/batch", response_model=BatchDiagnosisResult, tags=["Prediction"])
+async def diagnose_batch(batch: BatchPatientData, request: Request,
+                         model_name: Optional[str] = Query(None, alias="model")):
+    """
+    Prediksi banyak pasien sekaligus dalam satu panggilan `predict_proba`.  
+    Hasil dan error validasi dikembalikan per record, **urutannya sama dengan input**.
+    """
+    n_records = len(batch.records)
+    if n_records == 0:
+        raise HTTPException(status_code=400, detail="records tidak boleh kosong")
+    if n_records > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Jumlah record ({n_records}) melebihi batas {MAX_BATCH_SIZE}"
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Validasi per record, simpan yang valid untuk diprediksi bersamaan
+    items: List[Optional[BatchItemResult]] = [None] * n_records
+    valid_index, valid_rows = [], []
+    for i, record in enumerate(batch.records):
+        try:
+            valid_rows.append(Features(**record).dict())
+            valid_index.append(i)
+        except ValidationError as e:
+            items[i] = BatchItemResult(index=i, errors=format_validation_errors(e))
+    observe_validation(request)
+
+    if valid_rows:
+        predictions, probas = await run_inference(valid_rows, model_name, "/diagnose/batch")
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with metrics.stage("render"):
+            for i, prediction, proba in zip(valid_index, predictions, probas):
+                items[i] = BatchItemResult(index=i, result=build_result(prediction, proba, timestamp))
+
+    return BatchDiagnosisResult(
+        total=n_records,
+        succeeded=len(valid_index),
+        failed=n_records - len(valid_index),
+        results=items
+    )
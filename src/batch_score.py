@@ -0,0 +1,434 @@
+# src/batch_score.py
+"""
+Skoring massal (streaming) untuk arsip data pasien.
+
+Contoh:
+    python src/batch_score.py data/raw/heart_disease_uci.csv -o data/processed/new_data_predictions.csv
+    python src/batch_score.py arsip.jsonl --model xgbclassifier --chunksize 100000
+    python src/batch_score.py arsip.parquet -o hasil.parquet
+    python src/batch_score.py arsip.csv --workers 8
+    python src/batch_score.py arsip.csv --id-column id --keep-columns dataset
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.inference import predict_with_proba, DEFAULT_THRESHOLD
+from src.model_registry import load_artifact
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODEL_DIR = os.path.join(ROOT_DIR, "models", "python-models")
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "data", "processed", "new_data_predictions.csv")
+DEFAULT_CHUNKSIZE = 50_000
+
+
+# ============================================================
+# MODEL & KOLOM
+# ============================================================
+def resolve_model_path(model: str) -> str:
+    """Terima path file .joblib atau nama model di models/python-models."""
+    if os.path.exists(model):
+        return model
+    path = os.path.join(MODEL_DIR, f"{model}_best_pipeline.joblib")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model tidak ditemukan: {model}")
+    return path
+
+
+def expected_columns(model) -> list:
+    """Kolom input yang dipakai step 'preprocessor' saat fit (urutan sesuai fit)."""
+    pre = model.named_steps.get('preprocessor', None)
+    if pre is None:
+        raise ValueError("Model tidak punya step 'preprocessor'. Pastikan model adalah pipeline lengkap.")
+
+    columns = []
+    for name, trans, cols in pre.transformers_:
+        if isinstance(cols, (list, tuple)):
+            columns.extend(list(cols))
+    return columns
+
+
+def align_to_preprocessor_columns(model, df):
+    """
+    Pastikan df punya kolom persis seperti yang dipakai preprocessor saat fit.
+    Kolom yang hilang akan ditambah dengan NaN (nanti di-impute oleh pipeline).
+    Urutan kolom juga disamakan.
+    """
+    return df.reindex(columns=expected_columns(model))
+
+
+class ColumnAligner:
+    """
+    Versi streaming dari align_to_preprocessor_columns: daftar kolom model dan
+    rencana penyesuaian dihitung sekali per schema input, bukan per chunk.
+    """
+
+    def __init__(self, model):
+        self.columns = expected_columns(model)
+        self._schema = None
+        self._missing = []
+
+    def __call__(self, df):
+        schema = tuple(df.columns)
+        if schema != self._schema:
+            self._schema = schema
+            self._missing = [c for c in self.columns if c not in schema]
+            if self._missing:
+                print(f"Kolom tidak ada di input, diisi NaN (di-impute pipeline): {self._missing}", file=sys.stderr)
+        if not self._missing and schema == tuple(self.columns):
+            return df
+        return df.reindex(columns=self.columns)
+
+
+# ============================================================
+# READER (chunk)
+# ============================================================
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    formats = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json",
+               ".parquet": "parquet", ".pq": "parquet"}
+    if ext not in formats:
+        raise ValueError(f"Format file tidak didukung: {path}")
+    return formats[ext]
+
+
+def iter_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE, fmt: str = None):
+    """Baca input per chunk (DataFrame) agar memori tetap terbatas."""
+    fmt = fmt or detect_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    elif fmt == "json":
+        # JSON array (seperti sample_test_data.json) tidak bisa di-stream
+        with open(path, "r") as f:
+            df = pd.DataFrame(json.load(f))
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq # type: ignore
+        except ImportError:
+            raise ImportError("Input parquet butuh paket 'pyarrow' (pip install pyarrow).")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Format tidak dikenal: {fmt}")
+
+
+# ============================================================
+# WRITER (incremental)
+# ============================================================
+class PredictionWriter:
+    """Tulis hasil per chunk ke CSV / JSONL / Parquet, atau stdout jika path '-'."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fmt = "csv" if path == "-" else detect_format(path)
+        self._started = False
+        self._parquet = None
+        if path != "-" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(self, df):
+        if self.fmt == "csv":
+            target = sys.stdout if self.path == "-" else self.path
+            df.to_csv(target, index=False, header=not self._started, mode="a" if self._started else "w")
+        elif self.fmt == "jsonl":
+            with open(self.path, "a" if self._started else "w") as f:
+                df.to_json(f, orient="records", lines=True)
+        elif self.fmt == "parquet":
+            import pyarrow as pa # type: ignore
+            import pyarrow.parquet as pq # type: ignore
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            raise ValueError(f"Format output tidak didukung: {self.fmt}")
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+# ============================================================
+# SKORING
+# ============================================================
+def score_frame(model, df, align, threshold: float = DEFAULT_THRESHOLD, keep_columns=()):
+    """
+    Skor satu chunk: return DataFrame kolom keep_columns (mis. id, agar hasil bisa di-join
+    ke file sumber) + fitur + prediction + probability.
+    """
+    X = align(df)
+    labels, proba = predict_with_proba(model, X, threshold)
+    out = X.copy()
+    passthrough = [c for c in keep_columns if c not in out.columns]
+    missing = [c for c in passthrough if c not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom --keep-columns tidak ada di input: {missing}")
+    for position, col in enumerate(passthrough):
+        out.insert(position, col, df[col].to_numpy())
+    out["prediction"] = labels
+    out["probability"] = proba[:, 1]
+    return out
+
+
+def score_stream(model, chunks, writer, threshold: float = DEFAULT_THRESHOLD,
+                 progress_every: float = 5.0, log=sys.stderr, keep_columns=()):
+    """
+    Skor semua chunk secara berurutan dan tulis hasilnya bertahap.
+    Return ringkasan {rows, seconds, rows_per_sec}.
+    """
+    align = ColumnAligner(model)
+    started = last_report = time.perf_counter()
+    rows = 0
+    for chunk in chunks:
+        writer.write(score_frame(model, chunk, align, threshold, keep_columns))
+        rows += len(chunk)
+        now = time.perf_counter()
+        if log is not None and now - last_report >= progress_every:
+            print(f"[batch-score] {rows:,} baris, {rows / (now - started):,.0f} baris/detik", file=log)
+            last_report = now
+    writer.close()
+    seconds = time.perf_counter() - started
+    summary = {"rows": rows, "seconds": round(seconds, 3),
+               "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else float(rows)}
+    if log is not None:
+        print(f"[batch-score] selesai: {rows:,} baris dalam {seconds:.2f} detik "
+              f"({summary['rows_per_sec']:,.0f} baris/detik)", file=log)
+    return summary
+
+
+# ============================================================
+# PARALEL (multi-proses, input di-shard)
+# ============================================================
+def plan_byte_shards(path: str, n_shards: int):
+    """
+    Bagi file teks (CSV/JSONL) menjadi rentang byte. Return (header, [(start, end), ...]).
+    Setiap shard memiliki baris yang byte pertamanya ada di [start, end).
+    Catatan: CSV dengan newline di dalam field ber-quote tidak didukung.
+    """
+    fmt = detect_format(path)
+    with open(path, "rb") as f:
+        header = f.readline() if fmt == "csv" else b""
+        data_start = f.tell()
+    size = os.path.getsize(path)
+    n_shards = max(1, min(n_shards, size - data_start))
+    step = (size - data_start) / n_shards
+    bounds = [data_start + int(round(i * step)) for i in range(n_shards)] + [size]
+    return header, [(bounds[i], bounds[i + 1]) for i in range(n_shards) if bounds[i] < bounds[i + 1]]
+
+
+def iter_byte_range_chunks(path: str, start: int, end: int, header: bytes,
+                           chunksize: int = DEFAULT_CHUNKSIZE, fmt: str = None):
+    """Baca baris dalam rentang byte [start, end) per chunk DataFrame."""
+    fmt = fmt or detect_format(path)
+
+    def parse(lines):
+        buffer = io.BytesIO(header + b"".join(lines))
+        if fmt == "csv":
+            return pd.read_csv(buffer)
+        return pd.read_json(buffer, lines=True)
+
+    with open(path, "rb") as f:
+        # Mundur 1 byte: jika start tepat di awal baris, readline hanya membaca '\n'
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()
+        lines = []
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                lines.append(line)
+            if len(lines) >= chunksize:
+                yield parse(lines)
+                lines = []
+        if lines:
+            yield parse(lines)
+
+
+def plan_shards(path: str, n_shards: int, fmt: str = None) -> list:
+    """Daftar spesifikasi shard (dict) sesuai format input."""
+    fmt = fmt or detect_format(path)
+    if fmt in ("csv", "jsonl"):
+        header, ranges = plan_byte_shards(path, n_shards)
+        return [{"fmt": fmt, "path": path, "header": header, "start": start, "end": end}
+                for start, end in ranges]
+    if fmt == "parquet":
+        import pyarrow.parquet as pq # type: ignore
+        n_groups = pq.ParquetFile(path).num_row_groups
+        per_shard = max(1, -(-n_groups // max(1, n_shards)))
+        groups = [list(range(i, min(i + per_shard, n_groups))) for i in range(0, n_groups, per_shard)]
+        return [{"fmt": fmt, "path": path, "row_groups": g} for g in groups]
+    raise ValueError(f"Format '{fmt}' tidak bisa di-shard, gunakan --workers 1")
+
+
+def iter_shard_chunks(shard: dict, chunksize: int):
+    if shard["fmt"] == "parquet":
+        import pyarrow.parquet as pq # type: ignore
+        for batch in pq.ParquetFile(shard["path"]).iter_batches(batch_size=chunksize, row_groups=shard["row_groups"]):
+            yield batch.to_pandas()
+    else:
+        yield from iter_byte_range_chunks(
+            shard["path"], shard["start"], shard["end"], shard["header"], chunksize, shard["fmt"]
+        )
+
+
+_worker_model = None
+
+
+def _init_worker(model_path: str):
+    """Load pipeline sekali per proses worker, batasi thread BLAS/OpenMP agar core tidak oversubscribe."""
+    global _worker_model
+    try:
+        from threadpoolctl import threadpool_limits # type: ignore
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    _worker_model = load_artifact(model_path)
+    classifier = getattr(_worker_model, "named_steps", {}).get("classifier")
+    if classifier is not None and "n_jobs" in classifier.get_params():
+        classifier.set_params(n_jobs=1)
+
+
+def _score_shard(index: int, shard: dict, part_path: str, chunksize: int, threshold: float,
+                 keep_columns=()):
+    started = time.perf_counter()
+    summary = score_stream(_worker_model, iter_shard_chunks(shard, chunksize),
+                           PredictionWriter(part_path), threshold, log=None, keep_columns=keep_columns)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return index, summary
+
+
+def merge_parts(part_paths: list, output: str):
+    """Gabungkan file part sesuai urutan shard (header CSV hanya dari part pertama)."""
+    fmt = "csv" if output == "-" else detect_format(output)
+    if output != "-" and os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    if fmt == "parquet":
+        import pyarrow as pa # type: ignore
+        import pyarrow.parquet as pq # type: ignore
+        writer = None
+        for part in part_paths:
+            if not os.path.exists(part):
+                continue
+            for batch in pq.ParquetFile(part).iter_batches():
+                table = pa.Table.from_batches([batch])
+                if writer is None:
+                    writer = pq.ParquetWriter(output, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+        return
+
+    target = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        header_written = False
+        for part in part_paths:
+            if not os.path.exists(part):
+                continue
+            with open(part, "rb") as f:
+                if fmt == "csv":
+                    header = f.readline()
+                    if not header_written:
+                        target.write(header)
+                        header_written = True
+                shutil.copyfileobj(f, target)
+    finally:
+        if target is not sys.stdout.buffer:
+            target.close()
+
+
+def score_parallel(model_path: str, input_path: str, output: str, workers: int,
+                   chunksize: int = DEFAULT_CHUNKSIZE, threshold: float = DEFAULT_THRESHOLD,
+                   fmt: str = None, shards_per_worker: int = 4, log=sys.stderr, keep_columns=()):
+    """
+    Skor file besar dengan process pool: input dibagi menjadi shard (rentang byte untuk
+    CSV/JSONL, row group untuk Parquet), tiap worker load pipeline sekali, hasil tiap
+    shard ditulis ke file part lalu digabung sesuai urutan input.
+    """
+    shards = plan_shards(input_path, workers * shards_per_worker, fmt)
+    out_fmt = "csv" if output == "-" else detect_format(output)
+    tmp_dir = tempfile.mkdtemp(prefix="batch-score-", dir=os.path.dirname(os.path.abspath(output)) if output != "-" else None)
+    part_paths = [os.path.join(tmp_dir, f"part-{i:05d}.{out_fmt}") for i in range(len(shards))]
+
+    started = time.perf_counter()
+    rows = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            futures = [pool.submit(_score_shard, i, shard, part_paths[i], chunksize, threshold, keep_columns)
+                       for i, shard in enumerate(shards)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                _, summary = future.result()
+                rows += summary["rows"]
+                if log is not None:
+                    elapsed = time.perf_counter() - started
+                    print(f"[batch-score] shard {done}/{len(shards)} selesai, {rows:,} baris, "
+                          f"{rows / elapsed:,.0f} baris/detik", file=log)
+        merge_parts(part_paths, output)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    seconds = time.perf_counter() - started
+    summary = {"rows": rows, "seconds": round(seconds, 3), "workers": workers, "shards": len(shards),
+               "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else float(rows)}
+    if log is not None:
+        print(f"[batch-score] selesai: {rows:,} baris dalam {seconds:.2f} detik "
+              f"({summary['rows_per_sec']:,.0f} baris/detik, {workers} worker)", file=log)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Skoring massal data pasien secara streaming.")
+    parser.add_argument("input", help="File input (.csv, .jsonl, .json, .parquet)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT,
+                        help="File output (.csv, .jsonl, .parquet) atau '-' untuk stdout")
+    parser.add_argument("-m", "--model", default="logisticregression",
+                        help="Nama model di models/python-models atau path .joblib")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Jumlah baris per chunk")
+    parser.add_argument("--format", choices=["csv", "jsonl", "json", "parquet"], default=None,
+                        help="Paksa format input (default: dari ekstensi)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Threshold probabilitas kelas positif")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Interval laporan progres (detik)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses paralel (input di-shard, hasil digabung sesuai urutan)")
+    parser.add_argument("--id-column", default=None,
+                        help="Kolom id yang disalin ke output (kolom pertama) untuk join ke file sumber")
+    parser.add_argument("--keep-columns", nargs="+", default=[],
+                        help="Kolom input lain (non-fitur) yang disalin apa adanya ke output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_path = resolve_model_path(args.model)
+    fmt = args.format or detect_format(args.input)
+    keep_columns = list(dict.fromkeys(([args.id_column] if args.id_column else []) + args.keep_columns))
+    if args.workers > 1 and fmt != "json":
+        return score_parallel(model_path, args.input, args.output, args.workers,
+                              args.chunksize, args.threshold, fmt, keep_columns=keep_columns)
+
+    model = load_artifact(model_path)
+    chunks = iter_chunks(args.input, args.chunksize, args.format)
+    return score_stream(model, chunks, PredictionWriter(args.output), args.threshold, args.progress_every,
+                        keep_columns=keep_columns)
+
+
+if __name__ == "__main__":
+    main()
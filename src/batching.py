@@ -0,0 +1,105 @@
+# src/batching.py
+import threading
+import time
+import queue
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Gabungkan request prediksi yang datang bersamaan menjadi satu batch.
+    Request menunggu maksimal `max_wait_ms` atau sampai `max_batch_size` terkumpul,
+    lalu semua diprediksi dengan satu panggilan `predict_fn(records)`.
+
+    predict_fn menerima list of dict dan mengembalikan (labels, probas).
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size minimal 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stats = {"requests": 0, "batches": 0, "errors": 0,
+                       "max_batch_size_seen": 0, "total_wait_s": 0.0}
+        self._histogram = {}
+
+    # Thread dibuat saat submit pertama (aman untuk fork gunicorn)
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, record) -> Future:
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((record, future, time.perf_counter()))
+        return future
+
+    def predict(self, record, timeout: float = None):
+        """Submit satu record dan tunggu hasilnya. Return (label, proba)."""
+        return self.submit(record).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            records = [record for record, _, _ in batch]
+            try:
+                labels, probas = self.predict_fn(records)
+                for i, (_, future, _) in enumerate(batch):
+                    future.set_result((labels[i], probas[i]))
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._record(batch, started)
+
+    def _record(self, batch, started):
+        size = len(batch)
+        with self._lock:
+            self._stats["requests"] += size
+            self._stats["batches"] += 1
+            self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], size)
+            self._stats["total_wait_s"] += sum(started - enqueued for _, _, enqueued in batch)
+            self._histogram[size] = self._histogram.get(size, 0) + 1
+
+    def stats(self) -> dict:
+        """Statistik untuk tuning throughput vs tail latency."""
+        with self._lock:
+            stats = dict(self._stats)
+            histogram = dict(sorted(self._histogram.items()))
+        requests, batches = stats["requests"], stats["batches"]
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "requests": requests,
+            "batches": batches,
+            "errors": stats["errors"],
+            "avg_batch_size": round(requests / batches, 3) if batches else 0.0,
+            "max_batch_size_seen": stats["max_batch_size_seen"],
+            "avg_queue_wait_ms": round(stats["total_wait_s"] / requests * 1000.0, 3) if requests else 0.0,
+            "batch_size_histogram": histogram,
+        }
@@ -0,0 +1,91 @@
+# src/boosting.py
+"""
+Tuning GradientBoosting / XGB dengan early stopping dan staged scoring.
+
+Daripada mem-fit ulang model untuk setiap nilai n_estimators di grid (pohon-pohon awal
+dilatih berulang kali), tiap konfigurasi di-fit sekali dengan jumlah round maksimum
+dan early stopping berbasis validasi (GB: n_iter_no_change, XGB: early_stopping_rounds).
+Skor fold dihitung dari prediksi bertahap pada beberapa checkpoint jumlah round,
+sehingga jumlah round terbaik dipilih dari satu kali fit.
+"""
+import numpy as np # type: ignore
+from sklearn.base import clone # type: ignore
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, log_loss # type: ignore
+from sklearn.model_selection import train_test_split # type: ignore
+
+ROUNDS_PARAM = "n_estimators"
+
+# Metrik yang bisa dihitung langsung dari probabilitas bertahap
+_PROBA_SCORERS = {
+    "accuracy": lambda y, proba, classes: accuracy_score(y, classes[proba.argmax(axis=1)]),
+    "f1": lambda y, proba, classes: f1_score(y, classes[proba.argmax(axis=1)]),
+    "roc_auc": lambda y, proba, classes: roc_auc_score(y, proba[:, 1]),
+    "neg_log_loss": lambda y, proba, classes: -log_loss(y, proba, labels=classes),
+}
+
+
+def is_boosting(estimator) -> bool:
+    """GradientBoostingClassifier atau XGBClassifier (dicek dari nama kelas, xgboost opsional)."""
+    return type(estimator).__name__ in ("GradientBoostingClassifier", "XGBClassifier")
+
+
+def supports_staged(estimator, param_grid, scoring: str, prefix: str = "classifier__") -> bool:
+    return (is_boosting(estimator) and scoring in _PROBA_SCORERS
+            and isinstance(param_grid, dict) and prefix + ROUNDS_PARAM in param_grid)
+
+
+def collapse_rounds(param_grid: dict, prefix: str = "classifier__", step: int = 10):
+    """
+    Hapus n_estimators dari grid. Return (grid_tanpa_rounds, checkpoints).
+    Checkpoint = setiap `step` round sampai nilai maksimum, ditambah nilai-nilai di grid.
+    """
+    grid = dict(param_grid)
+    values = [int(v) for v in grid.pop(prefix + ROUNDS_PARAM)]
+    max_rounds = max(values)
+    checkpoints = sorted(set(range(step, max_rounds + 1, step)) | set(values))
+    return grid, checkpoints
+
+
+def fit_staged(estimator, X_train, y_train, X_test, y_test, checkpoints: list,
+               scoring: str = "accuracy", patience: int = 20, validation_fraction: float = 0.1,
+               random_state: int = 42):
+    """
+    Fit sekali dengan max(checkpoints) round + early stopping, lalu skor fold test di tiap checkpoint.
+    Checkpoint setelah model berhenti memakai skor round terakhir yang dilatih.
+    Return (scores per checkpoint, jumlah round yang benar-benar dilatih).
+    """
+    max_rounds = max(checkpoints)
+    clf = clone(estimator).set_params(**{ROUNDS_PARAM: max_rounds})
+    score_fn = _PROBA_SCORERS[scoring]
+
+    if type(estimator).__name__ == "XGBClassifier":
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=validation_fraction, random_state=random_state, stratify=y_train
+        )
+        clf.set_params(early_stopping_rounds=patience)
+        clf.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        trained = clf.get_booster().num_boosted_rounds()
+        stages = ((k, clf.predict_proba(X_test, iteration_range=(0, k)))
+                  for k in sorted(set(k for k in checkpoints if k < trained) | {trained}))
+    else:
+        params = {"n_iter_no_change": patience, "validation_fraction": validation_fraction}
+        if clf.get_params().get("random_state") is None:
+            params["random_state"] = random_state
+        clf.set_params(**params)
+        clf.fit(X_train, y_train)
+        trained = clf.n_estimators_
+        wanted = set(k for k in checkpoints if k < trained) | {trained}
+        stages = ((k, proba) for k, proba in enumerate(clf.staged_predict_proba(X_test), start=1) if k in wanted)
+
+    classes = np.asarray(clf.classes_)
+    staged = {k: score_fn(y_test, proba, classes) for k, proba in stages}
+    last = staged[trained]
+    scores = np.array([staged.get(k, last) if k < trained else last for k in checkpoints], dtype=float)
+    return scores, trained
+
+
+def best_rounds(fold_scores, checkpoints: list):
+    """fold_scores: array (n_fold, n_checkpoint). Return (round terbaik, skor rata-rata)."""
+    means = np.asarray(fold_scores, dtype=float).mean(axis=0)
+    index = int(np.argmax(means))
+    return checkpoints[index], float(means[index])
@@ -1,7 +1,7 @@
 # build.py (kompatibel dengan train.py revisi)
 import numpy as np
 import os
-import pandas as pd # type: ignore
+import sys
 import joblib # type: ignore
 import matplotlib.pyplot as plt
 import seaborn as sns # type: ignore
@@ -10,6 +10,10 @@ from sklearn.metrics import ( # type: ignore
     roc_auc_score, confusion_matrix
 )
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_cache import read_dataset
+
 # === 1. Load Model Pipeline Terbaik (.joblib) ===
 best_model_path = os.path.join("../models", "logisticregression_best_pipeline.joblib")  # ganti sesuai model pipeline terbaik
 best_overall_model_name = "Logistic Regression (Best Model - Pipeline)"
@@ -17,8 +21,8 @@ model = joblib.load(best_model_path)
 
 # === 2. Load Data Test (mentah) ===
 # Data test ini belum dipreprocessing, biarkan pipeline yang memproses
-X_test = pd.read_csv("../data/test-data/X_test_raw.csv")
-y_test = pd.read_csv("../data/test-data/y_test.csv").squeeze()
+X_test = read_dataset("../data/test-data/X_test_raw.csv")
+y_test = read_dataset("../data/test-data/y_test.csv").squeeze()
 
 # === 3. Prediksi ===
 y_pred_final = model.predict(X_test)
@@ -29,7 +33,7 @@ if hasattr(model, "predict_proba"):
 elif hasattr(model, "decision_function"):
     from sklearn.utils.extmath import softmax # type: ignore
     decision_scores = model.decision_function(X_test)
-    y_prob_final = softmax(np.c_[1-decision_scores, decision_scores])[:, 1]
+    y_prob_final = softmax(np.c_[-decision_scores, decision_scores])[:, 1]
 else:
     y_prob_final = [0] * len(y_test)
 
@@ -0,0 +1,160 @@
+# src/compiled_pipeline.py
+import math
+import numpy as np # type: ignore
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class CompiledLinearPipeline:
+    """
+    Versi "compiled" dari Pipeline(preprocessor -> LogisticRegression).
+    Statistik imputer, mean/scale scaler, kategori one-hot dan koefisien model
+    diambil sekali dari pipeline yang sudah di-fit, lalu skoring dilakukan dengan
+    operasi array biasa tanpa pandas / ColumnTransformer.
+    """
+
+    # Dipakai predict_records() untuk melewati pembuatan DataFrame
+    accepts_records = True
+
+    def __init__(self, feature_names, classes, intercept, numeric, categorical):
+        self.feature_names = list(feature_names)
+        self.classes_ = np.asarray(classes)
+        self.intercept = float(intercept)
+        # numeric: list (kolom, nilai_imputasi, center, bobot) dengan bobot = coef / scale
+        self.numeric = numeric
+        # categorical: list (kolom, nilai_imputasi, {kategori: coef})
+        self.categorical = categorical
+
+    # ------------------------------------------------------------
+    # Skoring satu record (jalur tercepat untuk request online)
+    # ------------------------------------------------------------
+    def decision_one(self, record) -> float:
+        if not isinstance(record, dict):
+            record = dict(zip(self.feature_names, record))
+        z = self.intercept
+        for col, fill, center, weight in self.numeric:
+            value = record.get(col)
+            if _is_missing(value):
+                value = fill
+            z += (float(value) - center) * weight
+        for col, fill, lookup in self.categorical:
+            value = record.get(col)
+            if _is_missing(value):
+                value = fill
+            z += lookup.get(value, 0.0)
+        return z
+
+    def predict_proba_one(self, record) -> np.ndarray:
+        """Probabilitas [kelas 0, kelas 1] untuk satu dict atau satu baris NumPy."""
+        z = self.decision_one(record)
+        if z >= 0:
+            p = 1.0 / (1.0 + math.exp(-z))
+        else:
+            e = math.exp(z)
+            p = e / (1.0 + e)
+        return np.array([1.0 - p, p])
+
+    # ------------------------------------------------------------
+    # Skoring batch (DataFrame, list of dict, atau array 2D)
+    # ------------------------------------------------------------
+    def _columns(self, X):
+        if isinstance(X, dict):
+            X = [X]
+        if isinstance(X, list) and X and isinstance(X[0], dict):
+            return {col: [row.get(col) for row in X] for col in self.feature_names}, len(X)
+        if hasattr(X, "columns"):
+            return {col: X[col].to_numpy() for col in self.feature_names}, len(X)
+        X = np.asarray(X, dtype=object)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return {col: X[:, j] for j, col in enumerate(self.feature_names)}, X.shape[0]
+
+    def decision_function(self, X) -> np.ndarray:
+        columns, n_rows = self._columns(X)
+        z = np.full(n_rows, self.intercept)
+        for col, fill, center, weight in self.numeric:
+            values = np.array(columns[col], dtype=float)
+            values[np.isnan(values)] = fill
+            z += (values - center) * weight
+        for col, fill, lookup in self.categorical:
+            z += np.fromiter(
+                (lookup.get(fill if _is_missing(v) else v, 0.0) for v in columns[col]),
+                dtype=float, count=n_rows
+            )
+        return z
+
+    def predict_proba(self, X) -> np.ndarray:
+        if isinstance(X, dict):
+            return self.predict_proba_one(X).reshape(1, -1)
+        if isinstance(X, list) and len(X) == 1 and isinstance(X[0], dict):
+            return self.predict_proba_one(X[0]).reshape(1, -1)
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.c_[1.0 - p, p]
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def compile_pipeline(model) -> CompiledLinearPipeline:
+    """
+    Ekstrak parameter dari Pipeline(preprocessor, classifier) hasil train.py / training-v2.py.
+    Hanya mendukung classifier linear biner (LogisticRegression) dengan preprocessor
+    num (imputer + scaler) dan cat (imputer + onehot). Struktur lain -> ValueError.
+    """
+    steps = getattr(model, "named_steps", None)
+    if steps is None or "preprocessor" not in steps or "classifier" not in steps:
+        raise ValueError("Model harus Pipeline dengan step 'preprocessor' dan 'classifier'.")
+    if "cleaner" in steps:
+        raise ValueError("Compiled mode belum mendukung step 'cleaner' (imputasi + winsorize hasil fit).")
+
+    pre, clf = steps["preprocessor"], steps["classifier"]
+    if type(clf).__name__ != "LogisticRegression" or clf.coef_.shape[0] != 1:
+        raise ValueError(f"Compiled mode hanya mendukung LogisticRegression biner, bukan {type(clf).__name__}.")
+
+    coef = clf.coef_.ravel()
+    offset = 0
+    numeric, categorical = [], []
+    for name, trans, cols in pre.transformers_:
+        if name == "remainder":
+            if trans != "drop":
+                raise ValueError("Compiled mode tidak mendukung remainder selain 'drop'.")
+            continue
+        sub = dict(getattr(trans, "named_steps", {}))
+        imputer = sub.get("imputer")
+        if "scaler" in sub:
+            scaler = sub["scaler"]
+            center = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(cols))
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(cols))
+            for j, col in enumerate(cols):
+                fill = float(imputer.statistics_[j]) if imputer is not None else float("nan")
+                numeric.append((col, fill, float(center[j]), float(coef[offset + j] / scale[j])))
+            offset += len(cols)
+        elif "onehot" in sub:
+            onehot = sub["onehot"]
+            if onehot.drop_idx_ is not None or onehot.handle_unknown != "ignore":
+                raise ValueError("Compiled mode butuh OneHotEncoder(handle_unknown='ignore') tanpa drop.")
+            for j, col in enumerate(cols):
+                categories = onehot.categories_[j]
+                fill = imputer.statistics_[j] if imputer is not None else None
+                lookup = {cat: float(coef[offset + k]) for k, cat in enumerate(categories)}
+                categorical.append((col, fill, lookup))
+                offset += len(categories)
+        else:
+            raise ValueError(f"Transformer '{name}' tidak dikenali untuk compiled mode.")
+
+    if offset != coef.shape[0]:
+        raise ValueError("Jumlah fitur hasil preprocessor tidak cocok dengan koefisien model.")
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is None:
+        feature_names = [col for col, *_ in numeric] + [col for col, *_ in categorical]
+
+    return CompiledLinearPipeline(
+        feature_names=feature_names,
+        classes=clf.classes_,
+        intercept=clf.intercept_[0],
+        numeric=numeric,
+        categorical=categorical
+    )
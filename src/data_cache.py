@@ -0,0 +1,206 @@
+# src/data_cache.py
+"""
+Cache kolumnar (Parquet / Feather) untuk CSV hasil cleaning & split.
+
+Setiap CSV punya pasangan <nama>.parquet (atau .feather) di direktori yang sama:
+- kolom string disimpan sebagai kategori (dictionary-encoded), boolean sebagai bool,
+  sehingga tidak perlu parsing & inferensi dtype ulang di setiap run;
+- hash SHA-256 isi CSV sumber disimpan di metadata schema. read_dataset hanya memakai
+  cache jika hash-nya cocok; jika CSV berubah (cache basi) data dibaca dari CSV lalu
+  cache ditulis ulang.
+Tanpa pyarrow, read_dataset langsung membaca CSV.
+
+Contoh:
+    python src/data_cache.py                         # cache semua CSV di data/processed, train-data, test-data
+    python src/data_cache.py data/train-data/X_train_raw.csv --format feather
+"""
+import os
+import sys
+import glob
+import hashlib
+import argparse
+
+import pandas as pd # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_FORMATS = ("parquet", "feather")
+DEFAULT_FORMAT = os.environ.get("DATA_CACHE_FORMAT", "parquet")
+DEFAULT_DIRS = [os.path.join(ROOT_DIR, "data", d) for d in ("processed", "train-data", "test-data")]
+HASH_KEY = b"source_sha256"
+
+
+# ============================================================
+# HASH & PATH
+# ============================================================
+def source_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 isi file sumber (dibaca per blok)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(csv_path: str, fmt: str = None) -> str:
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt not in CACHE_FORMATS:
+        raise ValueError(f"Format cache tidak dikenal: {fmt}. Pilihan: {CACHE_FORMATS}")
+    return f"{os.path.splitext(csv_path)[0]}.{fmt}"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa # type: ignore
+    except ImportError:
+        return None
+    return pa
+
+
+# ============================================================
+# TULIS CACHE
+# ============================================================
+def to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """Kolom string (object/str) -> category; kolom lain tidak diubah."""
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col].dtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if df[col].dropna().map(type).eq(str).all():
+                df[col] = df[col].astype("category")
+    return df
+
+
+def _table(df: pd.DataFrame, digest: str, schema=None):
+    pa = _pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        # Index dictionary int32 agar schema sama untuk semua chunk (jumlah kategori bisa beda)
+        fields = [pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+                  if pa.types.is_dictionary(f.type) else f for f in table.schema]
+        # Metadata pandas sengaja dibuang: dtype hasil baca ditentukan tipe Arrow saja
+        # (dictionary -> category, bool -> bool), sama seperti hasil to_columnar dari CSV
+        schema = pa.schema(fields, metadata={HASH_KEY: digest.encode()})
+    return table.cast(schema)
+
+
+def _write(tables, path: str, fmt: str):
+    """Tulis satu/lebih tabel (schema sama) ke file sementara lalu rename (atomik)."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    first = next(tables)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq # type: ignore
+        with pq.ParquetWriter(tmp_path, first.schema) as writer:
+            writer.write_table(first)
+            for table in tables:
+                writer.write_table(table)
+    else:
+        # Feather (Arrow IPC file) tidak bisa mengganti dictionary antar batch -> satu tabel
+        import pyarrow as pa # type: ignore
+        import pyarrow.feather as feather # type: ignore
+        feather.write_feather(pa.concat_tables([first, *tables]).unify_dictionaries()
+                              .combine_chunks(), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_cache(df: pd.DataFrame, csv_path: str, fmt: str = None) -> str:
+    """Tulis df (isi csv_path yang sudah di-load) sebagai cache kolumnar. Return path cache."""
+    if _pyarrow() is None:
+        raise ImportError("Cache kolumnar butuh paket 'pyarrow' (pip install pyarrow).")
+    fmt = fmt or DEFAULT_FORMAT
+    path = cache_path(csv_path, fmt)
+    return _write(iter([_table(to_columnar(df), source_hash(csv_path))]), path, fmt)
+
+
+def build_cache(csv_path: str, fmt: str = None, chunksize: int = None, dtype: dict = None) -> str:
+    """
+    Buat cache dari CSV. Dengan chunksize, CSV dibaca per chunk (memori konstan untuk
+    Parquet); beri `dtype` agar semua chunk punya tipe yang sama.
+    """
+    if _pyarrow() is None:
+        raise ImportError("Cache kolumnar butuh paket 'pyarrow' (pip install pyarrow).")
+    fmt = fmt or DEFAULT_FORMAT
+    if not chunksize:
+        return write_cache(pd.read_csv(csv_path, dtype=dtype), csv_path, fmt)
+
+    digest = source_hash(csv_path)
+
+    def tables():
+        schema = None
+        for chunk in pd.read_csv(csv_path, dtype=dtype, chunksize=chunksize):
+            table = _table(to_columnar(chunk), digest, schema)
+            schema = table.schema
+            yield table
+
+    return _write(tables(), cache_path(csv_path, fmt), fmt)
+
+
+# ============================================================
+# BACA
+# ============================================================
+def cached_hash(path: str):
+    """Hash sumber yang tercatat di metadata cache (hanya schema yang dibaca), None jika tidak ada."""
+    pa = _pyarrow()
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq # type: ignore
+            schema = pq.read_schema(path)
+        else:
+            with pa.memory_map(path) as source:
+                schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    value = (schema.metadata or {}).get(HASH_KEY)
+    return value.decode() if value else None
+
+
+def read_dataset(csv_path: str, fmt: str = None, refresh: bool = True, columns: list = None) -> pd.DataFrame:
+    """
+    Load dataset: cache kolumnar jika hash sumbernya cocok dengan csv_path, selain itu
+    CSV (tipe kolom dibuat sama dengan isi cache) dan cache ditulis ulang jika `refresh`.
+    """
+    if _pyarrow() is None:
+        return pd.read_csv(csv_path, usecols=columns)
+    fmt = fmt or DEFAULT_FORMAT
+    path = cache_path(csv_path, fmt)
+    if cached_hash(path) == source_hash(csv_path):
+        if fmt == "parquet":
+            return pd.read_parquet(path, columns=columns)
+        return pd.read_feather(path, columns=columns)
+
+    df = to_columnar(pd.read_csv(csv_path))
+    if refresh:
+        try:
+            write_cache(df, csv_path, fmt)
+        except OSError:
+            pass  # direktori read-only: tetap pakai hasil CSV
+    return df[columns] if columns is not None else df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Buat cache kolumnar untuk CSV dataset.")
+    parser.add_argument("paths", nargs="*", help="CSV sumber (default: semua CSV di data/processed, train-data, test-data)")
+    parser.add_argument("--format", choices=CACHE_FORMATS, default=DEFAULT_FORMAT)
+    parser.add_argument("--chunksize", type=int, default=None, help="Baca CSV per chunk (Parquet saja)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = args.paths or sorted(p for d in DEFAULT_DIRS for p in glob.glob(os.path.join(d, "*.csv")))
+    written = []
+    for csv_path in paths:
+        path = cache_path(csv_path, args.format)
+        if cached_hash(path) == source_hash(csv_path):
+            print(f"{path}: up to date")
+            continue
+        written.append(build_cache(csv_path, args.format, args.chunksize))
+        print(f"{path}: ditulis")
+    return written
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# src/incremental.py
+"""
+Retraining incremental (warm start) saat ada data berlabel baru.
+
+Artefak *_best_pipeline.joblib di-load, hyperparameter hasil tuning dipertahankan,
+preprocessor yang sudah di-fit dibekukan dan hanya classifier yang di-update:
+- RandomForest       : warm_start, tambah pohon baru yang dilatih pada data baru
+- GradientBoosting   : warm_start, tambah stage boosting pada data baru
+- XGB                : lanjutkan boosting dari booster lama (xgb_model)
+- LogisticRegression : warm_start dari koefisien lama, fit pada data dasar + data baru
+Jika model dilatih dengan train.py --winsorize, step 'cleaner' ikut dibekukan sehingga data
+baru di-transform dengan statistik yang sama. Hasil dievaluasi cepat pada holdout; model baru
+hanya dipromosikan (disimpan menimpa artefak lama) jika akurasinya tidak turun lebih dari `tolerance`.
+
+Contoh:
+    python src/incremental.py data/raw/data_baru.csv
+    python src/incremental.py data_baru.csv --models xgbclassifier randomforestclassifier --dry-run
+"""
+import os
+import sys
+import copy
+import argparse
+
+import joblib # type: ignore
+import pandas as pd # type: ignore
+from sklearn.base import clone # type: ignore
+from sklearn.metrics import accuracy_score # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model_training import DATA_PATH, MODEL_DIR, CAT_COLS, load_training_data, save_model
+from src.model_registry import ARTIFACT_SUFFIX
+from src.data_cache import read_dataset
+
+# Classifier yang butuh data dasar (model konveks di-fit ulang dari koefisien lama)
+REFIT_ON_BASE = ("LogisticRegression",)
+
+
+def load_labelled(path: str):
+    """Load CSV berlabel (format sama dengan heart_disease_uci_cleaned.csv). Return X, y."""
+    df = read_dataset(path)
+    X = df.drop(columns=[c for c in ("num", "id") if c in df.columns])
+    X[CAT_COLS] = X[CAT_COLS].astype(object)
+    return X, df["num"]
+
+
+def warm_update(model, X_new, y_new, X_base=None, y_base=None,
+                extra_estimators: int = 50, extra_rounds: int = 50):
+    """
+    Update classifier dari pipeline hasil tuning tanpa mengubah preprocessor.
+    Model asli tidak diubah; return pipeline baru.
+    """
+    updated = copy.deepcopy(model)
+    preprocessor = updated[:-1]
+    step_name, clf = updated.steps[-1]
+    kind = type(clf).__name__
+
+    if kind in REFIT_ON_BASE and X_base is not None:
+        X_fit = pd.concat([X_base, X_new], ignore_index=True)
+        y_fit = pd.concat([pd.Series(y_base), pd.Series(y_new)], ignore_index=True)
+    else:
+        X_fit, y_fit = X_new, y_new
+    Xt = preprocessor.transform(X_fit)
+
+    if kind == "RandomForestClassifier":
+        clf.set_params(warm_start=True, n_estimators=clf.n_estimators + extra_estimators)
+        clf.fit(Xt, y_fit)
+    elif kind == "GradientBoostingClassifier":
+        clf.set_params(warm_start=True, n_estimators=clf.n_estimators + extra_rounds)
+        clf.fit(Xt, y_fit)
+    elif kind == "LogisticRegression":
+        clf.set_params(warm_start=True)
+        clf.fit(Xt, y_fit)
+    elif kind == "XGBClassifier":
+        booster = clf.get_booster()
+        continued = clone(clf).set_params(n_estimators=extra_rounds)
+        continued.fit(Xt, y_fit, xgb_model=booster, verbose=False)
+        updated.steps[-1] = (step_name, continued)
+        clf = continued
+    else:
+        raise ValueError(f"{kind} tidak mendukung update incremental, lakukan training penuh (train.py).")
+
+    if "warm_start" in clf.get_params():
+        clf.set_params(warm_start=False)
+    return updated
+
+
+def holdout_accuracy(model, X, y) -> float:
+    return float(accuracy_score(y, model.predict(X)))
+
+
+def incremental_retrain(name: str, X_new, y_new, X_holdout, y_holdout, X_base=None, y_base=None,
+                        model_dir: str = MODEL_DIR, tolerance: float = 0.0, dry_run: bool = False,
+                        extra_estimators: int = 50, extra_rounds: int = 50, log=print) -> dict:
+    """Update satu artefak dan promosikan jika lolos evaluasi holdout. Return ringkasan."""
+    path = os.path.join(model_dir, f"{name}{ARTIFACT_SUFFIX}")
+    if not os.path.exists(path):
+        raise KeyError(f"Model tidak ditemukan: {path}")
+    # Step 'cleaner' (jika ada) ikut di updated[:-1]: statistiknya tetap dari training awal
+    current = joblib.load(path)
+    updated = warm_update(current, X_new, y_new, X_base, y_base, extra_estimators, extra_rounds)
+
+    before = holdout_accuracy(current, X_holdout, y_holdout)
+    after = holdout_accuracy(updated, X_holdout, y_holdout)
+    promoted = after >= before - tolerance
+    if promoted and not dry_run:
+        save_model(updated, path)
+    if log is not None:
+        verdict = "dipromosikan" if promoted else "ditolak"
+        if promoted and dry_run:
+            verdict += " (dry run, tidak disimpan)"
+        log(f"{name}: holdout accuracy {before:.4f} -> {after:.4f}, {verdict}")
+    return {"model": name, "before": before, "after": after, "promoted": promoted, "saved": promoted and not dry_run}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Retraining incremental dengan data berlabel baru.")
+    parser.add_argument("new_data", help="CSV berlabel baru (kolom sama dengan data hasil cleaning)")
+    parser.add_argument("--models", nargs="+", default=["logisticregression", "randomforestclassifier",
+                                                        "gradientboostingclassifier", "xgbclassifier"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--base-data", default=DATA_PATH,
+                        help="Data dasar; split train untuk LogisticRegression, split test sebagai holdout")
+    parser.add_argument("--holdout", default=None, help="CSV holdout terpisah (default: split test data dasar)")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="Penurunan akurasi holdout maksimum yang masih boleh dipromosikan")
+    parser.add_argument("--extra-estimators", type=int, default=50, help="Pohon tambahan RandomForest")
+    parser.add_argument("--extra-rounds", type=int, default=50, help="Round tambahan GradientBoosting/XGB")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluasi saja, jangan timpa artefak")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    X_new, y_new = load_labelled(args.new_data)
+    X_base, X_test, y_base, y_test = load_training_data(args.base_data)
+    if args.holdout:
+        X_test, y_test = load_labelled(args.holdout)
+
+    reports = []
+    for name in args.models:
+        try:
+            reports.append(incremental_retrain(
+                name, X_new, y_new, X_test, y_test, X_base, y_base, model_dir=args.model_dir,
+                tolerance=args.tolerance, dry_run=args.dry_run,
+                extra_estimators=args.extra_estimators, extra_rounds=args.extra_rounds
+            ))
+        except (KeyError, ValueError) as e:
+            print(f"{name}: dilewati ({e})")
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# src/inference.py
+import os
+import warnings
+import numpy as np # type: ignore
+
+from src.metrics import stage
+
+# Threshold probabilitas kelas positif (penyakit jantung)
+DEFAULT_THRESHOLD = float(os.environ.get("PREDICTION_THRESHOLD", "0.5"))
+
+FEATURE_NAMES = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+    "thalch", "exang", "oldpeak", "slope", "ca", "thal"
+]
+
+# Record contoh untuk smoke test model baru sebelum dipakai serving
+SMOKE_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 1,
+    "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+
+def _split_pipeline(model):
+    """
+    (step transform, estimator akhir) untuk Pipeline sklearn agar tahap preprocess &
+    classifier bisa diukur terpisah; ([], model) untuk backend lain (compiled, onnx).
+    """
+    steps = getattr(model, "steps", None)
+    if not steps or len(steps) < 2:
+        return [], model
+    return [step for _, step in steps[:-1] if step not in (None, "passthrough")], steps[-1][1]
+
+
+def predict_proba_once(model, X):
+    """
+    Hitung probabilitas kelas dengan satu kali jalan pipeline (preprocessor + classifier).
+    Jika estimator tidak punya predict_proba, pakai softmax([-d, d]) dari decision_function
+    (= sigmoid(2d)) sehingga threshold 0.5 sama dengan predict() (d > 0, lihat
+    labels_from_proba untuk d == 0).
+    """
+    transforms, estimator = _split_pipeline(model)
+    if transforms:
+        with stage("preprocess"):
+            for transform in transforms:
+                X = transform.transform(X)
+    with stage("classifier" if transforms else "model"):
+        if hasattr(estimator, "predict_proba"):
+            return np.asarray(estimator.predict_proba(X))
+        if hasattr(estimator, "decision_function"):
+            from sklearn.utils.extmath import softmax # type: ignore
+            decision_scores = np.asarray(estimator.decision_function(X), dtype=float)
+            return softmax(np.c_[-decision_scores, decision_scores])
+    raise ValueError("Model tidak punya predict_proba maupun decision_function.")
+
+
+def labels_from_proba(model, proba, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Ubah probabilitas menjadi label dengan threshold pada kelas positif (>= threshold).
+    Untuk fallback decision_function dipakai > threshold: d == 0 -> proba 0.5 -> kelas 0,
+    sama dengan predict().
+    """
+    classes = getattr(model, "classes_", np.array([0, 1]))
+    estimator = _split_pipeline(model)[1]
+    if not hasattr(estimator, "predict_proba") and hasattr(estimator, "decision_function"):
+        positive = proba[:, 1] > threshold
+    else:
+        positive = proba[:, 1] >= threshold
+    return np.asarray(classes)[positive.astype(int)]
+
+
+def predict_with_proba(model, X, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Prediksi label & probabilitas sekaligus tanpa memanggil predict lalu predict_proba.
+    Return (labels, proba).
+    """
+    proba = predict_proba_once(model, X)
+    return labels_from_proba(model, proba, threshold), proba
+
+
+def predict_records(model, records, feature_names, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Prediksi dari list of dict. Model compiled (accepts_records=True) langsung
+    menerima dict sehingga pembuatan DataFrame bisa dilewati.
+    """
+    if getattr(model, "accepts_records", False):
+        return predict_with_proba(model, records, threshold)
+    import pandas as pd # type: ignore
+    with stage("dataframe"):
+        X = pd.DataFrame(records, columns=feature_names)
+    return predict_with_proba(model, X, threshold)
+
+
+def prepare_model(model, mode: str = None, path: str = None):
+    """
+    Siapkan model sesuai INFERENCE_MODE: 'sklearn' (default), 'compiled' atau 'onnx'.
+    Pada mode compiled, model yang tidak bisa di-compile (mis. RandomForest)
+    tetap dipakai sebagai pipeline sklearn biasa. Mode onnx menjalankan
+    <nama>_pipeline.onnx di samping artefak `path` dengan onnxruntime; jika file
+    tidak ada/basi atau onnxruntime tidak terpasang, pipeline sklearn dipakai.
+    """
+    mode = (mode or os.environ.get("INFERENCE_MODE", "sklearn")).lower()
+    if mode == "compiled":
+        from src.compiled_pipeline import compile_pipeline
+        try:
+            return compile_pipeline(model)
+        except ValueError as e:
+            warnings.warn(f"Compiled mode tidak tersedia, memakai pipeline sklearn: {e}")
+            return model
+    if mode == "onnx":
+        from src.onnx_backend import OnnxPipeline, load_onnx
+        if isinstance(model, OnnxPipeline):
+            return model  # sudah di-load langsung oleh load_model
+        try:
+            if path is None:
+                raise ValueError("path artefak model tidak diberikan")
+            if "cleaner" in getattr(model, "named_steps", {}):
+                raise ValueError("pipeline dengan step 'cleaner' belum didukung")
+            return load_onnx(path)
+        except (ValueError, ImportError) as e:
+            warnings.warn(f"ONNX mode tidak tersedia, memakai pipeline sklearn: {e}")
+            return model
+    if mode != "sklearn":
+        raise ValueError(f"INFERENCE_MODE tidak dikenal: {mode}")
+    return model
+
+
+def load_model(path: str, mode: str = None, mmap_mode=None):
+    """
+    Loader untuk ModelRegistry. Pada INFERENCE_MODE=onnx file <nama>_pipeline.onnx yang
+    masih segar langsung di-load tanpa unpickle artefak joblib, sehingga sklearn, scipy
+    dan pandas tidak pernah di-import (cold start lebih cepat). Jika tidak bisa (file
+    tidak ada/basi, onnxruntime tidak terpasang), artefak joblib di-load seperti biasa dan
+    prepare_model yang memutuskan fallback-nya (pipeline dengan step 'cleaner' tidak pernah
+    di-export ke ONNX).
+    """
+    from src.model_registry import load_artifact
+    mode = (mode or os.environ.get("INFERENCE_MODE", "sklearn")).lower()
+    if mode == "onnx":
+        from src.onnx_backend import load_onnx
+        try:
+            return load_onnx(path)
+        except (ValueError, ImportError):
+            pass
+    return load_artifact(path, mmap_mode=mmap_mode)
+
+
+def smoke_test(model, records=None):
+    """Prediksi cepat pada record contoh, raise ValueError jika output tidak valid."""
+    records = records or [SMOKE_RECORD]
+    _, proba = predict_records(model, records, FEATURE_NAMES)
+    if proba.shape != (len(records), 2) or not np.isfinite(proba).all():
+        raise ValueError(f"Smoke test gagal: output probabilitas tidak valid {proba!r}")
+
+
+def predict_records_cached(model, records, feature_names, cache, version,
+                           threshold: float = DEFAULT_THRESHOLD):
+    """
+    Seperti predict_records, tetapi probabilitas diambil dari PredictionCache jika ada.
+    Record yang belum ada di cache diprediksi bersama dalam satu panggilan model.
+    """
+    if cache is None:
+        return predict_records(model, records, feature_names, threshold)
+
+    from src.prediction_cache import canonical_key
+    keys = [canonical_key(record, feature_names) for record in records]
+    proba = [cache.get(version, key) for key in keys]
+    missing = [i for i, p in enumerate(proba) if p is None]
+    if missing:
+        _, computed = predict_records(model, [records[i] for i in missing], feature_names, threshold)
+        for i, p in zip(missing, computed):
+            # Salin baris agar entri cache tidak menahan seluruh array batch di memori
+            cache.put(version, keys[i], p.copy())
+            proba[i] = p
+    proba = np.vstack(proba)
+    return labels_from_proba(model, proba, threshold), proba
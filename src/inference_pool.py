@@ -0,0 +1,97 @@
+# src/inference_pool.py
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(RuntimeError):
+    """Antrian inferensi penuh; request sebaiknya ditolak dengan 503 + Retry-After."""
+
+    def __init__(self, limit: int, retry_after_s: float):
+        super().__init__(f"Server sibuk: {limit} inferensi sedang berjalan/antri")
+        self.retry_after_s = retry_after_s
+
+
+class InferencePool:
+    """
+    Thread pool berukuran tetap untuk inferensi CPU-bound dari handler async, sehingga
+    event loop tetap melayani request lain (mis. health check) selama model berjalan.
+
+    Admission control: maksimal `workers + max_queue` inferensi boleh berjalan/antri
+    sekaligus; request berikutnya langsung ditolak (QueueFullError) daripada menumpuk
+    dan time out. workers=0 menjalankan inferensi langsung di event loop (perilaku lama).
+
+    Thread (bukan process) dipakai agar model di ModelRegistry dibagi semua worker;
+    NumPy/BLAS & onnxruntime melepas GIL di bagian beratnya. Untuk skala antar core
+    tambahkan worker uvicorn/gunicorn.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 32, retry_after_s: float = 1.0):
+        if workers < 0 or max_queue < 0:
+            raise ValueError("workers & max_queue tidak boleh negatif")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after_s = retry_after_s
+        self.limit = workers + max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "max_in_flight": 0}
+
+    # Executor dibuat saat dipakai pertama (aman untuk fork gunicorn)
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="inference")
+        return self._executor
+
+    def _admit(self):
+        with self._lock:
+            if self.workers and self._in_flight >= self.limit:
+                self._stats["rejected"] += 1
+                raise QueueFullError(self.limit, self.retry_after_s)
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+
+    def _release(self, ok: bool):
+        with self._lock:
+            self._in_flight -= 1
+            self._stats["completed" if ok else "failed"] += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Jalankan fn(*args, **kwargs) di pool; raise QueueFullError jika antrian penuh."""
+        self._admit()
+        ok = False
+        try:
+            if not self.workers:
+                result = fn(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._get_executor(), lambda: fn(*args, **kwargs))
+            ok = True
+            return result
+        finally:
+            self._release(ok)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_queue": self.max_queue, "limit": self.limit,
+                    "in_flight": self._in_flight, **self._stats}
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def pool_from_env() -> InferencePool:
+    """INFERENCE_WORKERS (default min(4, CPU)), INFERENCE_MAX_QUEUE (32), INFERENCE_RETRY_AFTER (1 s)."""
+    return InferencePool(
+        workers=int(os.environ.get("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        max_queue=int(os.environ.get("INFERENCE_MAX_QUEUE", "32")),
+        retry_after_s=float(os.environ.get("INFERENCE_RETRY_AFTER", "1")),
+    )
@@ -0,0 +1,61 @@
+# src/memory_utils.py
+import os
+import sys
+
+
+def current_rss_bytes():
+    """RSS proses saat ini (bytes). None jika tidak bisa dibaca di platform ini."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil # type: ignore
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def memory_breakdown() -> dict:
+    """
+    Rincian memori proses (bytes): rss, pss, shared & private (Linux, dari smaps_rollup).
+    `shared` menunjukkan halaman yang dibagi dengan proses lain (mis. worker gunicorn
+    hasil fork dari master dengan preload), `private` adalah biaya tambahan per worker.
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    result = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(":")
+                if key in fields:
+                    result[fields[key]] = result.get(fields[key], 0) + int(parts[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        result = {}
+    if "rss" not in result:
+        result["rss"] = current_rss_bytes()
+    return result
+
+
+def peak_rss_bytes():
+    """Puncak RSS proses (bytes) sejak start."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan kB, macOS melaporkan bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(n) -> str:
+    if n is None:
+        return "n/a"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.1f} TB"
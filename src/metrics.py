@@ -0,0 +1,288 @@
+# src/metrics.py
+"""
+Metrik serving in-memory dalam format teks Prometheus (endpoint /metrics).
+
+- heart_stage_duration_seconds : histogram durasi per tahap hot path
+    request     : total request (middleware/hook app)
+    validation  : parsing & validasi pydantic input
+    dataframe   : pembuatan DataFrame dari record
+    preprocess  : step transform pipeline (ColumnTransformer, cleaner)
+    classifier  : predict_proba/decision_function estimator akhir
+    model       : backend non-Pipeline (compiled/onnx), preprocess + classifier sekaligus
+    render      : render template result.html (Flask) / susun response (FastAPI)
+- heart_requests_total{endpoint,status}, heart_errors_total{endpoint,type}
+- heart_model_info{model,version} & heart_model_load_seconds{model} dari ModelRegistry
+
+Satu observasi = dua perf_counter + satu lock + bisect (~1-2 µs) sehingga aman
+dibiarkan aktif di production. METRICS_ENABLED=0 mematikan pengukuran tahap.
+"""
+import os
+import time
+import threading
+from bisect import bisect_left
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+NAMESPACE = "heart"
+# Batas bucket (detik): 50 µs s.d. 5 s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus (bucket `le`), tidak thread-safe sendiri."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """[(le, jumlah observasi <= le)], bucket terakhir '+Inf'."""
+        total, result = 0, []
+        for bound, n in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Kumpulan histogram tahap & counter request/error untuk satu proses."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, enabled: bool = METRICS_ENABLED):
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._requests = {}
+        self._errors = {}
+
+    def stage(self, name: str):
+        """Context manager: `with metrics.stage("preprocess"): ...`."""
+        return _StageTimer(self, name) if self.enabled else _NULL_TIMER
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._stages.get(name)
+            if histogram is None:
+                histogram = self._stages[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count_request(self, endpoint: str, status):
+        key = (endpoint, str(status))
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def count_error(self, endpoint: str, error_type: str):
+        key = (endpoint, error_type)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._requests.clear()
+            self._errors.clear()
+
+    def snapshot(self) -> dict:
+        """Salinan data mentah (untuk test / endpoint JSON)."""
+        with self._lock:
+            return {
+                "stages": {name: {"count": h.count, "sum": h.sum, "buckets": h.cumulative()}
+                           for name, h in self._stages.items()},
+                "requests": dict(self._requests),
+                "errors": dict(self._errors),
+            }
+
+    def render(self, registry=None) -> str:
+        """Teks eksposisi Prometheus; `registry` (ModelRegistry) menambah info model ter-load."""
+        snap = self.snapshot()
+        lines = [f"# HELP {NAMESPACE}_stage_duration_seconds Durasi tiap tahap hot path inferensi.",
+                 f"# TYPE {NAMESPACE}_stage_duration_seconds histogram"]
+        for name in sorted(snap["stages"]):
+            stage = snap["stages"][name]
+            for bound, count in stage["buckets"]:
+                lines.append(f"{NAMESPACE}_stage_duration_seconds_bucket"
+                             f"{_labels(stage=name, le=_number(bound))} {count}")
+            lines.append(f"{NAMESPACE}_stage_duration_seconds_sum{_labels(stage=name)} {_number(stage['sum'])}")
+            lines.append(f"{NAMESPACE}_stage_duration_seconds_count{_labels(stage=name)} {stage['count']}")
+
+        lines += [f"# HELP {NAMESPACE}_requests_total Jumlah request per endpoint & status HTTP.",
+                  f"# TYPE {NAMESPACE}_requests_total counter"]
+        for (endpoint, status), n in sorted(snap["requests"].items()):
+            lines.append(f"{NAMESPACE}_requests_total{_labels(endpoint=endpoint, status=status)} {n}")
+
+        lines += [f"# HELP {NAMESPACE}_errors_total Jumlah error per endpoint & tipe exception.",
+                  f"# TYPE {NAMESPACE}_errors_total counter"]
+        for (endpoint, error_type), n in sorted(snap["errors"].items()):
+            lines.append(f"{NAMESPACE}_errors_total{_labels(endpoint=endpoint, type=error_type)} {n}")
+
+        if registry is not None:
+            loaded = {name: s for name, s in registry.stats().items() if s.get("loaded")}
+            lines += [f"# HELP {NAMESPACE}_model_info Model ter-load; version = mtime artefak.",
+                      f"# TYPE {NAMESPACE}_model_info gauge"]
+            for name, s in sorted(loaded.items()):
+                default = "true" if name == registry.default else "false"
+                lines.append(f"{NAMESPACE}_model_info{_labels(model=name, version=s.get('mtime'), default=default)} 1")
+            lines += [f"# HELP {NAMESPACE}_model_load_seconds Waktu load terakhir per model.",
+                      f"# TYPE {NAMESPACE}_model_load_seconds gauge"]
+            for name, s in sorted(loaded.items()):
+                if s.get("load_time_s") is not None:
+                    lines.append(f"{NAMESPACE}_model_load_seconds{_labels(model=name)} {_number(s['load_time_s'])}")
+        return "\n".join(lines) + "\n"
+
+
+# Instance global per proses, dipakai bersama inference.py & semua app
+metrics = Metrics()
+
+
+def stage(name: str):
+    return metrics.stage(name)
+
+
+# ============================================================
+# INTEGRASI FRAMEWORK
+# ============================================================
+class MetricsMiddleware:
+    """
+    Middleware ASGI murni (tanpa BaseHTTPMiddleware, overhead kecil): tahap 'request',
+    counter request per route & status, error per tipe exception yang lolos dari app.
+    Waktu mulai disimpan di scope['state'] agar handler bisa mengukur tahap validasi.
+    """
+
+    def __init__(self, app, metrics_=None):
+        self.app = app
+        self.metrics = metrics_ or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        scope.setdefault("state", {})["metrics_started"] = started
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            self.metrics.count_error(self._endpoint(scope), type(e).__name__)
+            raise
+        finally:
+            self.metrics.observe("request", time.perf_counter() - started)
+            self.metrics.count_request(self._endpoint(scope), status[0])
+
+    @staticmethod
+    def _endpoint(scope) -> str:
+        # Template route (mis. '/diagnose') di-set FastAPI setelah routing; path mentah tidak
+        # dipakai agar kardinalitas label tetap kecil
+        return getattr(scope.get("route"), "path", "unmatched")
+
+
+def instrument_flask(app, metrics_=None):
+    """Pasang hook tahap 'request', counter request & error pada app Flask."""
+    from flask import g, request # type: ignore
+    metrics_ = metrics_ or metrics
+
+    def endpoint():
+        return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _count_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            metrics_.observe("request", time.perf_counter() - started)
+        metrics_.count_request(endpoint(), response.status_code)
+        return response
+
+    @app.teardown_request
+    def _count_unhandled(exc):
+        if exc is not None:
+            metrics_.count_error(endpoint(), type(exc).__name__)
+    return app
+
+
+def start_metrics_server(port: int, registry=None, host: str = "0.0.0.0", metrics_=None):
+    """
+    Server HTTP kecil (thread daemon) yang melayani /metrics, untuk app tanpa router
+    sendiri (Streamlit). Return objek server (server.shutdown() untuk berhenti).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    metrics_ = metrics_ or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics_.render(registry).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,259 @@
+# src/model_registry.py
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from src.memory_utils import current_rss_bytes
+
+ARTIFACT_SUFFIX = "_best_pipeline.joblib"
+# File preprocessor terpisah dari versi lama (cleaner kini step pertama pipeline), bukan model
+LEGACY_PREPROCESSOR_SUFFIX = "_preprocessor.joblib"
+
+
+def load_artifact(path: str, mmap_mode=None):
+    """Load pipeline model (termasuk step 'cleaner' jika dilatih dengan --winsorize)."""
+    # joblib (dan sklearn lewat unpickle) baru di-import saat model pertama di-load
+    import joblib # type: ignore
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def model_name_from_path(path: str) -> str:
+    """'xgbclassifier_best_pipeline.joblib' -> 'xgbclassifier'."""
+    filename = os.path.basename(path)
+    if filename.endswith(ARTIFACT_SUFFIX):
+        return filename[:-len(ARTIFACT_SUFFIX)]
+    return os.path.splitext(filename)[0]
+
+
+class ModelRegistry:
+    """
+    Registry artefak *.joblib dengan lazy loading.
+    Model baru di-load saat pertama dipakai dan disimpan di LRU berukuran `max_loaded`
+    dengan key (nama, mtime file), sehingga file yang diganti otomatis di-load ulang.
+
+    Jika file model yang sudah di-load diganti, versi lama tetap melayani request
+    sementara versi baru di-load di background, di-smoke-test, lalu ditukar secara
+    atomik. Request yang sedang berjalan tetap selesai dengan model lama.
+
+    model_dirs     : satu direktori atau list direktori (direktori pertama menang jika nama sama)
+    loader         : fungsi (path, mmap_mode=...) -> model, default load_artifact
+                     (mis. inference.load_model yang langsung memakai file ONNX)
+    prepare        : fungsi opsional (model, path=...) -> model yang dijalankan setelah load
+                     (mis. prepare_model)
+    smoke_test     : fungsi opsional (model) -> None, raise jika model baru tidak layak dipakai
+    watch_interval : interval (detik) polling mtime file model yang sedang di-load, 0 = mati
+    mmap_mode      : diteruskan ke joblib.load (mis. 'r') agar array NumPy besar di-memory-map
+                     read-only dan halaman file dibagi antar worker
+    """
+
+    def __init__(self, model_dirs, max_loaded: int = 2, default: str = "logisticregression",
+                 prepare=None, smoke_test=None, watch_interval: float = 0, mmap_mode=None,
+                 loader=None):
+        if isinstance(model_dirs, str):
+            model_dirs = [model_dirs]
+        if max_loaded < 1:
+            raise ValueError("max_loaded minimal 1")
+        self.model_dirs = list(model_dirs)
+        self.max_loaded = max_loaded
+        self.default = default
+        self.loader = loader or load_artifact
+        self.prepare = prepare
+        self.smoke_test = smoke_test
+        self.watch_interval = watch_interval
+        self.mmap_mode = mmap_mode
+        self._paths = {}
+        self._loaded = OrderedDict()
+        self._load_stats = {}
+        self._failed_mtime = {}
+        self._reloading = set()
+        self._name_locks = {}
+        self._watcher = None
+        self._lock = threading.RLock()
+        self.discover()
+
+    def discover(self) -> dict:
+        """Scan direktori model, return {nama: path}."""
+        paths = {}
+        for model_dir in self.model_dirs:
+            if not os.path.isdir(model_dir):
+                continue
+            for filename in sorted(os.listdir(model_dir)):
+                if filename.endswith(".joblib") and not filename.endswith(LEGACY_PREPROCESSOR_SUFFIX):
+                    paths.setdefault(model_name_from_path(filename), os.path.normpath(os.path.join(model_dir, filename)))
+        with self._lock:
+            self._paths = paths
+        return dict(paths)
+
+    def available(self) -> list:
+        return sorted(self._paths)
+
+    def path_for(self, name: str = None) -> str:
+        name = name or self.default
+        if name not in self._paths:
+            self.discover()
+        if name not in self._paths:
+            raise KeyError(f"Model '{name}' tidak ditemukan. Tersedia: {self.available()}")
+        return self._paths[name]
+
+    def _name_lock(self, name: str):
+        with self._lock:
+            return self._name_locks.setdefault(name, threading.Lock())
+
+    def _cached(self, name: str):
+        """Return (mtime, model) versi yang sedang di-load untuk `name`, atau None."""
+        for key in reversed(self._loaded):
+            if key[0] == name:
+                return key[1], self._loaded[key]
+        return None
+
+    def get(self, name: str = None):
+        """Ambil model (load jika belum ada di cache)."""
+        return self.get_versioned(name)[0]
+
+    def get_versioned(self, name: str = None):
+        """
+        Return (model, versi) dengan versi = (nama, mtime artefak yang di-load).
+        Versi dipakai sebagai bagian key cache prediksi.
+        """
+        name = name or self.default
+        path = self.path_for(name)
+        mtime = os.path.getmtime(path)
+        self._ensure_watcher()
+
+        with self._lock:
+            cached = self._cached(name)
+            if cached is not None:
+                self._loaded.move_to_end((name, cached[0]))
+                if cached[0] != mtime:
+                    # File diganti: tetap layani dengan model lama, reload di background
+                    self._schedule_reload(name, mtime)
+                return cached[1], (name, cached[0])
+
+        with self._name_lock(name):
+            with self._lock:
+                cached = self._cached(name)
+                if cached is not None:
+                    return cached[1], (name, cached[0])
+            return self._load_and_swap(name, path, mtime), (name, mtime)
+
+    def _load_and_swap(self, name: str, path: str, mtime: float):
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = self.loader(path, mmap_mode=self.mmap_mode)
+            if self.prepare is not None:
+                model = self.prepare(model, path=path)
+            if self.smoke_test is not None:
+                self.smoke_test(model)
+        except Exception as e:
+            with self._lock:
+                self._failed_mtime[name] = mtime
+                self._load_stats.setdefault(name, {})["last_error"] = f"{type(e).__name__}: {e}"
+            raise
+        load_time = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+
+        with self._lock:
+            # Tukar secara atomik: versi lama dibuang dari cache, referensi yang
+            # sedang dipakai request lain tetap valid sampai request selesai
+            for stale in [k for k in self._loaded if k[0] == name]:
+                del self._loaded[stale]
+            self._loaded[(name, mtime)] = model
+            self._failed_mtime.pop(name, None)
+            self._load_stats[name] = {
+                "path": path,
+                "mtime": mtime,
+                "load_time_s": round(load_time, 4),
+                "rss_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+                "loads": self._load_stats.get(name, {}).get("loads", 0) + 1,
+            }
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return model
+
+    def preload(self, names) -> list:
+        """
+        Load beberapa model sekarang juga. Dipanggil di master gunicorn (preload_app)
+        agar worker hasil fork berbagi memori model secara copy-on-write.
+        max_loaded dinaikkan ke jumlah model yang di-preload agar LRU tidak membuang
+        model yang baru di-load (setiap worker akan me-load ulang sendiri).
+        """
+        names = list(dict.fromkeys(name or self.default for name in names))
+        with self._lock:
+            self.max_loaded = max(self.max_loaded, len(names))
+        return [self.get(name) for name in names]
+
+    def reload(self, name: str = None) -> dict:
+        """
+        Load ulang artefak `name` dari disk, jalankan smoke test, lalu tukar model.
+        Jika gagal, model lama tetap dipakai dan exception diteruskan.
+        """
+        name = name or self.default
+        path = self.path_for(name)
+        with self._name_lock(name):
+            self._load_and_swap(name, path, os.path.getmtime(path))
+        return self.stats()[name]
+
+    def _schedule_reload(self, name: str, mtime: float):
+        if name in self._reloading or self._failed_mtime.get(name) == mtime:
+            return
+        self._reloading.add(name)
+
+        def run():
+            try:
+                self.reload(name)
+            except Exception:
+                pass  # error tersimpan di stats()[name]["last_error"]
+            finally:
+                with self._lock:
+                    self._reloading.discard(name)
+
+        threading.Thread(target=run, name=f"reload-{name}", daemon=True).start()
+
+    # Thread watcher dibuat saat get() pertama (aman untuk fork gunicorn)
+    def _ensure_watcher(self):
+        if not self.watch_interval or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            self.check_for_updates()
+
+    def check_for_updates(self) -> list:
+        """Jadwalkan reload untuk model ter-load yang file-nya berubah. Return nama model."""
+        changed = []
+        with self._lock:
+            for name, loaded_mtime in list(self._loaded):
+                path = self._paths.get(name)
+                try:
+                    mtime = os.path.getmtime(path)
+                except (OSError, TypeError):
+                    continue
+                if mtime != loaded_mtime:
+                    changed.append(name)
+                    self._schedule_reload(name, mtime)
+        return changed
+
+    def loaded(self) -> list:
+        with self._lock:
+            return [name for name, _ in self._loaded]
+
+    def stats(self) -> dict:
+        """Status tiap model: sudah di-load atau belum, waktu load dan RSS saat load."""
+        with self._lock:
+            loaded = {name for name, _ in self._loaded}
+            return {
+                name: {
+                    "path": path,
+                    "loaded": name in loaded,
+                    "reloading": name in self._reloading,
+                    **{k: v for k, v in self._load_stats.get(name, {}).items() if k != "path"},
+                }
+                for name, path in sorted(self._paths.items())
+            }
@@ -1,13 +1,147 @@
 # src/model_training.py
-import pandas as pd # type: ignore
-from sklearn.model_selection import GridSearchCV # type: ignore
+import os
+import sys
+import time
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix # type: ignore
 import joblib # type: ignore
+from sklearn.model_selection import train_test_split # type: ignore
+from sklearn.pipeline import Pipeline # type: ignore
+from sklearn.compose import ColumnTransformer # type: ignore
+from sklearn.preprocessing import StandardScaler, OneHotEncoder # type: ignore
+from sklearn.impute import SimpleImputer # type: ignore
+from sklearn.svm import SVC # type: ignore
+from sklearn.linear_model import LogisticRegression # type: ignore
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier # type: ignore
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-def tune_models(pipelines, param_grids, X_train, y_train, cv=5, scoring='accuracy'):
+from src.search import make_search, count_candidates
+from src.utils import build_cleaner
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_PATH = os.path.join(ROOT_DIR, "data", "processed", "heart_disease_uci_cleaned.csv")
+MODEL_DIR = os.path.join(ROOT_DIR, "models", "python-models")
+
+NUM_COLS = ["age", "trestbps", "chol", "thalch", "oldpeak", "ca"]
+CAT_COLS = ["sex", "cp", "fbs", "restecg", "exang", "slope", "thal"]
+
+
+# ============================================================
+# DATA, PREPROCESSOR & MODEL FAMILY
+# ============================================================
+def load_training_data(path: str = DATA_PATH, test_size: float = 0.2, random_state: int = 42):
+    """
+    Load data hasil cleaning (cache kolumnar jika masih sesuai CSV, lihat data_cache.py)
+    lalu split train/test (stratified). Return X_train, X_test, y_train, y_test.
+    """
+    from src.data_cache import read_dataset
+    df = read_dataset(path)
+    X = df.drop(columns=["num"])
+    y = df["num"]
+    if "id" in X.columns:
+        X = X.drop(columns=["id"])
+    # SimpleImputer(most_frequent) butuh kolom object, bukan dtype string/category pandas
+    X[CAT_COLS] = X[CAT_COLS].astype(object)
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+
+
+def build_preprocessor() -> ColumnTransformer:
+    num_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='mean')),
+        ('scaler', StandardScaler())
+    ])
+    cat_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='most_frequent')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    return ColumnTransformer(transformers=[
+        ('num', num_transformer, NUM_COLS),
+        ('cat', cat_transformer, CAT_COLS)
+    ])
+
+
+def _xgb_classifier():
+    from xgboost import XGBClassifier # type: ignore
+    return XGBClassifier(eval_metric='logloss')
+
+
+# Nama family = prefix file artefak (<family>_best_pipeline.joblib)
+MODEL_FAMILIES = {
+    'svc': lambda: SVC(probability=True),
+    'randomforestclassifier': lambda: RandomForestClassifier(),
+    'gradientboostingclassifier': lambda: GradientBoostingClassifier(),
+    'xgbclassifier': _xgb_classifier,
+    'logisticregression': lambda: LogisticRegression(max_iter=500),
+}
+
+# 'full' = grid lama train.py, 'quick' = grid lama training-v2.py
+PARAM_GRIDS = {
+    'full': {
+        'svc': {
+            'classifier__C': [0.01, 0.1, 1, 10, 100],
+            'classifier__kernel': ['linear', 'rbf', 'poly'],
+            'classifier__gamma': ['scale', 'auto', 0.001, 0.01, 0.1, 1],
+            'classifier__class_weight': [None, 'balanced']
+        },
+        'randomforestclassifier': {
+            'classifier__n_estimators': [100, 200, 300, 500],
+            'classifier__max_depth': [None, 10, 20, 30, 50],
+            'classifier__min_samples_split': [2, 5, 10],
+            'classifier__min_samples_leaf': [1, 2, 4],
+            'classifier__class_weight': [None, 'balanced']
+        },
+        'gradientboostingclassifier': {
+            'classifier__n_estimators': [100, 200, 300],
+            'classifier__learning_rate': [0.01, 0.05, 0.1, 0.2],
+            'classifier__max_depth': [3, 5, 7],
+            'classifier__min_samples_split': [2, 5, 10]
+        },
+        'xgbclassifier': {
+            'classifier__n_estimators': [100, 200, 300],
+            'classifier__learning_rate': [0.01, 0.05, 0.1, 0.2],
+            'classifier__max_depth': [3, 5, 7],
+            'classifier__subsample': [0.8, 1],
+            'classifier__colsample_bytree': [0.8, 1]
+        },
+        'logisticregression': {
+            'classifier__C': [0.01, 0.1, 1, 10, 100],
+            'classifier__class_weight': [None, 'balanced']
+        },
+    },
+    'quick': {
+        'logisticregression': {'classifier__C': [0.1, 1, 10]},
+        'randomforestclassifier': {'classifier__n_estimators': [100, 200]},
+        'svc': {'classifier__C': [0.1, 1, 10], 'classifier__kernel': ['linear', 'rbf']},
+    },
+}
+
+
+def build_pipelines(families=None, winsorize: bool = False) -> dict:
+    """
+    Pipeline lengkap (preprocessor + classifier) untuk tiap family. winsorize=True menambah
+    build_cleaner() sebagai step 'cleaner' pertama sehingga imputasi + winsorize ikut di-fit
+    per fold CV (tanpa bocoran statistik dari fold validasi).
     """
-    Lakukan GridSearchCV untuk semua pipeline di 'pipelines' menggunakan parameter di 'param_grids'.
+    families = families or list(MODEL_FAMILIES)
+    unknown = [f for f in families if f not in MODEL_FAMILIES]
+    if unknown:
+        raise KeyError(f"Model family tidak dikenal: {unknown}. Pilihan: {list(MODEL_FAMILIES)}")
+    cleaner = [('cleaner', build_cleaner())] if winsorize else []
+    return {
+        family: Pipeline(cleaner + [('preprocessor', build_preprocessor()), ('classifier', MODEL_FAMILIES[family]())])
+        for family in families
+    }
+
+
+# ============================================================
+# TUNING, EVALUASI & SIMPAN
+# ============================================================
+
+
+def tune_models(pipelines, param_grids, X_train, y_train, cv=5, scoring='accuracy',
+                search="grid", n_iter=20, resource="n_samples", reports=None, cache_folds=False):
+    """
+    Lakukan hyperparameter tuning untuk semua pipeline di 'pipelines' menggunakan parameter di 'param_grids'.
     
     Parameters:
     - pipelines: dict {model_name: pipeline_object}
@@ -15,25 +149,45 @@ def tune_models(pipelines, param_grids, X_train, y_train, cv=5, scoring='accurac
     - X_train, y_train: data latih
     - cv: jumlah cross-validation folds
     - scoring: metrik evaluasi
+    - search: 'grid', 'random', 'halving-grid' atau 'halving-random'
+    - n_iter: budget kandidat untuk search 'random'
+    - resource: resource successive halving ('n_samples' atau mis. 'classifier__n_estimators');
+      dict {model_name: resource} untuk resource berbeda per model
+    - reports: dict opsional, diisi ringkasan per model (skor, parameter, waktu, jumlah kandidat)
+    - cache_folds: fit preprocessor sekali per fold, bukan per (fold x kandidat) (grid/random saja)
     
     Returns:
     - best_models: dict {model_name: best_pipeline}
     """
     best_models = {}
     for name, pipeline in pipelines.items():
-        print(f"\n Mulai tuning untuk {name}...")
-        grid_search = GridSearchCV(
+        print(f"\n Mulai tuning untuk {name} (search={search})...")
+        model_resource = resource.get(name, "n_samples") if isinstance(resource, dict) else resource
+        searcher = make_search(
             pipeline,
             param_grids[name],
+            strategy=search,
             cv=cv,
             scoring=scoring,
-            n_jobs=-1,
-            verbose=1
+            n_iter=n_iter,
+            resource=model_resource,
+            cache_folds=cache_folds
         )
-        grid_search.fit(X_train, y_train)
-        best_models[name] = grid_search.best_estimator_
-        print(f"Best parameters for {name}: {grid_search.best_params_}")
-        print(f"Best cross-validation {scoring} for {name}: {grid_search.best_score_:.4f}")
+        started = time.perf_counter()
+        searcher.fit(X_train, y_train)
+        seconds = time.perf_counter() - started
+        best_models[name] = searcher.best_estimator_
+        print(f"Best parameters for {name}: {searcher.best_params_}")
+        print(f"Best cross-validation {scoring} for {name}: {searcher.best_score_:.4f} "
+              f"({seconds:.1f} s, {count_candidates(searcher)} kandidat)")
+        if reports is not None:
+            reports[name] = {
+                "search": search,
+                "best_score": searcher.best_score_,
+                "best_params": searcher.best_params_,
+                "seconds": seconds,
+                "n_candidates": count_candidates(searcher),
+            }
     return best_models
 
 
@@ -52,7 +206,13 @@ def evaluate_model(model, X_test, y_test):
 
 def save_model(model, filename):
     """
-    Simpan model ke file .joblib
+    Simpan model ke file .joblib. File ditulis ke file sementara lalu di-rename
+    agar registry yang memantau mtime tidak pernah membaca file setengah jadi.
     """
-    joblib.dump(model, filename)
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp_path = f"{filename}.tmp-{os.getpid()}"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, filename)
     print(f"Model disimpan ke {filename}")
+
@@ -0,0 +1,139 @@
+# src/onnx_backend.py
+"""
+Backend serving ONNX (INFERENCE_MODE=onnx): menjalankan graph pipeline lengkap
+(imputer + scaler + one-hot + classifier) hasil onnx_export.py dengan onnxruntime di CPU.
+
+Graph punya satu input per kolom mentah (double untuk numerik, string untuk kategorikal)
+sehingga record/DataFrame mentah bisa langsung di-skor tanpa sklearn. Butuh paket
+'onnxruntime'; file <nama>_pipeline.onnx dibuat oleh `python src/onnx_export.py`.
+"""
+import os
+import json
+import hashlib
+
+import numpy as np # type: ignore
+
+ONNX_SUFFIX = "_pipeline.onnx"
+METADATA_KEY = "heart_pipeline"
+# Jumlah thread intra-op per sesi; 1 cocok untuk worker gunicorn/uvicorn yang sudah paralel
+ONNX_THREADS = int(os.environ.get("ONNX_THREADS", "1"))
+# Di atas ukuran ini kolom kategorik dikonversi lewat pd.factorize (overhead tetap ~20 µs/kolom)
+SMALL_BATCH = 64
+
+
+def onnx_path(model_path: str) -> str:
+    """'.../svc_best_pipeline.joblib' -> '.../svc_pipeline.onnx'."""
+    from src.model_registry import model_name_from_path
+    return os.path.join(os.path.dirname(model_path), f"{model_name_from_path(model_path)}{ONNX_SUFFIX}")
+
+
+def _file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Sama dengan data_cache.source_hash, tanpa import data_cache (pandas) agar cold start
+    mode onnx tidak memuat pandas.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _as_category(value, kind: str) -> str:
+    """
+    Nilai kategorikal -> string seperti kategori di graph. Kolom boolean (fbs, exang)
+    menerima True/False maupun 0/1, sama seperti OneHotEncoder sklearn (1 == True).
+    """
+    if _is_missing(value):
+        return ""
+    if kind == "bool" and isinstance(value, (bool, np.bool_, int, np.integer, float, np.floating)):
+        return str(bool(value))
+    return str(value)
+
+
+class OnnxPipeline:
+    """Pipeline ONNX dengan antarmuka predict_proba/predict seperti pipeline sklearn."""
+
+    # Dipakai predict_records() untuk melewati pembuatan DataFrame
+    accepts_records = True
+
+    def __init__(self, path: str, threads: int = ONNX_THREADS):
+        import onnxruntime as ort # type: ignore
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        meta = json.loads(self.session.get_modelmeta().custom_metadata_map[METADATA_KEY])
+        self.metadata = meta
+        self.classes_ = np.asarray(meta["classes"])
+        self.feature_names = [name for name, _ in meta["inputs"]]
+        # Dtype input numerik dibaca dari graph: file export lama masih float32
+        self._num_dtypes = {i.name: np.float64 if i.type == "tensor(double)" else np.float32
+                            for i in self.session.get_inputs()}
+        # Kolom yang di-drop (remainder) tidak muncul sebagai input graph
+        self.inputs = [(name, kind) for name, kind in meta["inputs"] if name in self._num_dtypes]
+        outputs = [o.name for o in self.session.get_outputs()]
+        self._proba_output = "probabilities" if "probabilities" in outputs else outputs[-1]
+
+    def _column_values(self, X):
+        if isinstance(X, dict):
+            X = [X]
+        if isinstance(X, list) and X and isinstance(X[0], dict):
+            return lambda col: [row.get(col) for row in X], len(X)
+        if hasattr(X, "columns"):
+            return lambda col: X[col].to_numpy(dtype=object), len(X)
+        X = np.asarray(X, dtype=object)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        index = {col: j for j, col in enumerate(self.feature_names)}
+        return lambda col: X[:, index[col]], X.shape[0]
+
+    def feeds(self, X) -> dict:
+        """Input graph: array (n, 1) per kolom."""
+        values, n_rows = self._column_values(X)
+        feeds = {}
+        for name, kind in self.inputs:
+            column = values(name)
+            if kind == "num":
+                dtype = self._num_dtypes[name]
+                try:
+                    array = np.asarray(column, dtype=dtype)
+                except (TypeError, ValueError):
+                    array = np.fromiter((np.nan if _is_missing(v) else float(v) for v in column),
+                                        dtype=dtype, count=n_rows)
+            elif n_rows <= SMALL_BATCH:
+                array = np.array([_as_category(v, kind) for v in column], dtype=object)
+            else:
+                # Batch besar: konversi per nilai unik saja (kode -1 = missing -> '')
+                import pandas as pd # type: ignore
+                codes, uniques = pd.factorize(np.asarray(column, dtype=object))
+                mapped = np.array([_as_category(v, kind) for v in uniques] + [""], dtype=object)
+                array = mapped[codes]
+            feeds[name] = array.reshape(-1, 1)
+        return feeds
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = self.session.run([self._proba_output], self.feeds(X))[0]
+        return np.asarray(proba, dtype=np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def load_onnx(model_path: str, threads: int = ONNX_THREADS) -> OnnxPipeline:
+    """
+    Load <nama>_pipeline.onnx di samping artefak joblib. ValueError jika file tidak ada
+    atau basi (hash joblib sumber berbeda), ImportError jika onnxruntime tidak terpasang.
+    """
+    path = onnx_path(model_path)
+    if not os.path.exists(path):
+        raise ValueError(f"File ONNX tidak ada: {path} (jalankan python src/onnx_export.py)")
+    pipeline = OnnxPipeline(path, threads)
+    if pipeline.metadata.get("source_sha256") != _file_sha256(model_path):
+        raise ValueError(f"File ONNX basi untuk {model_path}, export ulang dengan onnx_export.py")
+    return pipeline
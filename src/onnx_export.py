@@ -0,0 +1,331 @@
+# src/onnx_export.py
+"""
+Export pipeline lengkap (preprocessor + classifier) ke ONNX untuk serving onnxruntime.
+
+Berbeda dengan export estimator-only untuk aplikasi Java (estimator_to_onnx, satu input
+float hasil preprocessing), graph di sini menerima satu input per kolom mentah:
+- kolom numerik   -> float32 [None, 1] (double untuk model tree, lihat bawah; NaN = missing)
+- kolom kategorik -> string  [None, 1] ('' = missing); kategori disimpan sebagai string
+Spesifikasi input, kelas dan hash joblib sumber disimpan di metadata model
+(lihat onnx_backend.py), sehingga file ONNX basi bisa dideteksi saat load.
+
+Untuk model tree (RandomForest, GradientBoosting, XGB) input numerik bertipe double:
+imputasi + scaling dihitung dalam double lalu di-cast sekali ke float32 sebelum classifier,
+sama seperti sklearn (float64) + tree/XGBoost (cast float32). Scaling dalam float32 menggeser
+nilai 1 ulp sehingga sampel yang tepat di threshold split (cut histogram XGB berada tepat di
+nilai data) berpindah cabang; dulu ini membuat probabilitas XGB meleset sampai ~0.76.
+Model linear/SVC tetap memakai input float32.
+
+Setiap export dicek paritasnya terhadap pipeline joblib pada data test. Model linear/SVC
+harus sama sampai `atol`; model tree boleh sampai `tree_atol` (selisih maksimum, bukan
+rata-rata) dengan kesepakatan label >= `min_agreement`.
+File <nama>_pipeline.onnx hanya ditulis jika paritas lolos.
+
+Butuh 'skl2onnx' dan 'onnxruntime' (XGBClassifier juga butuh 'onnxmltools').
+
+Contoh:
+    python src/onnx_export.py
+    python src/onnx_export.py --families logisticregression svc --atol 1e-5
+"""
+import os
+import sys
+import copy
+import json
+import argparse
+
+import numpy as np # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model_registry import ARTIFACT_SUFFIX, model_name_from_path
+from src.onnx_backend import METADATA_KEY, OnnxPipeline, onnx_path
+from src.data_cache import source_hash, read_dataset
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODEL_DIR = os.path.join(ROOT_DIR, "models", "python-models")
+TEST_DATA = os.path.join(ROOT_DIR, "data", "test-data", "X_test_raw.csv")
+TARGET_OPSET = {"": 17, "ai.onnx.ml": 3}
+# Classifier berbasis tree: split dievaluasi dengan threshold float32 di onnxruntime
+TREE_CLASSIFIERS = ("RandomForestClassifier", "GradientBoostingClassifier", "XGBClassifier",
+                    "ExtraTreesClassifier", "DecisionTreeClassifier")
+
+
+def _skl2onnx():
+    try:
+        import skl2onnx # type: ignore
+    except ImportError:
+        raise ImportError("Export ONNX butuh paket 'skl2onnx' dan 'onnxruntime' "
+                          "(pip install skl2onnx onnxruntime).")
+    return skl2onnx
+
+
+def _register_xgboost():
+    """Daftarkan converter XGBClassifier dari onnxmltools ke skl2onnx (sekali saja)."""
+    from skl2onnx import update_registered_converter # type: ignore
+    from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes # type: ignore
+    try:
+        from xgboost import XGBClassifier # type: ignore
+        from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost # type: ignore
+    except ImportError:
+        raise ImportError("Export XGBClassifier butuh paket 'onnxmltools' (pip install onnxmltools).")
+    update_registered_converter(
+        XGBClassifier, "XGBoostXGBClassifier", calculate_linear_classifier_output_shapes,
+        convert_xgboost, options={"nocl": [True, False], "zipmap": [True, False, "columns"]}
+    )
+
+
+# ============================================================
+# SPESIFIKASI INPUT
+# ============================================================
+def input_spec(model) -> list:
+    """
+    [(kolom, jenis)] sesuai urutan feature_names_in_, jenis: 'num', 'str' atau 'bool'
+    (kolom kategorik yang semua kategorinya boolean, mis. fbs & exang).
+    """
+    if "cleaner" in model.named_steps:
+        raise ValueError("Pipeline dengan step 'cleaner' (winsorize) belum bisa di-export ke ONNX.")
+    if "preprocessor" not in model.named_steps:
+        raise ValueError("Pipeline tidak punya step 'preprocessor'.")
+    kinds = {}
+    for name, transformer, cols in model.named_steps["preprocessor"].transformers_:
+        if name == "num":
+            kinds.update({col: "num" for col in cols})
+        elif name == "cat":
+            categories = transformer.named_steps["onehot"].categories_
+            for col, cats in zip(cols, categories):
+                is_bool = all(isinstance(c, (bool, np.bool_)) for c in cats)
+                kinds[col] = "bool" if is_bool else "str"
+        else:
+            kinds.update({col: "str" for col in cols})
+    return [(col, kinds.get(col, "str")) for col in model.feature_names_in_]
+
+
+def export_copy(model):
+    """
+    Salinan pipeline dengan statistik imputer & kategori one-hot kolom kategorik diubah
+    ke string, karena input kategorik di graph ONNX bertipe string.
+    """
+    model = copy.deepcopy(model)
+    for name, transformer, _ in model.named_steps["preprocessor"].transformers_:
+        if name != "cat":
+            continue
+        imputer = transformer.named_steps["imputer"]
+        onehot = transformer.named_steps["onehot"]
+        imputer.statistics_ = np.array([str(v) for v in imputer.statistics_], dtype=object)
+        imputer.missing_values = ""
+        onehot.categories_ = [np.array([str(v) for v in cats], dtype=object) for cats in onehot.categories_]
+    return model
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+def _impute_in_double(graph, model):
+    """
+    onnxruntime hanya punya Imputer (ai.onnx.ml) untuk float; ganti dengan IsNaN + Where agar
+    imputasi numerik berjalan dalam double. Nilai isian diambil dari statistics_ SimpleImputer
+    (float64), bukan dari atribut node yang float32.
+    """
+    from onnx import helper, numpy_helper # type: ignore
+    stats = [transformer.named_steps["imputer"].statistics_
+             for name, transformer, _ in model.named_steps["preprocessor"].transformers_
+             if name == "num" and "imputer" in getattr(transformer, "named_steps", {})]
+    imputers = [node for node in graph.node if node.domain == "ai.onnx.ml" and node.op_type == "Imputer"]
+    if len(imputers) != len(stats):
+        raise ValueError(f"Graph punya {len(imputers)} Imputer, pipeline {len(stats)} imputer numerik.")
+    fills = {id(node): values for node, values in zip(imputers, stats)}
+    nodes = []
+    for node in graph.node:
+        if id(node) not in fills:
+            nodes.append(node)
+            continue
+        output = node.output[0]
+        graph.initializer.append(numpy_helper.from_array(np.asarray(fills[id(node)], dtype=np.float64),
+                                                         f"{output}_fill"))
+        nodes += [helper.make_node("IsNaN", [node.input[0]], [f"{output}_isnan"]),
+                  helper.make_node("Where", [f"{output}_isnan", f"{output}_fill", node.input[0]], [output])]
+    del graph.node[:]
+    graph.node.extend(nodes)
+
+
+def _join_graphs(features, head, n_features: int):
+    """Sambungkan graph preprocessing (output double) ke graph classifier (input float32)."""
+    from onnx import compose, helper, TensorProto # type: ignore
+    output = features.graph.output[0].name
+    features.graph.node.append(helper.make_node("Cast", [output], ["features_float"], to=TensorProto.FLOAT))
+    del features.graph.output[:]
+    features.graph.output.append(helper.make_tensor_value_info("features_float", TensorProto.FLOAT,
+                                                               [None, n_features]))
+    # Nama internal kedua graph dari skl2onnx bisa bentrok
+    head = compose.add_prefix(head, "classifier_", rename_inputs=False, rename_outputs=False)
+    opsets = {}
+    for proto in (features, head):
+        for opset in proto.opset_import:
+            opsets[opset.domain] = max(opsets.get(opset.domain, 0), opset.version)
+    for proto in (features, head):
+        del proto.opset_import[:]
+        proto.opset_import.extend(helper.make_opsetid(domain, version) for domain, version in opsets.items())
+    return compose.merge_models(features, head, io_map=[("features_float", head.graph.input[0].name)])
+
+
+def _tree_graph(exported, spec: list):
+    """
+    Graph untuk classifier tree: preprocessing dengan input numerik double, di-cast ke float32
+    tepat sebelum classifier (sama seperti sklearn + tree/XGBoost).
+    """
+    from skl2onnx import convert_sklearn # type: ignore
+    from skl2onnx.common.data_types import DoubleTensorType, FloatTensorType, StringTensorType # type: ignore
+    from sklearn.pipeline import Pipeline # type: ignore
+    initial_types = [(col, DoubleTensorType([None, 1]) if kind == "num" else StringTensorType([None, 1]))
+                     for col, kind in spec]
+    features = convert_sklearn(Pipeline(exported.steps[:-1]), initial_types=initial_types,
+                               target_opset=TARGET_OPSET)
+    _impute_in_double(features.graph, exported)
+    classifier = exported.steps[-1][1]
+    n_features = classifier.n_features_in_
+    head = convert_sklearn(
+        classifier, initial_types=[("features", FloatTensorType([None, n_features]))],
+        options={id(classifier): {"zipmap": False}}, target_opset=TARGET_OPSET,
+    )
+    return _join_graphs(features, head, n_features)
+
+
+def to_onnx(model, source_path: str = None):
+    """
+    Convert pipeline joblib ke ModelProto ONNX (belum ditulis ke file). Input numerik float32
+    untuk model linear/SVC (kontrak graph untuk aplikasi Java), double untuk model tree.
+    """
+    _skl2onnx()
+    from skl2onnx import convert_sklearn # type: ignore
+    from skl2onnx.common.data_types import FloatTensorType, StringTensorType # type: ignore
+
+    spec = input_spec(model)
+    classifier = model.steps[-1][1]
+    if type(classifier).__name__ == "XGBClassifier":
+        _register_xgboost()
+    exported = export_copy(model)
+    if type(classifier).__name__ in TREE_CLASSIFIERS:
+        onnx_model = _tree_graph(exported, spec)
+    else:
+        initial_types = [(col, FloatTensorType([None, 1]) if kind == "num" else StringTensorType([None, 1]))
+                         for col, kind in spec]
+        onnx_model = convert_sklearn(
+            exported, initial_types=initial_types,
+            options={id(exported.steps[-1][1]): {"zipmap": False}},
+            target_opset=TARGET_OPSET,
+        )
+    metadata = {
+        "inputs": spec,
+        "classes": np.asarray(classifier.classes_).tolist(),
+        "classifier": type(classifier).__name__,
+        "source_sha256": source_hash(source_path) if source_path else None,
+    }
+    entry = onnx_model.metadata_props.add()
+    entry.key, entry.value = METADATA_KEY, json.dumps(metadata)
+    return onnx_model
+
+
+def estimator_to_onnx(model):
+    """
+    Convert classifier saja (tanpa preprocessor) ke ModelProto ONNX, kontrak lama aplikasi Java:
+    satu input 'float_input' float32 [None, n_fitur] berisi fitur hasil preprocessing
+    (output step 'preprocessor'), output label + probabilitas (zipmap).
+    """
+    _skl2onnx()
+    from skl2onnx import convert_sklearn # type: ignore
+    from skl2onnx.common.data_types import FloatTensorType # type: ignore
+
+    classifier = model.steps[-1][1]
+    initial_types = [("float_input", FloatTensorType([None, int(classifier.n_features_in_)]))]
+    return convert_sklearn(classifier, initial_types=initial_types, target_opset=TARGET_OPSET)
+
+
+def check_parity(model, onnx_pipeline, X, atol: float = 1e-4, min_agreement: float = 0.98,
+                 tree_atol: float = 1e-3) -> dict:
+    """Bandingkan probabilitas & label pipeline joblib dengan graph ONNX pada X."""
+    expected = np.asarray(model.predict_proba(X), dtype=np.float64)
+    actual = onnx_pipeline.predict_proba(X)
+    diff = np.abs(expected - actual)
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    is_tree = type(model.steps[-1][1]).__name__ in TREE_CLASSIFIERS
+    passed = bool(diff.max() <= (tree_atol if is_tree else atol))
+    if is_tree:
+        passed = passed and agreement >= min_agreement
+    return {
+        "max_abs_diff": float(diff.max()), "mean_abs_diff": float(diff.mean()),
+        "label_agreement": agreement, "tolerance": "tree" if is_tree else "exact", "passed": passed,
+    }
+
+
+def export_model(model_path: str, X, atol: float = 1e-4, min_agreement: float = 0.98,
+                 tree_atol: float = 1e-3, force: bool = False) -> dict:
+    """Export satu artefak joblib, cek paritas, tulis <nama>_pipeline.onnx jika lolos (atau force)."""
+    import joblib # type: ignore
+    model = joblib.load(model_path)
+    onnx_model = to_onnx(model, source_path=model_path)
+    path = onnx_path(model_path)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    try:
+        report = check_parity(model, OnnxPipeline(tmp_path), X, atol, min_agreement, tree_atol)
+        if report["passed"] or force:
+            os.replace(tmp_path, path)
+            report["path"] = path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    report["size_bytes"] = os.path.getsize(path) if "path" in report else None
+    return report
+
+
+def export_all(model_dir: str = MODEL_DIR, families: list = None, data_path: str = TEST_DATA,
+               atol: float = 1e-4, min_agreement: float = 0.98, tree_atol: float = 1e-3,
+               force: bool = False) -> dict:
+    """Export semua *_best_pipeline.joblib di model_dir; error per model dicatat, tidak menghentikan loop."""
+    X = read_dataset(data_path)
+    reports = {}
+    for filename in sorted(os.listdir(model_dir)):
+        if not filename.endswith(ARTIFACT_SUFFIX):
+            continue
+        name = model_name_from_path(filename)
+        if families and name not in families:
+            continue
+        try:
+            reports[name] = export_model(os.path.join(model_dir, filename), X, atol, min_agreement,
+                                         tree_atol, force)
+        except (ValueError, ImportError, RuntimeError) as e:
+            reports[name] = {"passed": False, "error": str(e)}
+    return reports
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export pipeline joblib ke ONNX + cek paritas.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--families", nargs="+", default=None, help="Default: semua artefak di model-dir")
+    parser.add_argument("--data", default=TEST_DATA, help="Data mentah untuk cek paritas")
+    parser.add_argument("--atol", type=float, default=1e-4, help="Selisih probabilitas maksimum (model linear/SVC)")
+    parser.add_argument("--min-agreement", type=float, default=0.98,
+                        help="Kesepakatan label minimum untuk model tree")
+    parser.add_argument("--tree-atol", type=float, default=1e-3,
+                        help="Selisih probabilitas maksimum untuk model tree")
+    parser.add_argument("--force", action="store_true", help="Tulis file ONNX walau paritas gagal")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    reports = export_all(args.model_dir, args.families, args.data, args.atol, args.min_agreement,
+                         args.tree_atol, args.force)
+    for name, report in reports.items():
+        if "error" in report:
+            print(f"{name}: GAGAL - {report['error']}")
+            continue
+        status = "OK" if report["passed"] else "PARITAS GAGAL"
+        print(f"{name}: {status} max_diff={report['max_abs_diff']:.2e} mean_diff={report['mean_abs_diff']:.2e} "
+              f"label={report['label_agreement']:.3f} -> {report.get('path', '-')}")
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+# src/orchestrator.py
+"""
+Orkestrator training paralel untuk semua model family.
+
+Semua fit (family, kandidat, fold) dijadwalkan ke satu process pool dengan budget
+core global. Preprocessor di-fit sekali per fold untuk semua family dengan definisi
+preprocessor yang sama (grid hanya mengubah parameter classifier__*), tiap classifier dibatasi 1 thread sehingga CPU
+tidak oversubscribe. Begitu semua fold sebuah family selesai, pipeline terbaik di-refit,
+dievaluasi dan langsung disimpan tanpa menunggu family lain.
+"""
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+from sklearn.base import clone # type: ignore
+from sklearn.exceptions import FitFailedWarning # type: ignore
+from sklearn.metrics import get_scorer, accuracy_score # type: ignore
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv # type: ignore
+from sklearn.pipeline import Pipeline # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.search import make_search, count_candidates, grid_size, FoldCachedSearchCV
+from src.boosting import supports_staged, collapse_rounds, fit_staged, best_rounds, ROUNDS_PARAM
+from src.result_store import dataset_hash, pipeline_definition, params_key
+
+
+# ============================================================
+# WORKER
+# ============================================================
+_state = {}
+
+
+def _limit_threads(pipeline):
+    """Classifier dengan n_jobs (RandomForest, XGB) dipaksa 1 thread; budget core diatur pool."""
+    classifier = pipeline.steps[-1][1]
+    if "n_jobs" in classifier.get_params():
+        classifier.set_params(n_jobs=1)
+    return pipeline
+
+
+def _init_worker(state: dict, limit_threads: bool = True):
+    global _state
+    if limit_threads:
+        try:
+            from threadpoolctl import threadpool_limits # type: ignore
+            threadpool_limits(1)
+        except ImportError:
+            pass
+    _state = state
+
+
+def _fit_fold(family: str, candidate: int, fold: int):
+    """
+    Fit classifier satu kandidat pada matriks fitur fold yang sudah dihitung. Fit yang gagal
+    diberi skor NaN (seperti error_score=np.nan di GridSearchCV) beserta pesan error-nya.
+    """
+    started = time.time()
+    pipeline = _state["pipelines"][family]
+    params = _state["candidates"][family][candidate]
+    step_name, estimator = pipeline.steps[-1]
+    prefix = step_name + "__"
+    Xt_train, y_train, Xt_test, y_test = _state["folds"][_state["feature_keys"][family]][fold]
+    error = None
+    try:
+        clf = clone(estimator).set_params(**{k[len(prefix):]: v for k, v in params.items()})
+        checkpoints = _state["staged"].get(family)
+        if checkpoints:
+            # Boosting: satu fit dengan round maksimum, skor di tiap checkpoint round
+            score, _ = fit_staged(clf, Xt_train, y_train, Xt_test, y_test, checkpoints,
+                                  scoring=_state["scoring"], patience=_state["patience"])
+        else:
+            clf.fit(Xt_train, y_train)
+            score = get_scorer(_state["scoring"])(clf, Xt_test, y_test)
+    except Exception as e:
+        score, error = np.nan, f"{type(e).__name__}: {e}"
+    return {"family": family, "candidate": candidate, "fold": fold, "score": score, "error": error,
+            "started": started, "finished": time.time()}
+
+
+def _refit(family: str, params: dict):
+    """Refit pipeline lengkap dengan parameter terbaik pada seluruh data train."""
+    started = time.time()
+    model = clone(_state["pipelines"][family]).set_params(**params).fit(_state["X"], _state["y"])
+    return {"family": family, "model": model, "started": started, "finished": time.time()}
+
+
+def _search(family: str, param_grid: dict, strategy: str, n_iter: int, resource: str):
+    """Strategi halving dijalankan utuh dalam satu task (iterasinya bergantung satu sama lain)."""
+    started = time.time()
+    searcher = make_search(_state["pipelines"][family], param_grid, strategy=strategy,
+                           cv=_state["cv"], scoring=_state["scoring"], n_iter=n_iter,
+                           resource=resource, n_jobs=1, verbose=0)
+    searcher.fit(_state["X"], _state["y"])
+    return {"family": family, "model": searcher.best_estimator_, "best_params": searcher.best_params_,
+            "best_score": float(searcher.best_score_), "n_candidates": count_candidates(searcher),
+            "started": started, "finished": time.time()}
+
+
+class _InlineExecutor:
+    """Pengganti process pool untuk n_jobs=1: task dijalankan langsung di proses ini."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+# ============================================================
+# ORKESTRATOR
+# ============================================================
+def plan_candidates(param_grid, search: str = "grid", n_iter: int = 20, random_state: int = 42) -> list:
+    """Daftar kandidat parameter, urutannya sama dengan GridSearchCV / RandomizedSearchCV."""
+    if search == "grid":
+        return list(ParameterGrid(param_grid))
+    if search == "random":
+        return list(ParameterSampler(param_grid, min(n_iter, grid_size(param_grid)), random_state=random_state))
+    raise ValueError(f"plan_candidates hanya untuk 'grid'/'random', bukan {search}")
+
+
+class TrainingOrchestrator:
+    """
+    pipelines   : dict {family: Pipeline(preprocessor, classifier)}; matriks fitur fold dipakai
+                  bersama oleh family dengan definisi preprocessor yang sama
+    param_grids : dict {family: grid}
+    n_jobs      : budget core global (default env TRAIN_N_JOBS atau jumlah CPU)
+    search      : 'grid', 'random', 'halving-grid', 'halving-random'
+    output_dir  : jika diisi, <family>_best_pipeline.joblib disimpan di sini begitu family selesai
+    log         : fungsi log (default print), None untuk diam
+    early_stopping : GradientBoosting/XGB dengan n_estimators di grid di-fit sekali per
+                     (kandidat, fold) pada round maksimum dengan early stopping (`patience`),
+                     jumlah round terbaik dipilih dari skor bertahap tiap `round_step` round
+    store       : ResultStore opsional; skor tiap fit disimpan begitu selesai dan fit yang
+                  sudah ada di store (dataset, pipeline & kandidat sama) tidak dijalankan ulang
+    """
+
+    def __init__(self, pipelines: dict, param_grids: dict, n_jobs: int = None, cv=5,
+                 scoring: str = 'accuracy', search: str = "grid", n_iter: int = 20,
+                 resource="n_samples", random_state: int = 42, output_dir: str = None, log=print,
+                 early_stopping: bool = True, patience: int = 20, round_step: int = 10, store=None):
+        self.pipelines = {family: _limit_threads(clone(p)) for family, p in pipelines.items()}
+        self.param_grids = param_grids
+        self.n_jobs = n_jobs or int(os.environ.get("TRAIN_N_JOBS", "0")) or os.cpu_count() or 1
+        self.cv = cv
+        self.scoring = scoring
+        self.search = search
+        self.n_iter = n_iter
+        self.resource = resource
+        self.random_state = random_state
+        self.output_dir = output_dir
+        self.log = log
+        self.early_stopping = early_stopping
+        self.patience = patience
+        self.round_step = round_step
+        self.store = store
+        self.results = {}
+        self.timeline = []
+
+    def _emit(self, message: str):
+        if self.log is not None:
+            self.log(f"[train {time.time() - self._t0:7.1f}s] {message}")
+
+    def _event(self, family: str, event: str, at: float = None):
+        at = time.time() if at is None else at
+        self.timeline.append({"family": family, "event": event, "t": round(at - self._t0, 3)})
+
+    def _definition(self, family: str, checkpoints: list = None) -> str:
+        """Definisi pipeline + konteks CV, key run family ini di ResultStore."""
+        return pipeline_definition(self.pipelines[family], cv=self.cv, scoring=self.scoring,
+                                   checkpoints=checkpoints, patience=self.patience)
+
+    def shrink_grids(self, X_train, y_train, top: int) -> dict:
+        """
+        Persempit param_grids ke nilai dari `top` kandidat terbaik di store. Hanya run dengan
+        dataset & definisi pipeline yang sama dan kandidat yang semua fold-nya tersimpan yang
+        ikut diperingkat. Return grid baru (juga dipasang ke self.param_grids).
+        """
+        if self.store is None:
+            raise ValueError("shrink_grids butuh store")
+        y_train = y_train if hasattr(y_train, "iloc") else pd.Series(y_train)
+        data_key = dataset_hash(X_train, y_train)
+        n_folds = check_cv(self.cv, y_train, classifier=True).get_n_splits(X_train, y_train)
+        self.param_grids = {
+            family: self.store.shrink_grid(family, grid, top, dataset=data_key,
+                                           definition=self._definition(family), folds=n_folds)
+            for family, grid in self.param_grids.items()
+        }
+        return self.param_grids
+
+    def _fold_features(self, X, y):
+        """
+        Fit preprocessor sekali per fold; matriksnya dipakai bersama oleh semua family yang
+        definisi preprocessor-nya sama. Return ({definisi: [fold]}, {family: definisi}).
+        """
+        preprocessors, feature_keys = {}, {}
+        for family, pipeline in self.pipelines.items():
+            preprocessor = Pipeline(pipeline.steps[:-1])
+            key = pipeline_definition(preprocessor)
+            preprocessors.setdefault(key, preprocessor)
+            feature_keys[family] = key
+        splits = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        folds = {key: [] for key in preprocessors}
+        for train_idx, test_idx in splits:
+            X_tr, X_te = X.iloc[train_idx], X.iloc[test_idx]
+            y_tr, y_te = y.iloc[train_idx], y.iloc[test_idx]
+            for key, preprocessor in preprocessors.items():
+                fitted = clone(preprocessor).fit(X_tr, y_tr)
+                folds[key].append((fitted.transform(X_tr), y_tr, fitted.transform(X_te), y_te))
+        return folds, feature_keys
+
+    def run(self, X_train, y_train, X_test=None, y_test=None) -> dict:
+        """Tuning + refit + simpan semua family. Return dict {family: ringkasan}."""
+        self._t0 = time.time()
+        y_train = y_train if hasattr(y_train, "iloc") else pd.Series(y_train)
+        halving = self.search.startswith("halving")
+        candidates, staged = {}, {}
+        if not halving:
+            for family, pipeline in self.pipelines.items():
+                grid = self.param_grids[family]
+                if not FoldCachedSearchCV.supports(pipeline, grid):
+                    raise ValueError(f"Grid {family} harus hanya berisi parameter classifier__*")
+                if self.early_stopping and supports_staged(pipeline.steps[-1][1], grid, self.scoring):
+                    grid, staged[family] = collapse_rounds(grid, step=self.round_step)
+                candidates[family] = plan_candidates(grid, self.search, self.n_iter, self.random_state)
+        folds, feature_keys = ({}, {}) if halving else self._fold_features(X_train, y_train)
+        n_folds = len(next(iter(folds.values()))) if folds else 0
+
+        state = {"pipelines": self.pipelines, "candidates": candidates, "folds": folds, "feature_keys": feature_keys,
+                 "X": X_train, "y": y_train, "cv": self.cv, "scoring": self.scoring,
+                 "staged": staged, "patience": self.patience}
+        if self.n_jobs == 1:
+            _init_worker(state, limit_threads=False)
+            pool = _InlineExecutor()
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=(state,))
+
+        total_fits = {family: len(candidates.get(family, [])) * n_folds for family in self.pipelines}
+        scores = {family: np.full((len(candidates.get(family, [])), n_folds) + ((len(staged[family]),) if family in staged else ()),
+                                  np.nan) for family in self.pipelines}
+        progress = {family: {"done": 0, "busy_s": 0.0, "first_start": None} for family in self.pipelines}
+
+        store_keys, cached = {}, {}
+        if self.store is not None and not halving:
+            data_key = dataset_hash(X_train, y_train)
+            for family in self.pipelines:
+                definition = self._definition(family, staged.get(family))
+                store_keys[family] = (data_key, self.store.register_pipeline(family, definition))
+                cached[family] = self.store.lookup(*store_keys[family])
+
+        # Antrian task: refit diprioritaskan agar family yang selesai langsung disimpan
+        queue, priority = deque(), deque()
+        n_cached = 0
+        for family in self.pipelines:
+            if halving:
+                model_resource = self.resource.get(family, "n_samples") if isinstance(self.resource, dict) else self.resource
+                queue.append((_search, family, self.param_grids[family], self.search, self.n_iter, model_resource))
+                continue
+            for c, params in enumerate(candidates[family]):
+                key = params_key(params)
+                for f in range(n_folds):
+                    if (key, f) in cached.get(family, {}):
+                        scores[family][c, f] = cached[family][(key, f)]
+                        progress[family]["done"] += 1
+                        n_cached += 1
+                    else:
+                        queue.append((_fit_fold, family, c, f))
+            if total_fits[family] and progress[family]["done"] == total_fits[family]:
+                progress[family]["first_start"] = time.time()
+                self._event(family, "start")
+                best = self._select(family, candidates[family], scores[family], staged.get(family))
+                if best is not None:
+                    priority.append((_refit, family, best["best_params"]))
+        cache_note = f", {n_cached} fit diambil dari store" if n_cached else ""
+        self._emit(f"{len(queue)} task untuk {len(self.pipelines)} family, budget {self.n_jobs} core{cache_note}")
+
+        in_flight = {}
+        try:
+            while queue or priority or in_flight:
+                while (queue or priority) and len(in_flight) < self.n_jobs * 2:
+                    task = priority.popleft() if priority else queue.popleft()
+                    in_flight[pool.submit(*task)] = task
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    result = future.result()
+                    family = result["family"]
+                    stats = progress[family]
+                    stats["busy_s"] += result["finished"] - result["started"]
+                    if stats["first_start"] is None:
+                        stats["first_start"] = result["started"]
+                        self._event(family, "start", at=result["started"])
+
+                    if task[0] is _fit_fold:
+                        scores[family][result["candidate"], result["fold"]] = result["score"]
+                        if result["error"] is not None:
+                            warnings.warn(f"{family}: fit kandidat {candidates[family][result['candidate']]} "
+                                          f"fold {result['fold']} gagal, skor diisi NaN. {result['error']}",
+                                          FitFailedWarning)
+                        elif family in store_keys:
+                            self.store.record(*store_keys[family], family, candidates[family][result["candidate"]],
+                                              result["fold"], result["score"],
+                                              result["finished"] - result["started"])
+                        stats["done"] += 1
+                        if stats["done"] == total_fits[family]:
+                            best = self._select(family, candidates[family], scores[family], staged.get(family))
+                            if best is not None:
+                                priority.append((_refit, family, best["best_params"]))
+                    else:
+                        if task[0] is _search:
+                            self.results[family] = {k: result[k] for k in ("best_params", "best_score", "n_candidates")}
+                            self._event(family, "cv_done")
+                            self._emit(f"{family}: search selesai, best CV {self.scoring} "
+                                       f"{result['best_score']:.4f} ({result['n_candidates']} kandidat)")
+                        self._finish(family, result["model"], X_test, y_test)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if all("error" in result for result in self.results.values()):
+            raise ValueError(f"Semua family gagal di-fit: {[r['error'] for r in self.results.values()]}")
+        for family, stats in progress.items():
+            self.results[family]["busy_s"] = round(stats["busy_s"], 3)
+            self.results[family]["wall_s"] = round(self.results[family]["finished"] - stats["first_start"], 3)
+        self._print_timeline()
+        return self.results
+
+    def _select(self, family: str, candidates: list, scores, checkpoints: list = None) -> dict:
+        """Pilih kandidat terbaik dari skor CV; None (family gagal) jika semua kandidat gagal."""
+        n_fits = scores.shape[0] * scores.shape[1]
+        if checkpoints:
+            # Per kandidat: jumlah round terbaik dari skor bertahap rata-rata antar fold
+            picks = [best_rounds(candidate_scores, checkpoints) for candidate_scores in scores]
+            means = np.array([score for _, score in picks])
+        else:
+            means = scores.mean(axis=1)
+        if np.isnan(means).all():
+            # Family gagal tanpa menghentikan family lain; tidak di-refit/disimpan
+            self.results[family] = {"best_params": None, "best_score": float("nan"),
+                                    "n_candidates": len(candidates), "finished": time.time(),
+                                    "error": f"semua {len(candidates)} kandidat gagal di-fit"}
+            self._event(family, "failed")
+            self._emit(f"{family}: GAGAL, semua kandidat gagal di-fit")
+            return None
+        # Kandidat dengan fit gagal (mean NaN) diurutkan paling akhir
+        best_index = int((-np.where(np.isnan(means), -np.inf, means)).argsort(kind="stable")[0])
+        best_params = dict(candidates[best_index])
+        if checkpoints:
+            best_params["classifier__" + ROUNDS_PARAM] = picks[best_index][0]
+        self.results[family] = {"best_params": best_params, "best_score": float(means[best_index]),
+                                "n_candidates": len(candidates)}
+        self._event(family, "cv_done")
+        mode = " + early stopping" if checkpoints else ""
+        self._emit(f"{family}: CV selesai ({n_fits} fit{mode}), best CV {self.scoring} "
+                   f"{means[best_index]:.4f} {best_params}")
+        return self.results[family]
+
+    def _finish(self, family: str, model, X_test, y_test):
+        result = self.results[family]
+        result["model"] = model
+        if X_test is not None and y_test is not None:
+            result["test_accuracy"] = float(accuracy_score(y_test, model.predict(X_test)))
+        if self.output_dir:
+            from src.model_training import save_model
+            result["path"] = os.path.join(self.output_dir, f"{family}_best_pipeline.joblib")
+            save_model(model, result["path"])
+        result["finished"] = time.time()
+        self._event(family, "saved" if self.output_dir else "refit_done")
+        test = f", test accuracy {result['test_accuracy']:.4f}" if "test_accuracy" in result else ""
+        self._emit(f"{family}: refit selesai{test}")
+
+    def _print_timeline(self):
+        if self.log is None:
+            return
+        self.log("\n=== Timeline per family ===")
+        self.log(f"{'family':<28}{'mulai':>8}{'cv':>8}{'selesai':>9}{'busy':>9}{'best CV':>9}{'test':>8}")
+        for family, result in self.results.items():
+            events = {e["event"]: e["t"] for e in self.timeline if e["family"] == family}
+            done = events.get("saved", events.get("refit_done", events.get("failed")))
+            test = f"{result['test_accuracy']:.4f}" if "test_accuracy" in result else "-"
+            self.log(f"{family:<28}{events.get('start', 0):>7.1f}s{events.get('cv_done', 0):>7.1f}s"
+                     f"{done:>8.1f}s{result['busy_s']:>8.1f}s{result['best_score']:>9.4f}{test:>8}")
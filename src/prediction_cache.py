@@ -0,0 +1,93 @@
+# src/prediction_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(record: dict, feature_names) -> tuple:
+    """Tuple nilai fitur sesuai urutan feature_names (float bulat -> int agar 1 == 1.0)."""
+    key = []
+    for col in feature_names:
+        value = record.get(col)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        key.append(value)
+    return tuple(key)
+
+
+class PredictionCache:
+    """
+    Cache LRU (+ TTL opsional) untuk hasil prediksi:
+    (versi model, tuple fitur tervalidasi) -> probabilitas.
+
+    Versi model berasal dari ModelRegistry.get_versioned() = (nama, mtime artefak) dan
+    menjadi bagian key, sehingga entri versi lama tidak pernah dipakai untuk versi baru.
+    Saat artefak diganti, entri lama tidak di-flush: request yang masih dilayani model lama
+    tetap bisa hit, dan entri tsb keluar sendiri lewat LRU/TTL. Put dari versi yang lebih
+    lama dari versi terbaru yang pernah terlihat diabaikan (dihitung di `stale_puts`).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_s: float = 0):
+        if max_size < 1:
+            raise ValueError("max_size minimal 1")
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "stale_puts": 0}
+
+    def _is_stale(self, version) -> bool:
+        # Dipanggil dengan lock: catat versi terbaru per model, True jika `version` lebih lama
+        if not isinstance(version, tuple):
+            return False
+        latest = self._versions.get(version[0])
+        if latest is not None and version < latest:
+            return True
+        self._versions[version[0]] = version
+        return False
+
+    def get(self, version, key):
+        with self._lock:
+            entry = self._data.get((version, key))
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[(version, key)]
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._data.move_to_end((version, key))
+            self._counters["hits"] += 1
+            return value
+
+    def put(self, version, key, value):
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            if self._is_stale(version):
+                self._counters["stale_puts"] += 1
+                return
+            self._data[(version, key)] = (value, expires_at)
+            self._data.move_to_end((version, key))
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._data)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_s": self.ttl_s,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            **counters,
+        }
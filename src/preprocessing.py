@@ -1,92 +1,228 @@
 import pandas as pd  # type: ignore
 import numpy as np
 import os
+import sys
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # src/data_preprocessing.py
-from utils import preprocess_entire_datasheet
+from src.utils import FeaturePreprocessor, save_model
+from src.data_cache import write_cache, build_cache
 
-# Sklearn Library 
+# Sklearn Library
 from sklearn.model_selection import train_test_split  # type: ignore
 
-# ---------------------------
-# 1. Load Dataset
-# ---------------------------
-data_path = "../data/raw/heart_disease_uci.csv"
-
-if not os.path.exists(data_path):
-    print(f"Error: File '{data_path}' tidak ditemukan.")
-    exit()
-
-df = pd.read_csv(data_path)
-
-# ---------------------------
-# 2. Cleaning Data
-# ---------------------------
-
-# Ganti '?' dengan NaN
-df.replace("?", np.nan, inplace=True)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RAW_PATH = os.path.join(ROOT_DIR, "data", "raw", "heart_disease_uci.csv")
+OUTPUT_DIR = os.path.join(ROOT_DIR, "data", "processed")
 
 # Kolom numerik & kategorikal
 numerical_cols = ["age", "trestbps", "chol", "thalch", "oldpeak"]
 categorical_cols = ["sex","cp", "fbs", "restecg", "exang", "slope", "ca", "thal"]
 
-# Konversi kolom numerik ke float
-for col in numerical_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
+# Dtype eksplisit agar tiap chunk di-parse sama (tanpa inferensi per chunk).
+# Kolom integer dibaca sebagai float64 (parsing Int64 nullable ~2x lebih lambat) lalu
+# dikembalikan ke int64 setelah dropna, sehingga hasil CSV sama persis dengan versi
+# yang membaca seluruh file sekaligus.
+RAW_DTYPES = {
+    "id": "float64", "age": "float64", "sex": "str", "dataset": "str", "cp": "str",
+    "trestbps": "float64", "chol": "float64", "fbs": "boolean", "restecg": "str",
+    "thalch": "float64", "exang": "boolean", "oldpeak": "float64", "slope": "str",
+    "ca": "float64", "thal": "str", "num": "float64",
+}
+INT_COLS = ["id", "age"]
+DROP_COLS = ["dataset", "id"]
+# Dtype kolom setelah cleaning (untuk membaca ulang output streaming per chunk)
+CLEAN_DTYPES = {**{k: v for k, v in RAW_DTYPES.items() if k not in DROP_COLS},
+                "age": "int64", "num": "int64"}
 
-# Binarisasi target
-df["num"] = df["num"].apply(lambda x: 1 if x > 0 else 0)
-
-# Hapus baris dengan NaN
-df.dropna(inplace=True)
-df.reset_index(drop=True, inplace=True)
 
 # ---------------------------
-# 3. Hapus fitur 'dataset' & 'id' jika ada
+# Cleaning (per DataFrame / chunk)
 # ---------------------------
-for col_to_remove in ["dataset", "id"]:
-    if col_to_remove in df.columns:
-        df.drop(columns=[col_to_remove], inplace=True)
-        print(f"Kolom '{col_to_remove}' dihapus dari dataset.")
-
-# Simpan versi cleaned dataset
-output_dir = "../data/processed"
-os.makedirs(output_dir, exist_ok=True)
-cleaned_path = os.path.join(output_dir, "heart_disease_uci_cleaned.csv")
-df.to_csv(cleaned_path, index=False)
-print(f"Dataset bersih disimpan di {cleaned_path}")
+def read_raw(path: str, chunksize: int = None):
+    """Baca CSV mentah dengan dtype eksplisit; '?' dibaca sebagai NaN."""
+    return pd.read_csv(path, dtype=RAW_DTYPES, na_values=["?"], chunksize=chunksize)
+
+
+def clean_frame(df: pd.DataFrame):
+    """
+    Cleaning satu DataFrame/chunk hasil read_raw ('?' sudah jadi NaN): konversi numerik,
+    binarisasi target (vektor), buang baris kosong & kolom 'dataset'/'id'.
+    Return (df_bersih, id baris yang tersisa).
+    """
+    for col in numerical_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # Binarisasi target
+    df["num"] = (df["num"] > 0).astype("int64")
+
+    df = df.dropna().reset_index(drop=True)
+    int_cols = [col for col in INT_COLS if col in df.columns]
+    df[int_cols] = df[int_cols].astype("int64")
+    ids = df["id"] if "id" in df.columns else pd.Series(df.index)
+    return df.drop(columns=[c for c in DROP_COLS if c in df.columns]), ids
+
+
+class StratifiedStreamSplit:
+    """
+    Split train/test stratified untuk data yang datang per chunk. Per kelas, baris ke-k
+    (urutan file) masuk test jika floor((k + 1) * test_size + u) > floor(k * test_size + u),
+    dengan u offset hash (salt, kelas) di [0, 1). Jumlah test tiap kelas selalu dalam 1 baris
+    dari test_size * n_kelas, dan penghitung per kelas dibawa antar chunk sehingga split
+    sama di setiap run & tidak bergantung pada ukuran chunk.
+    """
+
+    def __init__(self, test_size: float = 0.2, salt: str = "42"):
+        self.test_size = test_size
+        self.salt = salt
+        self.seen = {}
+
+    def _offset(self, label) -> float:
+        key = pd.Series([f"{self.salt}:{label}"])
+        return int(pd.util.hash_pandas_object(key, index=False).iloc[0] % 10_000) / 10_000
+
+    def __call__(self, labels) -> np.ndarray:
+        """Mask test untuk satu chunk label."""
+        labels = np.asarray(labels)
+        is_test = np.zeros(len(labels), dtype=bool)
+        for label in np.unique(labels):
+            rows = np.flatnonzero(labels == label)
+            start = self.seen.get(label, 0)
+            k = np.arange(start, start + len(rows))
+            u = self._offset(label)
+            is_test[rows] = np.floor((k + 1) * self.test_size + u) > np.floor(k * self.test_size + u)
+            self.seen[label] = start + len(rows)
+        return is_test
 
-# ---------------------------
-# 4. Preprocessing
-# ---------------------------
-X, y = preprocess_entire_datasheet(df, target_col="num")
 
 # ---------------------------
-# 5. Pisahkan X & y
+# Mode in-memory (default)
 # ---------------------------
-X = df.drop(columns=["num"])
-y = df["num"]
-
-# Update daftar kolom numerik & kategorikal sesuai dataset final
-numerical_cols = [col for col in numerical_cols if col in X.columns]
-categorical_cols = [col for col in categorical_cols if col in X.columns]
+def run_in_memory(data_path: str = RAW_PATH, output_dir: str = OUTPUT_DIR, test_size: float = 0.2,
+                  cache_format: str = "parquet"):
+    raw = read_raw(data_path)
+    df, _ = clean_frame(raw)
+    for col_to_remove in DROP_COLS:
+        if col_to_remove in raw.columns:
+            print(f"Kolom '{col_to_remove}' dihapus dari dataset.")
+
+    # Simpan versi cleaned dataset
+    os.makedirs(output_dir, exist_ok=True)
+    cleaned_path = os.path.join(output_dir, "heart_disease_uci_cleaned.csv")
+    df.to_csv(cleaned_path, index=False)
+    print(f"Dataset bersih disimpan di {cleaned_path}")
+
+    # Pisahkan X & y
+    X = df.drop(columns=["num"])
+    y = df["num"]
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=42, stratify=y
+    )
+
+    # Preprocessing (statistik di-fit pada data train saja)
+    preprocessor = FeaturePreprocessor().fit(X_train)
+    save_model(preprocessor, os.path.join(output_dir, "feature_preprocessor.joblib"))
+
+    # Save semua hasil
+    X.to_csv(os.path.join(output_dir, "X_processed.csv"), index=False)
+    y.to_csv(os.path.join(output_dir, "y_processed.csv"), index=False)
+
+    X_train.to_csv(os.path.join(output_dir, "X_train.csv"), index=False)
+    X_test.to_csv(os.path.join(output_dir, "X_test.csv"), index=False)
+    y_train.to_csv(os.path.join(output_dir, "y_train.csv"), index=False)
+    y_test.to_csv(os.path.join(output_dir, "y_test.csv"), index=False)
+
+    # Cache kolumnar (typed) di samping tiap CSV, lihat data_cache.py
+    if cache_format:
+        outputs = {"heart_disease_uci_cleaned": df, "X_processed": X, "y_processed": y,
+                   "X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test}
+        for name, frame in outputs.items():
+            write_cache(frame.to_frame() if isinstance(frame, pd.Series) else frame,
+                        os.path.join(output_dir, f"{name}.csv"), cache_format)
+
+    print(f"Data split dan disimpan di {output_dir}")
 
-# ---------------------------
-# 6. Split data
-# ---------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
 
 # ---------------------------
-# 7. Save semua hasil
+# Mode streaming (memori konstan)
 # ---------------------------
-X.to_csv(os.path.join(output_dir, "X_processed.csv"), index=False)
-y.to_csv(os.path.join(output_dir, "y_processed.csv"), index=False)
-
-X_train.to_csv(os.path.join(output_dir, "X_train.csv"), index=False)
-X_test.to_csv(os.path.join(output_dir, "X_test.csv"), index=False)
-y_train.to_csv(os.path.join(output_dir, "y_train.csv"), index=False)
-y_test.to_csv(os.path.join(output_dir, "y_test.csv"), index=False)
-
-print(f"Data split dan disimpan di {output_dir}")
\ No newline at end of file
+def run_streaming(data_path: str = RAW_PATH, output_dir: str = OUTPUT_DIR, test_size: float = 0.2,
+                  chunksize: int = 100_000, cache_format: str = "parquet") -> dict:
+    """
+    Cleaning per chunk dan tulis hasil bertahap (append) sehingga memori tidak bergantung
+    pada ukuran file. Split train/test stratified per kelas lewat StratifiedStreamSplit.
+    X_processed.csv & feature_preprocessor.joblib butuh statistik seluruh data train
+    (kuantil winsorize), jadi hanya dibuat oleh mode in-memory.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = ["heart_disease_uci_cleaned", "y_processed", "X_train", "X_test", "y_train", "y_test"]
+    files = {name: open(os.path.join(output_dir, f"{name}.csv"), "w", newline="") for name in names}
+    counts = {"rows_in": 0, "rows_out": 0, "train": 0, "test": 0, "test_positive": 0, "positive": 0}
+    split = StratifiedStreamSplit(test_size)
+    # Header ditulis sekali per file, bukan per chunk: chunk awal bisa kosong setelah dropna
+    has_header = set()
+    try:
+        for chunk in read_raw(data_path, chunksize=chunksize):
+            counts["rows_in"] += len(chunk)
+            df, _ = clean_frame(chunk)
+            X, y = df.drop(columns=["num"]), df["num"]
+            is_test = split(y)
+            parts = {
+                "heart_disease_uci_cleaned": df, "y_processed": y,
+                "X_train": X[~is_test], "X_test": X[is_test], "y_train": y[~is_test], "y_test": y[is_test],
+            }
+            for name, part in parts.items():
+                part.to_csv(files[name], index=False, header=name not in has_header)
+                has_header.add(name)
+            counts["rows_out"] += len(df)
+            counts["test"] += int(is_test.sum())
+            counts["positive"] += int(y.sum())
+            counts["test_positive"] += int(y[is_test].sum())
+    finally:
+        for f in files.values():
+            f.close()
+
+    counts["train"] = counts["rows_out"] - counts["test"]
+    if cache_format:
+        for name in names:
+            build_cache(os.path.join(output_dir, f"{name}.csv"), cache_format, chunksize, CLEAN_DTYPES)
+    print(f"[stream] {counts['rows_in']:,} baris dibaca, {counts['rows_out']:,} baris bersih, "
+          f"train {counts['train']:,} / test {counts['test']:,} -> {output_dir}")
+    if counts["positive"] and counts["rows_out"] > counts["positive"]:
+        print(f"[stream] proporsi test per kelas: positif "
+              f"{counts['test_positive'] / counts['positive']:.3f}, negatif "
+              f"{(counts['test'] - counts['test_positive']) / (counts['rows_out'] - counts['positive']):.3f}")
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cleaning & split data heart disease UCI.")
+    parser.add_argument("--input", default=RAW_PATH, help="CSV mentah")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--stream", action="store_true",
+                        help="Proses per chunk dengan memori konstan (split stratified per kelas)")
+    parser.add_argument("--chunksize", type=int, default=int(os.environ.get("PREPROCESS_CHUNKSIZE", "100000")))
+    parser.add_argument("--cache-format", choices=["parquet", "feather", "none"],
+                        default=os.environ.get("DATA_CACHE_FORMAT", "parquet"),
+                        help="Cache kolumnar di samping tiap CSV output ('none' = tidak dibuat)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.exists(args.input):
+        print(f"Error: File '{args.input}' tidak ditemukan.")
+        exit()
+    cache_format = None if args.cache_format == "none" else args.cache_format
+    if args.stream:
+        return run_streaming(args.input, args.output_dir, args.test_size, args.chunksize, cache_format)
+    return run_in_memory(args.input, args.output_dir, args.test_size, cache_format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# src/result_store.py
+"""
+Penyimpanan hasil tuning (SQLite) agar search bisa dilanjutkan.
+
+Setiap fit (kandidat, fold) disimpan dengan key:
+- hash dataset (isi X & y train),
+- hash definisi pipeline + konteks CV (kelas & parameter tetap, cv, scoring, mode early stopping),
+- parameter kandidat (JSON terurut),
+beserta skor dan waktu fit. Search yang terputus atau diulang melewati kandidat yang
+sudah dievaluasi, dan hasil lama bisa di-query untuk mempersempit grid berikutnya.
+
+Contoh:
+    python src/result_store.py                       # ringkasan semua run
+    python src/result_store.py --family svc --top 5  # kandidat terbaik SVC
+    python src/result_store.py --family svc --shrink 10
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_STORE = os.environ.get("TUNING_STORE", os.path.join(ROOT_DIR, "models", "tuning_results.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fold_results (
+    dataset_hash  TEXT NOT NULL,
+    pipeline_hash TEXT NOT NULL,
+    family        TEXT NOT NULL,
+    params        TEXT NOT NULL,
+    fold          INTEGER NOT NULL,
+    score         TEXT NOT NULL,
+    fit_seconds   REAL NOT NULL,
+    created       REAL NOT NULL,
+    PRIMARY KEY (dataset_hash, pipeline_hash, params, fold)
+);
+CREATE TABLE IF NOT EXISTS pipelines (
+    pipeline_hash TEXT PRIMARY KEY,
+    family        TEXT NOT NULL,
+    definition    TEXT NOT NULL
+);
+"""
+
+
+# ============================================================
+# KEY
+# ============================================================
+def dataset_hash(X, y) -> str:
+    """Hash isi data (nilai & nama kolom), tidak bergantung pada index."""
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _plain(value):
+    """Nilai parameter yang bisa di-JSON-kan; estimator diwakili nama kelasnya."""
+    if hasattr(value, "get_params"):
+        return type(value).__name__
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def pipeline_definition(pipeline, **context) -> str:
+    """JSON definisi pipeline (semua parameter deep) + konteks tuning (cv, scoring, dst)."""
+    params = {k: _plain(v) for k, v in pipeline.get_params(deep=True).items()}
+    return json.dumps({"params": params, "context": {k: _plain(v) for k, v in context.items()}},
+                      sort_keys=True)
+
+
+def _definition_key(definition: str) -> str:
+    """Definisi pipeline tanpa checkpoints early stopping (ikut berubah saat grid dipersempit)."""
+    parsed = json.loads(definition)
+    parsed.get("context", {}).pop("checkpoints", None)
+    return json.dumps(parsed, sort_keys=True)
+
+
+def params_key(params: dict) -> str:
+    return json.dumps({k: _plain(v) for k, v in params.items()}, sort_keys=True)
+
+
+# ============================================================
+# STORE
+# ============================================================
+class ResultStore:
+    """Store SQLite; aman dipakai dari beberapa thread, setiap record langsung di-commit."""
+
+    def __init__(self, path: str = DEFAULT_STORE):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def register_pipeline(self, family: str, definition: str) -> str:
+        pipeline_hash = hashlib.sha256(definition.encode()).hexdigest()[:16]
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO pipelines VALUES (?, ?, ?)",
+                               (pipeline_hash, family, definition))
+        return pipeline_hash
+
+    def record(self, dataset: str, pipeline: str, family: str, params: dict, fold: int,
+               score, fit_seconds: float):
+        score = np.asarray(score, dtype=float).tolist()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fold_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (dataset, pipeline, family, params_key(params), fold, json.dumps(score),
+                 float(fit_seconds), time.time())
+            )
+
+    def lookup(self, dataset: str, pipeline: str) -> dict:
+        """{(params_key, fold): skor} untuk kombinasi dataset & pipeline ini."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT params, fold, score FROM fold_results WHERE dataset_hash = ? AND pipeline_hash = ?",
+                (dataset, pipeline)
+            ).fetchall()
+        return {(params, fold): json.loads(score) for params, fold, score in rows}
+
+    def pipeline_hashes(self, definition: str, family: str = None) -> list:
+        """Hash pipeline tersimpan dengan definisi sama (checkpoints early stopping diabaikan)."""
+        query, args = "SELECT pipeline_hash, definition FROM pipelines", []
+        if family:
+            query += " WHERE family = ?"
+            args.append(family)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        key = _definition_key(definition)
+        return [pipeline_hash for pipeline_hash, stored in rows if _definition_key(stored) == key]
+
+    def summary(self, family: str = None, dataset: str = None, definition: str = None,
+                folds: int = None) -> pd.DataFrame:
+        """
+        Rata-rata skor per kandidat per run (kolom `folds` = jumlah fold yang sudah tersimpan).
+        Skor staged (early stopping) diringkas dengan nilai checkpoint terbaiknya.
+
+        dataset    : hanya run pada hash dataset ini
+        definition : hanya run dengan definisi pipeline ini (lihat pipeline_definition)
+        folds      : hanya kandidat yang semua fold-nya tersimpan (biasanya = cv)
+        """
+        query = "SELECT dataset_hash, pipeline_hash, family, params, fold, score, fit_seconds FROM fold_results"
+        clauses, args = [], []
+        if family:
+            clauses.append("family = ?")
+            args.append(family)
+        if dataset:
+            clauses.append("dataset_hash = ?")
+            args.append(dataset)
+        if definition:
+            hashes = self.pipeline_hashes(definition, family)
+            clauses.append(f"pipeline_hash IN ({', '.join('?' * len(hashes))})")
+            args.extend(hashes)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=args)
+        columns = ["dataset_hash", "pipeline_hash", "family", "params", "mean_score", "folds", "fit_seconds"]
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        df["score"] = df["score"].map(lambda s: float(np.max(json.loads(s))))
+        grouped = df.groupby(["dataset_hash", "pipeline_hash", "family", "params"], as_index=False).agg(
+            mean_score=("score", "mean"), folds=("fold", "nunique"), fit_seconds=("fit_seconds", "sum")
+        )
+        if folds:
+            grouped = grouped[grouped["folds"] == folds]
+        return grouped.sort_values("mean_score", ascending=False, kind="stable")[columns].reset_index(drop=True)
+
+    def shrink_grid(self, family: str, param_grid: dict, top: int = 10, dataset: str = None,
+                    definition: str = None, folds: int = None) -> dict:
+        """
+        Persempit grid ke nilai-nilai yang muncul di `top` kandidat terbaik run sebelumnya.
+        Parameter yang belum pernah dicoba tetap memakai nilai grid aslinya.
+        dataset/definition/folds diteruskan ke summary agar peringkat hanya memakai run yang
+        sebanding (data & pipeline sama, kandidat dengan semua fold).
+        """
+        best = self.summary(family, dataset, definition, folds).head(top)
+        if best.empty:
+            return dict(param_grid)
+        seen = {}
+        for params in best["params"]:
+            for key, value in json.loads(params).items():
+                seen.setdefault(key, []).append(value)
+        shrunk = {}
+        for key, values in param_grid.items():
+            keep = [v for v in values if _plain(v) in seen.get(key, [])]
+            shrunk[key] = keep or list(values)
+        return shrunk
+
+    def close(self):
+        self._conn.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Query hasil tuning yang tersimpan.")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--family", default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--folds", type=int, default=None,
+                        help="Hanya kandidat dengan N fold tersimpan (= --cv saat training)")
+    parser.add_argument("--shrink", type=int, default=None,
+                        help="Cetak grid 'full' family yang dipersempit ke N kandidat terbaik")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = ResultStore(args.store)
+    if args.shrink:
+        from src.model_training import PARAM_GRIDS
+        if args.family not in PARAM_GRIDS["full"]:
+            raise KeyError(f"--shrink butuh --family yang ada di grid 'full': {list(PARAM_GRIDS['full'])}")
+        print(json.dumps(store.shrink_grid(args.family, PARAM_GRIDS["full"][args.family], args.shrink,
+                                           folds=args.folds),
+                         indent=2, default=str))
+        return
+    summary = store.summary(args.family, folds=args.folds)
+    with pd.option_context("display.max_colwidth", 120, "display.width", 200):
+        print(summary.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
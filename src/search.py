@@ -0,0 +1,191 @@
+# src/search.py
+import time
+import warnings
+
+import numpy as np # type: ignore
+from scipy.stats import rankdata # type: ignore
+from joblib import Parallel, delayed # type: ignore
+from sklearn.base import clone, is_classifier # type: ignore
+from sklearn.metrics import get_scorer # type: ignore
+from sklearn.pipeline import Pipeline # type: ignore
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, ParameterGrid, ParameterSampler, check_cv # type: ignore
+from sklearn.exceptions import FitFailedWarning # type: ignore
+from sklearn.experimental import enable_halving_search_cv # type: ignore # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV # type: ignore
+
+SEARCH_STRATEGIES = ["grid", "random", "halving-grid", "halving-random"]
+
+
+def grid_size(param_grid) -> int:
+    return len(ParameterGrid(param_grid))
+
+
+def make_search(pipeline, param_grid, strategy: str = "grid", cv=5, scoring='accuracy',
+                n_iter: int = 20, resource: str = "n_samples", factor: int = 3,
+                random_state: int = 42, n_jobs: int = -1, verbose: int = 1,
+                cache_folds: bool = False):
+    """
+    Buat objek search sesuai strategi:
+    - 'grid'           : GridSearchCV (semua kombinasi)
+    - 'random'         : RandomizedSearchCV dengan budget n_iter kandidat
+    - 'halving-grid'   : HalvingGridSearchCV (successive halving)
+    - 'halving-random' : HalvingRandomSearchCV (kandidat acak + successive halving)
+
+    resource untuk halving: 'n_samples' atau nama parameter seperti 'classifier__n_estimators'.
+    Jika resource adalah parameter, nilainya dihapus dari grid dan dipakai sebagai
+    min/max resource (mis. n_estimators [100, ..., 500] -> 100..500).
+
+    cache_folds=True memakai FoldCachedSearchCV untuk 'grid'/'random' jika grid hanya
+    berisi parameter classifier (strategi halving tetap memakai search sklearn biasa).
+    """
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Strategi search tidak dikenal: {strategy}. Pilihan: {SEARCH_STRATEGIES}")
+
+    common = dict(cv=cv, scoring=scoring, n_jobs=n_jobs, verbose=verbose)
+    if cache_folds and strategy in ("grid", "random") and FoldCachedSearchCV.supports(pipeline, param_grid):
+        budget = min(n_iter, grid_size(param_grid)) if strategy == "random" else None
+        return FoldCachedSearchCV(pipeline, param_grid, n_iter=budget, random_state=random_state, **common)
+    if strategy == "grid":
+        return GridSearchCV(pipeline, param_grid, **common)
+    if strategy == "random":
+        n_iter = min(n_iter, grid_size(param_grid))
+        return RandomizedSearchCV(pipeline, param_grid, n_iter=n_iter, random_state=random_state, **common)
+
+    halving = dict(factor=factor, random_state=random_state, **common)
+    if resource != "n_samples":
+        param_grid = dict(param_grid)
+        values = param_grid.pop(resource, None)
+        if values:
+            halving.update(min_resources=min(values), max_resources=max(values))
+        else:
+            # Parameter tidak ada di grid: pakai nilai default estimator sebagai batas atas
+            halving.update(max_resources=pipeline.get_params()[resource])
+    if strategy == "halving-grid":
+        return HalvingGridSearchCV(pipeline, param_grid, resource=resource, **halving)
+    return HalvingRandomSearchCV(pipeline, param_grid, resource=resource, n_candidates="exhaust", **halving)
+
+
+def count_candidates(search) -> int:
+    """Jumlah kandidat yang benar-benar dievaluasi (semua iterasi halving)."""
+    return len(search.cv_results_["params"])
+
+
+class FoldCachedSearchCV:
+    """
+    Grid/random search yang mem-fit preprocessor sekali per fold.
+
+    Pada GridSearchCV biasa setiap (fold x kandidat) mem-fit ulang ColumnTransformer
+    padahal hanya parameter classifier__* yang berubah. Di sini matriks fitur tiap fold
+    dihitung sekali, lalu semua kandidat hanya mem-fit classifier pada matriks tersebut.
+    Urutan kandidat, skor dan pemilihan best_params_ sama dengan GridSearchCV /
+    RandomizedSearchCV (n_iter diisi) dengan cv & random_state yang sama.
+
+    error_score: skor untuk (kandidat, fold) yang fit-nya gagal (default NaN seperti
+    GridSearchCV, kandidat tsb. mendapat rank terakhir); 'raise' meneruskan exception.
+    """
+
+    def __init__(self, pipeline, param_grid, cv=5, scoring='accuracy', n_iter: int = None,
+                 random_state: int = 42, n_jobs: int = -1, verbose: int = 0, error_score=np.nan):
+        self.pipeline = pipeline
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_iter = n_iter
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.verbose = verbose
+        self.error_score = error_score
+
+    @staticmethod
+    def supports(pipeline, param_grid) -> bool:
+        """True jika pipeline punya langkah preprocessing dan grid hanya menyentuh langkah terakhir."""
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) < 2:
+            return False
+        prefix = pipeline.steps[-1][0] + "__"
+        grids = param_grid if isinstance(param_grid, list) else [param_grid]
+        return all(key.startswith(prefix) for grid in grids for key in grid)
+
+    def _candidates(self) -> list:
+        if self.n_iter is None:
+            return list(ParameterGrid(self.param_grid))
+        return list(ParameterSampler(self.param_grid, self.n_iter, random_state=self.random_state))
+
+    def fit(self, X, y):
+        if not self.supports(self.pipeline, self.param_grid):
+            raise ValueError("FoldCachedSearchCV hanya mendukung grid berisi parameter classifier.")
+        step_name, estimator = self.pipeline.steps[-1]
+        prefix = step_name + "__"
+        preprocessor = Pipeline(self.pipeline.steps[:-1])
+        scorer = get_scorer(self.scoring)
+        candidates = self._candidates()
+        splits = list(check_cv(self.cv, y, classifier=is_classifier(estimator)).split(X, y))
+
+        if self.verbose:
+            print(f"Fitting {len(splits)} folds for each of {len(candidates)} candidates, "
+                  f"totalling {len(splits) * len(candidates)} fits (preprocessor di-fit {len(splits)}x)")
+
+        # Preprocessing sekali per fold
+        folds = []
+        for train_idx, test_idx in splits:
+            X_tr, X_te = _take(X, train_idx), _take(X, test_idx)
+            y_tr, y_te = _take(y, train_idx), _take(y, test_idx)
+            fitted = clone(preprocessor).fit(X_tr, y_tr)
+            folds.append((fitted.transform(X_tr), y_tr, fitted.transform(X_te), y_te))
+
+        error_score = self.error_score
+
+        def fit_and_score(params, fold):
+            """Return (skor, fit_time, score_time, error) satu kandidat pada satu fold."""
+            Xt_tr, y_tr, Xt_te, y_te = fold
+            clf = clone(estimator).set_params(**{k[len(prefix):]: v for k, v in params.items()})
+            started = time.perf_counter()
+            try:
+                clf.fit(Xt_tr, y_tr)
+            except Exception as e:
+                if error_score == "raise":
+                    raise
+                return error_score, time.perf_counter() - started, 0.0, f"{type(e).__name__}: {e}"
+            fit_time = time.perf_counter() - started
+            started = time.perf_counter()
+            score = scorer(clf, Xt_te, y_te)
+            return score, fit_time, time.perf_counter() - started, None
+
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(fit_and_score)(params, fold) for params in candidates for fold in folds
+        )
+        shape = (len(candidates), len(folds))
+        scores = np.asarray([r[0] for r in results], dtype=float).reshape(shape)
+        fit_times = np.asarray([r[1] for r in results], dtype=float).reshape(shape)
+        score_times = np.asarray([r[2] for r in results], dtype=float).reshape(shape)
+        errors = [r[3] for r in results if r[3] is not None]
+        if len(errors) == len(results):
+            raise ValueError(f"Semua {len(results)} fit gagal. Contoh error: {errors[0]}")
+        if errors:
+            warnings.warn(f"{len(errors)} dari {len(results)} fit gagal, skor diisi error_score={error_score}. "
+                          f"Contoh error: {errors[0]}", FitFailedWarning)
+        means = scores.mean(axis=1)
+
+        self.cv_results_ = {
+            "params": candidates, "mean_test_score": means, "std_test_score": scores.std(axis=1),
+            "mean_fit_time": fit_times.mean(axis=1), "std_fit_time": fit_times.std(axis=1),
+            "mean_score_time": score_times.mean(axis=1), "std_score_time": score_times.std(axis=1),
+        }
+        for i in range(len(folds)):
+            self.cv_results_[f"split{i}_test_score"] = scores[:, i]
+        # Rank seperti GridSearchCV: skor seri mendapat rank sama, kandidat gagal (NaN) terakhir
+        ranked = np.where(np.isnan(means), np.nanmin(means) - 1, means)
+        ranks = rankdata(-ranked, method="min").astype(int)
+        self.cv_results_["rank_test_score"] = ranks
+
+        self.best_index_ = int(ranks.argmin())
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(means[self.best_index_])
+        self.best_estimator_ = clone(self.pipeline).set_params(**self.best_params_).fit(X, y)
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+
+def _take(data, idx):
+    return data.iloc[idx] if hasattr(data, "iloc") else data[idx]
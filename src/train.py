@@ -1,142 +1,105 @@
-# train.py (versi pipeline lengkap)
+# train.py (entry point training tunggal untuk semua model family)
+"""
+Tuning & training semua model family secara paralel dengan satu budget core.
+
+Contoh:
+    python src/train.py
+    python src/train.py --families logisticregression svc --n-jobs 4
+    python src/train.py --grid quick
+    python src/train.py --winsorize   # imputasi + winsorize jadi step pertama pipeline (di-fit per fold)
+    SEARCH_STRATEGY=random SEARCH_N_ITER=30 python src/train.py
+"""
 import os
-import pandas as pd # type: ignore
+import sys
+import json
+import argparse
 
-from sklearn.model_selection import train_test_split # type: ignore
-from sklearn.pipeline import Pipeline # type: ignore
-from sklearn.compose import ColumnTransformer # type: ignore
-from sklearn.preprocessing import StandardScaler, OneHotEncoder # type: ignore
-from sklearn.impute import SimpleImputer # type: ignore
-from sklearn.svm import SVC # type: ignore
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier # type: ignore
-from sklearn.model_selection import GridSearchCV # type: ignore
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix # type: ignore
-import joblib # type: ignore
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from xgboost import XGBClassifier # type: ignore
-
-# === 1. Load dataset ===
-df = pd.read_csv("../data/processed/heart_disease_uci_cleaned.csv")
-
-# Pisahkan fitur & target
-X = df.drop(columns=["num"])
-y = df["num"]
-
-if "id" in X.columns:
-    X = X.drop(columns=["id"])
-
-# Identifikasi kolom numerik & kategorikal
-num_cols = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
-cat_cols = X.select_dtypes(include=["object"]).columns.tolist()
-
-# === 2. Preprocessing (scaling + one-hot) ===
-num_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='mean')),
-    ('scaler', StandardScaler())
-])
-
-cat_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='most_frequent')),
-    ('onehot', OneHotEncoder(handle_unknown='ignore'))
-])
-
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', num_transformer, num_cols),
-        ('cat', cat_transformer, cat_cols)
-    ]
+from src.model_training import (
+    DATA_PATH, MODEL_DIR, MODEL_FAMILIES, PARAM_GRIDS, load_training_data, build_pipelines
 )
-
-# === 3. Split data ===
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# Simpan split data mentah (opsional)
-# os.makedirs("../data/processed", exist_ok=True)
-# X_train.to_csv("../data/train-data/X_train_raw.csv", index=False)
-# X_test.to_csv("../data/test-data/X_test_raw.csv", index=False)
-# y_train.to_csv("../data/train-data/y_train.csv", index=False)
-# y_test.to_csv("../data/test-data/y_test.csv", index=False)
-
-# === 4. Definisikan pipelines lengkap (preprocessing + model) ===
-# === 4. Pipelines lengkap ===
-pipelines = {
-    'SVC': Pipeline([
-        ('preprocessor', preprocessor),
-        ('classifier', SVC(probability=True))
-    ]),
-    'RandomForestClassifier': Pipeline([
-        ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier())
-    ]),
-    'GradientBoostingClassifier': Pipeline([
-        ('preprocessor', preprocessor),
-        ('classifier', GradientBoostingClassifier())
-    ]),
-    'XGBClassifier': Pipeline([
-        ('preprocessor', preprocessor),
-        ('classifier', XGBClassifier(eval_metric='logloss', use_label_encoder=False))
-    ])
-}
-
-# === 5. Parameter grid diperluas ===
-param_grids = {
-    'SVC': {
-        'classifier__C': [0.01, 0.1, 1, 10, 100],
-        'classifier__kernel': ['linear', 'rbf', 'poly'],
-        'classifier__gamma': ['scale', 'auto', 0.001, 0.01, 0.1, 1],
-        'classifier__class_weight': [None, 'balanced']
-    },
-    'RandomForestClassifier': {
-        'classifier__n_estimators': [100, 200, 300, 500],
-        'classifier__max_depth': [None, 10, 20, 30, 50],
-        'classifier__min_samples_split': [2, 5, 10],
-        'classifier__min_samples_leaf': [1, 2, 4],
-        'classifier__class_weight': [None, 'balanced']
-    },
-    'GradientBoostingClassifier': {
-        'classifier__n_estimators': [100, 200, 300],
-        'classifier__learning_rate': [0.01, 0.05, 0.1, 0.2],
-        'classifier__max_depth': [3, 5, 7],
-        'classifier__min_samples_split': [2, 5, 10]
-    },
-    'XGBClassifier': {
-        'classifier__n_estimators': [100, 200, 300],
-        'classifier__learning_rate': [0.01, 0.05, 0.1, 0.2],
-        'classifier__max_depth': [3, 5, 7],
-        'classifier__subsample': [0.8, 1],
-        'classifier__colsample_bytree': [0.8, 1]
+from src.orchestrator import TrainingOrchestrator
+from src.search import SEARCH_STRATEGIES
+from src.result_store import ResultStore, DEFAULT_STORE
+
+
+def halving_resources(param_grids: dict, halving_resource: str) -> dict:
+    """HALVING_RESOURCE=n_estimators hanya berlaku untuk family yang punya n_estimators di grid."""
+    return {
+        name: f"classifier__{halving_resource}"
+        if halving_resource != "n_samples" and f"classifier__{halving_resource}" in grid
+        else "n_samples"
+        for name, grid in param_grids.items()
     }
-}
 
-# === 6. Tuning hyperparameter ===
-best_models = {}
-for name, pipeline in pipelines.items():
-    print(f"\n Mulai tuning untuk {name}...")
-    grid_search = GridSearchCV(
-        pipeline,
-        param_grids[name],
-        cv=5,
-        scoring='accuracy',
-        n_jobs=-1,
-        verbose=1
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tuning & training semua model family secara paralel.")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV hasil cleaning")
+    parser.add_argument("--output-dir", default=MODEL_DIR, help="Direktori artefak *_best_pipeline.joblib")
+    parser.add_argument("--families", nargs="+", default=None,
+                        help=f"Model family yang dilatih (default: semua di grid). Pilihan: {list(MODEL_FAMILIES)}")
+    parser.add_argument("--grid", choices=list(PARAM_GRIDS), default="full",
+                        help="'full' (grid lengkap) atau 'quick' (grid kecil ala training-v2)")
+    parser.add_argument("--n-jobs", type=int, default=int(os.environ.get("TRAIN_N_JOBS", "0")) or None,
+                        help="Budget core global untuk semua fit (default: jumlah CPU)")
+    parser.add_argument("--search", choices=SEARCH_STRATEGIES, default=os.environ.get("SEARCH_STRATEGY", "grid"))
+    parser.add_argument("--n-iter", type=int, default=int(os.environ.get("SEARCH_N_ITER", "20")),
+                        help="Budget kandidat untuk search 'random'")
+    parser.add_argument("--halving-resource", default=os.environ.get("HALVING_RESOURCE", "n_samples"),
+                        help="n_samples atau n_estimators")
+    parser.add_argument("--no-early-stopping", dest="early_stopping", action="store_false",
+                        default=os.environ.get("BOOSTING_EARLY_STOPPING", "1") != "0",
+                        help="Tuning n_estimators GradientBoosting/XGB sebagai dimensi grid biasa")
+    parser.add_argument("--patience", type=int, default=20,
+                        help="Round tanpa perbaikan sebelum early stopping boosting")
+    parser.add_argument("--store", default=DEFAULT_STORE,
+                        help="File SQLite hasil tuning; fit yang sudah ada tidak diulang (env TUNING_STORE)")
+    parser.add_argument("--no-store", dest="store", action="store_const", const=None,
+                        help="Jangan baca/simpan hasil tuning")
+    parser.add_argument("--shrink-top", type=int, default=None,
+                        help="Persempit grid ke nilai dari N kandidat terbaik di store")
+    parser.add_argument("--winsorize", action="store_true",
+                        default=os.environ.get("TRAIN_WINSORIZE", "0") == "1",
+                        help="Imputasi + winsorize sebagai step 'cleaner' pertama pipeline, di-fit per fold CV (env TRAIN_WINSORIZE=1)")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--timeline", default=None, help="Simpan timeline per family ke file JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    param_grids = PARAM_GRIDS[args.grid]
+    families = args.families or list(param_grids)
+    missing = [f for f in families if f not in param_grids]
+    if missing:
+        raise KeyError(f"Tidak ada grid '{args.grid}' untuk: {missing}")
+    param_grids = {f: param_grids[f] for f in families}
+
+    store = ResultStore(args.store) if args.store else None
+    X_train, X_test, y_train, y_test = load_training_data(args.data)
+    # Cleaner di dalam pipeline: statistiknya di-fit ulang per fold CV dan saat refit, jadi
+    # fold validasi tidak ikut menentukan mean/mode/batas winsorize
+    orchestrator = TrainingOrchestrator(
+        build_pipelines(families, winsorize=args.winsorize), param_grids, n_jobs=args.n_jobs, cv=args.cv,
+        search=args.search, n_iter=args.n_iter,
+        resource=halving_resources(param_grids, args.halving_resource),
+        output_dir=args.output_dir, early_stopping=args.early_stopping, patience=args.patience,
+        store=store
     )
-    grid_search.fit(X_train, y_train)
-    best_models[name] = grid_search.best_estimator_
-    print(f"Best parameters for {name}: {grid_search.best_params_}")
-    print(f"Best CV score for {name}: {grid_search.best_score_:.4f}")
+    if store is not None and args.shrink_top:
+        # Peringkat hanya dari run dengan data split & definisi pipeline yang sama
+        orchestrator.shrink_grids(X_train, y_train, args.shrink_top)
+    results = orchestrator.run(X_train, y_train, X_test, y_test)
+
+    if args.timeline:
+        with open(args.timeline, "w") as f:
+            json.dump({"events": orchestrator.timeline,
+                       "families": {name: {k: v for k, v in r.items() if k != "model"}
+                                    for name, r in results.items()}}, f, indent=2, default=str)
+    return results
 
-# === 7. Evaluasi & simpan ===
-os.makedirs("../models", exist_ok=True)
-for name, model in best_models.items():
-    print(f"\n=== Evaluasi {name} ===")
-    y_pred = model.predict(X_test)
-    print(classification_report(y_test, y_pred))
-    print("Accuracy:", round(accuracy_score(y_test, y_pred), 4))
-    print("Confusion Matrix:\n", confusion_matrix(y_test, y_pred))
 
-    # Simpan pipeline lengkap
-    model_path = os.path.join("../models/python-models", f"{name.lower()}_best_pipeline.joblib")
-    joblib.dump(model, model_path)
-    print(f"Model pipeline lengkap disimpan ke {model_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
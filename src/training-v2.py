@@ -1,126 +1,63 @@
-# train.py
+# training-v2.py
+"""
+Training cepat (grid 'quick') untuk LogisticRegression, RandomForest dan SVC.
+Sekarang hanya pembungkus entry point tunggal `train.py`:
+
+    python src/train.py --grid quick
+
+lalu export ONNX pipeline lengkap (preprocessing + classifier, input kolom mentah)
+untuk setiap model yang dilatih, lihat onnx_export.py. Untuk aplikasi Java, models/java-models
+berisi Logreg_only.onnx (estimator saja, satu input float fitur hasil preprocessing, kontrak
+lama yang tetap dipertahankan) dan Logreg_pipeline.onnx (pipeline lengkap, input kolom mentah).
+"""
 import os
-import joblib # type: ignore
-import numpy as np
-import pandas as pd # type: ignore
+import sys
+import shutil
 
-from sklearn.model_selection import train_test_split, GridSearchCV # type: ignore
-from sklearn.pipeline import Pipeline # type: ignore
-from sklearn.compose import ColumnTransformer # type: ignore
-from sklearn.preprocessing import StandardScaler, OneHotEncoder # type: ignore
-from sklearn.impute import SimpleImputer # type: ignore
-from sklearn.svm import SVC # type: ignore
-from sklearn.linear_model import LogisticRegression # type: ignore
-from sklearn.ensemble import RandomForestClassifier # type: ignore
-from sklearn.metrics import classification_report, accuracy_score # type: ignore
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from skl2onnx import convert_sklearn  # type: ignore
-from skl2onnx.common.data_types import FloatTensorType  # type: ignore
+from src.model_training import ROOT_DIR
+from src.train import main as train_main, parse_args
+from src.onnx_export import export_all, estimator_to_onnx
 
 # ============================================================
-# 1. Load Dataset
+# 1. Tuning & simpan pipeline (joblib) lewat orkestrator
 # ============================================================
-data = pd.read_csv("../data/processed/heart_disease_uci_cleaned.csv")
-
-# Pisahkan fitur & target
-X = data.drop(columns=["num"])
-y = data["num"]
-
-if "id" in X.columns:
-    X = X.drop(columns=["id"])
-
-
-# Pisahkan kolom numerik & kategorikal
-num_cols = ["age", "trestbps", "chol", "thalch", "oldpeak", "ca"]
-cat_cols = ["sex", "cp", "fbs", "restecg", "exang", "slope", "thal"]
-
-# ============================================================
-# 2. Preprocessing Pipeline
-# ============================================================
-num_transformer = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="mean")),
-    ("scaler", StandardScaler())
-])
-
-cat_transformer = Pipeline(steps=[
-    ("imputer", SimpleImputer(strategy="most_frequent")),
-    ("onehot", OneHotEncoder(handle_unknown="ignore"))
-])
-
-preprocessor = ColumnTransformer(
-    transformers=[
-        ("num", num_transformer, num_cols),
-        ("cat", cat_transformer, cat_cols)
-    ]
-)
-
-# ============================================================
-# 3. Model Candidates
-# ============================================================
-models = {
-    "LogisticRegression": LogisticRegression(max_iter=500),
-    "RandomForest": RandomForestClassifier(),
-    "SVC": SVC(probability=True)
-}
-
-params = {
-    "LogisticRegression": {"classifier__C": [0.1, 1, 10]},
-    "RandomForest": {"classifier__n_estimators": [100, 200]},
-    "SVC": {"classifier__C": [0.1, 1, 10], "classifier__kernel": ["linear", "rbf"]}
-}
+argv = ["--grid", "quick"] + sys.argv[1:]
+results = train_main(argv)
 
 # ============================================================
-# 4. Train & Evaluate
+# 2. Save ONNX (pipeline lengkap, dicek paritasnya terhadap joblib)
 # ============================================================
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+try:
+    reports = export_all(parse_args(argv).output_dir, families=list(results))
+except ImportError as e:
+    print("Gagal convert pipeline ke ONNX:", e)
+    reports = {}
 
-best_models = {}
-
-for name, clf in models.items():
-    print(f"\n🔹 Training {name} ...")
-    pipe = Pipeline(steps=[("preprocessor", preprocessor),
-                        ("classifier", clf)])
-    grid = GridSearchCV(pipe, params[name], cv=5, n_jobs=-1)
-    grid.fit(X_train, y_train)
-
-    y_pred = grid.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-
-    print(f"Best params: {grid.best_params_}")
-    print(f"Accuracy: {acc:.4f}")
-    print(classification_report(y_test, y_pred))
-
-    best_models[name] = grid.best_estimator_
+for name, report in reports.items():
+    if report.get("passed"):
+        print(f"Pipeline {name} berhasil disimpan ke {report['path']}")
+    else:
+        print(f"Pipeline {name} tidak di-export: {report.get('error') or report}")
 
 # ============================================================
-# 5. Save Best Pipeline (Joblib)
-# ============================================================
-os.makedirs("../models", exist_ok=True)
-
-for name, model in best_models.items():
-    joblib_path = os.path.join("../models/python-models", f"{name.lower()}_best_pipeline.joblib")
-    joblib.dump(model, joblib_path)
-    print(f"Pipeline {name} disimpan ke {joblib_path}")
-
+# 3. Save ONNX untuk Java (estimator-only + pipeline lengkap)
 # ============================================================
-# 6. Save ONNX (Estimator-only untuk Java)
-# ============================================================
-if "LogisticRegression" in best_models:
-    svc_pipeline = best_models["LogisticRegression"]
-    svc_only = svc_pipeline.named_steps["classifier"]
-
+java_dir = os.path.join(ROOT_DIR, "models", "java-models")
+if results.get("logisticregression", {}).get("model") is not None:
     try:
-        n_features = len(num_cols) + len(cat_cols)
-        initial_types = [("float_input", FloatTensorType([None, n_features]))]
-
-        onnx_model = convert_sklearn(svc_only, initial_types=initial_types)
-        onnx_path = os.path.join("../models/java-models", "Logreg_only.onnx")
-
+        onnx_model = estimator_to_onnx(results["logisticregression"]["model"])
+        os.makedirs(java_dir, exist_ok=True)
+        onnx_path = os.path.join(java_dir, "Logreg_only.onnx")
         with open(onnx_path, "wb") as f:
             f.write(onnx_model.SerializeToString())
-
-        print(f"Estimator SVC-only berhasil disimpan ke {onnx_path}")
-    except Exception as e:
+        print(f"Estimator LogisticRegression-only berhasil disimpan ke {onnx_path}")
+    except ImportError as e:
         print("Gagal convert estimator ke ONNX:", e)
+
+if reports.get("logisticregression", {}).get("passed"):
+    java_path = os.path.join(java_dir, "Logreg_pipeline.onnx")
+    os.makedirs(java_dir, exist_ok=True)
+    shutil.copy(reports["logisticregression"]["path"], java_path)
+    print(f"Pipeline LogisticRegression untuk Java disimpan ke {java_path}")
@@ -2,52 +2,226 @@ import pandas as pd    # type: ignore
 import numpy as np     # type: ignore
 import joblib          # type: ignore 
 import os       
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Preprocessing data library for sklearn
 from sklearn.preprocessing import StandardScaler, OneHotEncoder  # type: ignore
 from sklearn.compose import ColumnTransformer                    # type: ignore
 from sklearn.pipeline import Pipeline                            # type: ignore
 from sklearn.impute import SimpleImputer                         # type: ignore
-from sklearn.model_selection import GridSearchCV                 # type: ignore
-
-# Import winsorize (kompatibel untuk SciPy baru & lama)
-from scipy.stats.mstats import winsorize
+from sklearn.base import BaseEstimator, TransformerMixin         # type: ignore
 
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-from sklearn.metrics import ( #type: ignore 
-    accuracy_score, precision_score, recall_score, f1_score, 
-    roc_auc_score, confusion_matrix, classification_report
-)
+# scipy (winsorize) & sklearn.metrics di-import di dalam fungsi yang memakainya: artefak
+# dengan step 'cleaner' meng-import modul ini saat unpickle di serving
+
+def _row_chunks(n_rows: int, n_jobs: int, chunksize: int = None) -> list:
+    """Bagi baris menjadi slice untuk diproses paralel."""
+    chunksize = chunksize or max(1, -(-n_rows // max(n_jobs, 1)))
+    return [slice(start, min(start + chunksize, n_rows)) for start in range(0, n_rows, chunksize)]
+
+
+def _parallel_slices(fn, n_rows: int, n_jobs: int = 1, chunksize: int = None):
+    """
+    Jalankan fn(slice) per chunk baris/kolom. Operasi NumPy (clip, sum, isnan) melepas GIL
+    sehingga thread cukup; statistik dihitung pada seluruh kolom sehingga hasil identik.
+    """
+    if n_jobs == 1 or n_rows == 0:
+        return [fn(slice(0, n_rows))]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(fn, _row_chunks(n_rows, n_jobs, chunksize)))
+
+
+def _column_modes(df: pd.DataFrame, cat_cols: list) -> dict:
+    """
+    Mode tiap kolom (nilai terkecil jika seri, sama seperti Series.mode()[0]).
+    Kolom object NumPy memakai factorize + bincount; kolom string pyarrow sudah punya
+    mode native yang lebih cepat.
+    """
+    modes = {}
+    for col in cat_cols:
+        series = df[col]
+        if series.dtype != object:
+            modes[col] = series.mode()[0]
+            continue
+        codes, uniques = pd.factorize(series, sort=True)
+        valid = codes[codes >= 0]
+        if len(valid) == 0:
+            modes[col] = series.mode()[0]  # kolom kosong: error sama seperti versi lama
+            continue
+        modes[col] = uniques[np.bincount(valid, minlength=len(uniques)).argmax()]
+    return modes
 
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
-    """Isi nilai kosong: mean untuk numerik, mode untuk kategorikal."""
+
+def _chunked_modes(df: pd.DataFrame, cat_cols: list, n_jobs: int, chunksize: int = None) -> dict:
+    """
+    Sama dengan _column_modes, tetapi value_counts dihitung paralel per chunk baris lalu
+    dijumlahkan; seri diputus ke nilai terkecil sehingga hasilnya identik.
+    """
+    chunk_counts = _parallel_slices(
+        lambda rows: [df[col].iloc[rows].value_counts() for col in cat_cols], len(df), n_jobs, chunksize
+    )
+    modes = {}
+    for j, col in enumerate(cat_cols):
+        counts = pd.concat([counts[j] for counts in chunk_counts])
+        if counts.empty:
+            modes[col] = df[col].mode()[0]  # kolom kosong: error sama seperti versi lama
+            continue
+        modes[col] = counts.groupby(level=0, sort=True).sum().idxmax()
+    return modes
+
+
+def handle_missing_values(df: pd.DataFrame, n_jobs: int = 1, chunksize: int = None) -> pd.DataFrame:
+    """
+    Isi nilai kosong: mean untuk numerik, mode untuk kategorikal.
+    Kolom float diproses sebagai satu blok NumPy lalu di-assign kembali sekaligus. Dengan
+    n_jobs > 1, pencarian NaN, hitungan mode dan pengisian dijalankan paralel per chunk baris
+    (seperti winsorize_data); mean & mode tetap dihitung dari seluruh kolom sehingga hasilnya
+    identik dengan fillna per kolom.
+    """
     num_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
     cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+    n_rows = len(df)
 
-    for col in num_cols:
-        df[col] = df[col].fillna(df[col].mean())
+    # Kolom int tidak mungkin berisi NaN, cukup kolom float yang diisi
+    float_cols = [col for col in num_cols if df[col].dtype == np.float64]
+    if float_cols:
+        block = np.asfortranarray(df[float_cols].to_numpy(dtype=np.float64, copy=True))
+        mask = np.empty(block.shape, dtype=bool, order="F")
 
-    for col in cat_cols:
-        df[col] = df[col].fillna(df[col].mode()[0])
+        def zero_nans(rows):
+            np.isnan(block[rows], out=mask[rows])
+            np.copyto(block[rows], 0.0, where=mask[rows])
+            return rows
+
+        _parallel_slices(zero_nans, n_rows, n_jobs, chunksize)
+        # Mean = jumlah pairwise (NaN dinolkan) / jumlah nilai valid, identik dengan Series.mean();
+        # kolom tanpa nilai valid tetap NaN
+        counts = n_rows - np.count_nonzero(mask, axis=0)
+        means = np.full(block.shape[1], np.nan)
+        for j in np.flatnonzero((counts > 0) & (counts < n_rows)):
+            means[j] = block[:, j].sum() / counts[j]
+
+        def fill(rows):
+            np.copyto(block[rows], means, where=mask[rows])
+            return rows
+
+        _parallel_slices(fill, n_rows, n_jobs, chunksize)
+        df[float_cols] = block
+
+    missing = [col for col in cat_cols if df[col].isna().any()]
+    if n_jobs == 1 or not missing:
+        for col, mode in _column_modes(df, missing).items():
+            df[col] = df[col].fillna(mode)
+        return df
+
+    for col, mode in _chunked_modes(df, missing, n_jobs, chunksize).items():
+        filled = _parallel_slices(lambda rows: df[col].iloc[rows].fillna(mode), n_rows, n_jobs, chunksize)
+        df[col] = pd.concat(filled)
 
     return df
 
 
-def winsorize_data(df: pd.DataFrame, limits: tuple = (0.05, 0.05)) -> pd.DataFrame:
-    """Winsorize kolom numerik untuk mengurangi efek outlier."""
+def _select_tail(col: np.ndarray, k: int, threshold: float, lower: bool):
+    """
+    Nilai urutan ke-k (0-based, ascending) dari kolom tanpa mempartisi seluruh kolom:
+    cukup kandidat di ekor (<= threshold untuk ekor bawah, >= threshold untuk ekor atas).
+    Jika kandidat tidak cukup (threshold sampel meleset), partisi seluruh kolom.
+    """
+    n = len(col)
+    if lower:
+        cand = col[col <= threshold]
+        if len(cand) > k:
+            return np.partition(cand, k)[k]
+    else:
+        cand = col[col >= threshold]
+        pos = len(cand) - (n - k)
+        if pos >= 0:
+            return np.partition(cand, pos)[pos]
+    return np.partition(col, k)[k]
+
+
+def winsorize_bounds(block: np.ndarray, limits: tuple = (0.05, 0.05), sample_size: int = 20000):
+    """
+    Batas bawah/atas tiap kolom, sama dengan scipy.stats.mstats.winsorize (inclusive=(True, True)):
+    nilai urutan ke-int(low*n) dan ke-(n - int(n*up) - 1). None jika sisi tsb tidak di-clip.
+
+    Threshold ekor diperkirakan dari sampel baris (satu np.partition untuk semua kolom),
+    lalu nilai persisnya dicari hanya di antara kandidat ekor, sehingga hasilnya tetap eksak.
+    """
+    n, n_cols = block.shape
+    low_limit, up_limit = limits
+    lowidx = int(low_limit * n) if low_limit else None
+    upidx = n - int(n * up_limit) - 1 if up_limit is not None else None
+    if n == 0 or (lowidx is None and upidx is None):
+        return None, None
+
+    # Sampel berjarak tetap + margin agar kandidat hampir selalu mencakup nilai target
+    sample = block[::max(1, n // sample_size)]
+    m = len(sample)
+    margin = 0.01 + 3.0 / np.sqrt(m)
+    kth = []
+    if lowidx is not None:
+        kth.append(min(m - 1, int((lowidx / n + margin) * m)))
+    if upidx is not None:
+        kth.append(max(0, int((upidx / n - margin) * m)))
+    sample_part = np.partition(sample, sorted(set(kth)), axis=0)
+
+    lower = upper = None
+    if lowidx is not None:
+        thresholds = sample_part[kth[0]]
+        lower = np.array([_select_tail(block[:, j], lowidx, thresholds[j], True) for j in range(n_cols)])
+    if upidx is not None:
+        thresholds = sample_part[kth[-1]]
+        upper = np.array([_select_tail(block[:, j], upidx, thresholds[j], False) for j in range(n_cols)])
+    return lower, upper
+
+
+def winsorize_data(df: pd.DataFrame, limits: tuple = (0.05, 0.05), n_jobs: int = 1,
+                   chunksize: int = None) -> pd.DataFrame:
+    """
+    Winsorize kolom numerik untuk mengurangi efek outlier.
+    Batas kuantil semua kolom dihitung dengan satu np.partition pada blok NumPy lalu
+    di-clip sekaligus (opsional paralel per chunk baris). Kolom yang berisi NaN tetap
+    memakai scipy winsorize agar hasilnya identik dengan versi lama.
+    """
     num_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    for col in num_cols:
+    if not num_cols:
+        return df
+
+    has_nan = df[num_cols].isna().any()
+    for col in has_nan[has_nan].index:
+        from scipy.stats.mstats import winsorize # type: ignore
         df[col] = winsorize(df[col], limits=limits)
-    return df
+    clean_cols = has_nan[~has_nan].index.tolist()
+    if not clean_cols:
+        return df
 
+    # Layout Fortran: tiap kolom contiguous sehingga partition per kolom tidak strided
+    block = np.asfortranarray(df[clean_cols].to_numpy(dtype=np.float64, copy=True))
+    lower, upper = winsorize_bounds(block, limits)
+    if lower is None and upper is None:
+        return df
 
-def preprocess_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Scaling numerik & one-hot encoding kategorikal."""
-    num_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+    def clip(rows):
+        np.clip(block[rows], lower, upper, out=block[rows])
+        return rows
+
+    _parallel_slices(clip, len(block), n_jobs, chunksize)
+    int_cols = [col for col in clean_cols if df[col].dtype != np.float64]
+    df[clean_cols] = block
+    if int_cols:
+        df[int_cols] = df[int_cols].astype(np.int64)
+    return df
 
+
+def build_feature_encoder(num_cols: list, cat_cols: list) -> ColumnTransformer:
+    """ColumnTransformer scaling numerik & one-hot kategorikal."""
     num_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='mean')),
         ('scaler', StandardScaler())
@@ -58,13 +232,23 @@ def preprocess_features(df: pd.DataFrame) -> pd.DataFrame:
         ('onehot', OneHotEncoder(handle_unknown='ignore'))
     ])
 
-    preprocessor = ColumnTransformer(
+    return ColumnTransformer(
         transformers=[
             ('num', num_transformer, num_cols),
             ('cat', cat_transformer, cat_cols)
         ]
     )
 
+
+def preprocess_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scaling numerik & one-hot encoding kategorikal (fit pada df ini).
+    Untuk data test/serving pakai FeaturePreprocessor yang sudah di-fit pada data train.
+    """
+    num_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+
+    preprocessor = build_feature_encoder(num_cols, cat_cols)
     df_processed = preprocessor.fit_transform(df)
 
     # Ambil nama kolom hasil transformasi
@@ -76,13 +260,152 @@ def preprocess_features(df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame(df_processed, columns=feature_names)
 
 
-def preprocess_entire_datasheet(df: pd.DataFrame, target_col: str = "num"):
+# ============================================================
+# TRANSFORMER (statistik di-fit sekali pada data train)
+# ============================================================
+def _split_columns(df: pd.DataFrame):
+    num_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    cat_cols = df.select_dtypes(include=['object']).columns.tolist()
+    return num_cols, cat_cols
+
+
+class _FrameTransformer(TransformerMixin, BaseEstimator):
+    """Dasar transformer DataFrame -> DataFrame dengan kolom yang sama."""
+
+    def _remember_columns(self, X: pd.DataFrame):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = len(X.columns)
+
+    def get_feature_names_out(self, input_features=None):
+        return self.feature_names_in_.copy()
+
+
+class MissingValueImputer(_FrameTransformer):
+    """
+    Versi fit/transform dari handle_missing_values: mean (numerik) & mode (kategorikal)
+    dipelajari saat fit lalu dipakai ulang untuk data test/serving.
+    """
+
+    def __init__(self, n_jobs: int = 1):
+        self.n_jobs = n_jobs
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._remember_columns(X)
+        num_cols, cat_cols = _split_columns(X)
+        self.fill_values_ = {col: float(X[col].mean()) for col in num_cols}
+        present = [col for col in cat_cols if X[col].notna().any()]
+        self.fill_values_.update(_column_modes(X, present))
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        X = X.copy()
+        float_cols = [col for col in self.fill_values_ if col in X.columns and X[col].dtype == np.float64]
+        if float_cols:
+            block = X[float_cols].to_numpy(dtype=np.float64, copy=True)
+            values = np.array([self.fill_values_[col] for col in float_cols])
+            np.copyto(block, np.broadcast_to(values, block.shape), where=np.isnan(block))
+            X[float_cols] = block
+        for col, value in self.fill_values_.items():
+            if col in X.columns and col not in float_cols and X[col].isna().any():
+                X[col] = X[col].fillna(value)
+        return X
+
+
+class Winsorizer(_FrameTransformer):
+    """
+    Versi fit/transform dari winsorize_data: batas kuantil tiap kolom numerik dihitung
+    sekali saat fit (dari nilai yang tidak kosong), transform hanya clip ke batas tsb.
+    """
+
+    def __init__(self, limits: tuple = (0.05, 0.05), n_jobs: int = 1):
+        self.limits = limits
+        self.n_jobs = n_jobs
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._remember_columns(X)
+        num_cols, _ = _split_columns(X)
+        self.lower_, self.upper_ = {}, {}
+        for col in num_cols:
+            values = X[col].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)].reshape(-1, 1)
+            lower, upper = winsorize_bounds(values, self.limits)
+            if lower is not None:
+                self.lower_[col] = float(lower[0])
+            if upper is not None:
+                self.upper_[col] = float(upper[0])
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        cols = [col for col in dict.fromkeys([*self.lower_, *self.upper_]) if col in X.columns]
+        X = X.copy()
+        if not cols:
+            return X
+        block = np.asfortranarray(X[cols].to_numpy(dtype=np.float64, copy=True))
+        lower = np.array([self.lower_.get(col, -np.inf) for col in cols])
+        upper = np.array([self.upper_.get(col, np.inf) for col in cols])
+
+        def clip(rows):
+            np.clip(block[rows], lower, upper, out=block[rows])
+            return rows
+
+        _parallel_slices(clip, len(block), self.n_jobs)
+        int_cols = [col for col in cols if X[col].dtype == np.int64]
+        X[cols] = block
+        if int_cols:
+            X[int_cols] = X[int_cols].astype(np.int64)
+        return X
+
+
+def build_cleaner(limits: tuple = (0.05, 0.05), n_jobs: int = 1) -> Pipeline:
+    """Imputasi + winsorize yang di-fit sekali; dipasang di depan pipeline model saat serving."""
+    return Pipeline([
+        ('imputer', MissingValueImputer(n_jobs=n_jobs)),
+        ('winsorizer', Winsorizer(limits=limits, n_jobs=n_jobs)),
+    ])
+
+
+class FeaturePreprocessor(_FrameTransformer):
+    """
+    Preprocessing lengkap preprocess_entire_datasheet sebagai transformer yang bisa
+    disimpan (joblib): imputasi -> winsorize -> scaling + one-hot. Output DataFrame
+    dengan nama fitur hasil encoding.
+    """
+
+    def __init__(self, limits: tuple = (0.05, 0.05), n_jobs: int = 1):
+        self.limits = limits
+        self.n_jobs = n_jobs
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._remember_columns(X)
+        self.cleaner_ = build_cleaner(self.limits, self.n_jobs)
+        cleaned = self.cleaner_.fit_transform(X)
+        num_cols, cat_cols = _split_columns(cleaned)
+        self.encoder_ = build_feature_encoder(num_cols, cat_cols).fit(cleaned)
+        self.feature_names_out_ = (
+            list(num_cols) +
+            list(self.encoder_.named_transformers_['cat']['onehot'].get_feature_names_out(cat_cols))
+        )
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        encoded = self.encoder_.transform(self.cleaner_.transform(X))
+        if hasattr(encoded, "toarray"):
+            encoded = encoded.toarray()
+        return pd.DataFrame(encoded, columns=self.feature_names_out_, index=X.index)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.feature_names_out_, dtype=object)
+
+
+def preprocess_entire_datasheet(df: pd.DataFrame, target_col: str = "num", preprocessor=None):
     """
     Full preprocessing:
     1. Pisahkan target
     2. Handle missing values
     3. Winsorize
     4. Scaling + One-hot encoding
+    Jika `preprocessor` (FeaturePreprocessor yang sudah di-fit) diberikan, statistiknya
+    dipakai ulang (transform saja) tanpa fit ulang.
     """
     if target_col not in df.columns:
         raise KeyError(f"Kolom target '{target_col}' tidak ditemukan.")
@@ -90,6 +413,9 @@ def preprocess_entire_datasheet(df: pd.DataFrame, target_col: str = "num"):
     y = df[target_col]
     X = df.drop(columns=[target_col])
 
+    if preprocessor is not None:
+        return preprocessor.transform(X), y
+
     X = handle_missing_values(X)
     X = winsorize_data(X)
     X = preprocess_features(X)
@@ -97,33 +423,24 @@ def preprocess_entire_datasheet(df: pd.DataFrame, target_col: str = "num"):
     return X, y
 
 
-def tune_models(pipelines, param_grids, X_train, y_train):
+def tune_models(pipelines, param_grids, X_train, y_train, search="grid", n_iter=20,
+                resource="n_samples", reports=None, cache_folds=False):
     """
     Lakukan hyperparameter tuning untuk semua pipeline model.
+    search: 'grid', 'random' (budget n_iter), 'halving-grid' atau 'halving-random'.
     Return dictionary best_models.
     """
-    best_models = {}
-    for name, pipeline in pipelines.items():
-        print(f"\nMulai tuning untuk {name}...")
-        grid_search = GridSearchCV(
-            pipeline,
-            param_grids[name],
-            cv=5,
-            scoring='accuracy',
-            n_jobs=-1,
-            verbose=1
-        )
-        grid_search.fit(X_train, y_train)
-        best_models[name] = grid_search.best_estimator_
-        print(f"Best parameters for {name}: {grid_search.best_params_}")
-        print(f"Best cross-validation accuracy for {name}: {grid_search.best_score_:.4f}")
-    return best_models
+    from src.model_training import tune_models as _tune_models
+    return _tune_models(pipelines, param_grids, X_train, y_train, cv=5, scoring='accuracy',
+                        search=search, n_iter=n_iter, resource=resource, reports=reports,
+                        cache_folds=cache_folds)
 
 
 def evaluate_model(model, X_test, y_test):
     """
     Cetak classification report & confusion matrix untuk model.
     """
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix # type: ignore
     y_pred = model.predict(X_test)
     acc = accuracy_score(y_test, y_pred)
     print("\nClassification Report:")
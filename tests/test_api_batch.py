@@ -0,0 +1,66 @@
+import sys, os
+import pytest # type: ignore
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.api_doc import app
+
+client = TestClient(app)
+
+VALID_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0,
+    "restecg": 1, "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+def test_batch_matches_single_diagnose():
+    single = client.post("/diagnose", json={"features": VALID_RECORD}).json()
+    batch = client.post("/diagnose/batch", json={"records": [VALID_RECORD]}).json()
+    assert batch["succeeded"] == 1
+    assert batch["results"][0]["result"]["diagnosis"] == single["diagnosis"]
+    assert batch["results"][0]["result"]["probability"] == single["probability"]
+
+def test_batch_keeps_order_and_reports_errors():
+    invalid = dict(VALID_RECORD, age=5)
+    records = [VALID_RECORD, invalid, dict(VALID_RECORD, age=70)]
+    body = client.post("/diagnose/batch", json={"records": records}).json()
+    assert [item["index"] for item in body["results"]] == [0, 1, 2]
+    assert body["failed"] == 1
+    assert body["results"][1]["result"] is None
+    assert body["results"][1]["errors"][0]["loc"] == ["age"]
+    assert body["results"][2]["result"] is not None
+
+def test_batch_limit():
+    from src import api_doc
+    records = [VALID_RECORD] * (api_doc.MAX_BATCH_SIZE + 1)
+    response = client.post("/diagnose/batch", json={"records": records})
+    assert response.status_code == 413
+
+def test_model_selection():
+    response = client.post("/diagnose/batch?model=svc", json={"records": [VALID_RECORD]})
+    assert response.status_code == 200
+    response = client.post("/diagnose?model=unknown", json={"features": VALID_RECORD})
+    assert response.status_code == 404
+
+def test_admin_reload_requires_token(monkeypatch):
+    from src import api_doc
+    monkeypatch.setattr(api_doc, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/reload").status_code == 403
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["reloaded"] is True
+
+def test_oversized_body_rejected_before_parsing():
+    from src import api_doc
+    padding = "x" * (api_doc.MAX_BODY_BYTES + 1)
+    response = client.post("/diagnose/batch", content=padding, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+    def chunks():
+        # Tanpa Content-Length: batas dihitung saat body dibaca
+        for _ in range(api_doc.MAX_BODY_BYTES // 65536 + 2):
+            yield b" " * 65536
+    response = client.post("/diagnose/batch", content=chunks(), headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
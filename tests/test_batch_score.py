@@ -0,0 +1,81 @@
+import sys, os
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import joblib # type: ignore
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batch_score import iter_chunks, score_stream, PredictionWriter, ColumnAligner
+
+MODEL_PATH = "../models/python-models/logisticregression_best_pipeline.joblib"
+INPUT_PATH = "../data/test-data/X_test_raw.csv"
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+def test_chunked_scoring_matches_full_frame(model, tmp_path):
+    output = str(tmp_path / "pred.csv")
+    summary = score_stream(model, iter_chunks(INPUT_PATH, chunksize=7), PredictionWriter(output), log=None)
+    X = pd.read_csv(INPUT_PATH)
+    result = pd.read_csv(output)
+    assert summary["rows"] == len(X) == len(result)
+    np.testing.assert_allclose(result["probability"], model.predict_proba(X)[:, 1])
+    assert (result["prediction"] == model.predict(X)).all()
+
+def test_jsonl_input_with_missing_column(model, tmp_path):
+    source = tmp_path / "input.jsonl"
+    pd.read_csv(INPUT_PATH).drop(columns=["chol"]).to_json(source, orient="records", lines=True)
+    output = str(tmp_path / "pred.jsonl")
+    score_stream(model, iter_chunks(str(source), chunksize=10), PredictionWriter(output), log=None)
+    result = pd.read_json(output, lines=True)
+    assert result["chol"].isna().all()
+    assert result["probability"].notna().all()
+
+def test_aligner_plans_once_per_schema(model):
+    align = ColumnAligner(model)
+    chunk = pd.read_csv(INPUT_PATH)[align.columns]
+    assert align(chunk) is chunk
+
+def test_parquet_roundtrip(model, tmp_path):
+    pytest.importorskip("pyarrow")
+    source = str(tmp_path / "input.parquet")
+    pd.read_csv(INPUT_PATH).to_parquet(source)
+    output = str(tmp_path / "pred.parquet")
+    score_stream(model, iter_chunks(source, chunksize=16), PredictionWriter(output), log=None)
+    assert len(pd.read_parquet(output)) == len(pd.read_csv(INPUT_PATH))
+
+def test_parallel_scoring_keeps_input_order(model, tmp_path):
+    from src.batch_score import score_parallel, plan_byte_shards
+    header, ranges = plan_byte_shards(INPUT_PATH, 5)
+    assert ranges[0][0] == len(header) and ranges[-1][1] == os.path.getsize(INPUT_PATH)
+
+    sequential = str(tmp_path / "seq.csv")
+    parallel = str(tmp_path / "par.csv")
+    score_stream(model, iter_chunks(INPUT_PATH, chunksize=8), PredictionWriter(sequential), log=None)
+    summary = score_parallel(MODEL_PATH, INPUT_PATH, parallel, workers=2, chunksize=8, log=None)
+    assert summary["rows"] == len(pd.read_csv(INPUT_PATH))
+    pd.testing.assert_frame_equal(pd.read_csv(sequential), pd.read_csv(parallel))
+
+def test_keep_columns_pass_through_for_join(model, tmp_path):
+    from src.batch_score import main
+    source = tmp_path / "input.csv"
+    X = pd.read_csv(INPUT_PATH)
+    X.insert(0, "id", np.arange(1000, 1000 + len(X)))
+    X["site"] = "clinic-" + (X.index % 3).astype(str)
+    X.sample(frac=1, random_state=0).to_csv(source, index=False)
+    for workers in (1, 2):
+        output = str(tmp_path / f"pred-{workers}.csv")
+        main([str(source), "-o", output, "--id-column", "id", "--keep-columns", "site",
+              "--chunksize", "16", "--workers", str(workers)])
+        result = pd.read_csv(output)
+        assert list(result.columns[:2]) == ["id", "site"]
+        joined = X.merge(result[["id", "site", "probability"]], on=["id", "site"])
+        assert len(joined) == len(X)
+        np.testing.assert_allclose(joined["probability"], model.predict_proba(joined[X.columns[1:-1]])[:, 1])
+
+def test_missing_keep_column_is_reported(model):
+    from src.batch_score import score_frame
+    with pytest.raises(KeyError):
+        score_frame(model, pd.read_csv(INPUT_PATH), ColumnAligner(model), keep_columns=["id"])
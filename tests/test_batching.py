@@ -0,0 +1,49 @@
+import sys, os, threading
+import numpy as np # type: ignore
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.batching import MicroBatcher
+
+def fake_predict(records):
+    ages = np.array([r["age"] for r in records], dtype=float)
+    return (ages > 50).astype(int), np.c_[1 - ages / 100, ages / 100]
+
+def test_concurrent_requests_are_coalesced():
+    calls = []
+    def predict_fn(records):
+        calls.append(len(records))
+        return fake_predict(records)
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+    results = {}
+    def worker(age):
+        results[age] = batcher.predict({"age": age}, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(age,)) for age in range(30, 62)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Setiap request mendapat hasilnya sendiri
+    for age, (label, proba) in results.items():
+        assert label == int(age > 50)
+        assert proba[1] == pytest.approx(age / 100)
+    assert max(calls) <= 8
+    assert len(calls) < len(threads)
+
+    stats = batcher.stats()
+    assert stats["requests"] == len(threads)
+    assert stats["batches"] == len(calls)
+    assert sum(stats["batch_size_histogram"].values()) == len(calls)
+
+def test_errors_propagate_to_each_request():
+    def predict_fn(records):
+        raise RuntimeError("model error")
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.predict({"age": 40}, timeout=5)
+    assert batcher.stats()["errors"] == 1
@@ -0,0 +1,60 @@
+import os
+import sys
+import pytest # type: ignore
+import numpy as np # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sklearn.datasets import make_classification # type: ignore
+from sklearn.ensemble import GradientBoostingClassifier # type: ignore
+from sklearn.metrics import accuracy_score # type: ignore
+
+from src.boosting import collapse_rounds, fit_staged, best_rounds, supports_staged
+
+
+@pytest.fixture
+def data():
+    X, y = make_classification(n_samples=300, n_features=8, random_state=0)
+    return X[:200], y[:200], X[200:], y[200:]
+
+
+def test_collapse_rounds_removes_dimension():
+    grid = {'classifier__n_estimators': [100, 200, 300], 'classifier__max_depth': [3, 5]}
+    reduced, checkpoints = collapse_rounds(grid, step=50)
+    assert reduced == {'classifier__max_depth': [3, 5]}
+    assert checkpoints == [50, 100, 150, 200, 250, 300]
+    assert supports_staged(GradientBoostingClassifier(), grid, "accuracy")
+    assert not supports_staged(GradientBoostingClassifier(), grid, "balanced_accuracy")
+
+
+def test_staged_scores_match_separate_fits(data):
+    X_tr, y_tr, X_te, y_te = data
+    checkpoints = [10, 20, 40]
+    # patience besar: tidak berhenti lebih awal, skor checkpoint = model dengan n_estimators tsb
+    scores, trained = fit_staged(GradientBoostingClassifier(random_state=0), X_tr, y_tr, X_te, y_te,
+                                 checkpoints, patience=1000, validation_fraction=0.1)
+    assert trained == 40
+    for k, score in zip(checkpoints, scores):
+        clf = GradientBoostingClassifier(random_state=0, n_estimators=k, n_iter_no_change=1000,
+                                         validation_fraction=0.1).fit(X_tr, y_tr)
+        assert score == pytest.approx(accuracy_score(y_te, clf.predict(X_te)))
+
+
+def test_early_stopping_pads_remaining_checkpoints(data):
+    X_tr, y_tr, X_te, y_te = data
+    checkpoints = list(range(10, 501, 10))
+    scores, trained = fit_staged(GradientBoostingClassifier(learning_rate=0.5), X_tr, y_tr, X_te, y_te,
+                                 checkpoints, patience=3)
+    assert trained < 500
+    assert np.all(scores[[k >= trained for k in checkpoints]] == scores[-1])
+    rounds, score = best_rounds(np.vstack([scores, scores]), checkpoints)
+    assert rounds in checkpoints and score == scores.max()
+
+
+def test_xgb_early_stopping(data):
+    pytest.importorskip("xgboost")
+    from xgboost import XGBClassifier # type: ignore
+    X_tr, y_tr, X_te, y_te = data
+    scores, trained = fit_staged(XGBClassifier(eval_metric='logloss', learning_rate=0.5), X_tr, y_tr,
+                                 X_te, y_te, [50, 100, 300], patience=5)
+    assert trained < 300 and scores.shape == (3,)
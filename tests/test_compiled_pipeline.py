@@ -0,0 +1,45 @@
+import sys, os, json
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import joblib # type: ignore
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.compiled_pipeline import compile_pipeline
+
+MODEL_DIR = "../models/python-models"
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(os.path.join(MODEL_DIR, "logisticregression_best_pipeline.joblib"))
+
+def test_parity_on_test_split(model):
+    X = pd.read_csv("../data/test-data/X_test_raw.csv")
+    compiled = compile_pipeline(model)
+    expected = model.predict_proba(X)
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+def test_parity_single_record_dict_and_row(model):
+    X = pd.read_csv("../data/test-data/X_test_raw.csv")
+    compiled = compile_pipeline(model)
+    expected = model.predict_proba(X)
+    for i, record in enumerate(X.to_dict(orient="records")):
+        np.testing.assert_allclose(compiled.predict_proba_one(record), expected[i], atol=1e-12)
+    row = X[compiled.feature_names].to_numpy(dtype=object)[0]
+    np.testing.assert_allclose(compiled.predict_proba_one(row), expected[0], atol=1e-12)
+
+def test_parity_with_missing_and_integer_inputs(model):
+    with open("../data/raw/sample_test_data.json") as f:
+        records = json.load(f)
+    records[0]["chol"] = None
+    records[1]["cp"] = np.nan
+    compiled = compile_pipeline(model)
+    expected = model.predict_proba(pd.DataFrame(records))
+    np.testing.assert_allclose(compiled.predict_proba(records), expected, atol=1e-12)
+
+def test_unsupported_classifier_raises():
+    forest = joblib.load(os.path.join(MODEL_DIR, "randomforest_best_pipeline.joblib"))
+    with pytest.raises(ValueError):
+        compile_pipeline(forest)
@@ -0,0 +1,42 @@
+import sys, os, shutil
+import pandas as pd # type: ignore
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data_cache import read_dataset, build_cache, cache_path, cached_hash, source_hash
+from src.model_training import load_training_data
+
+SOURCE = "../data/processed/heart_disease_uci_cleaned.csv"
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "heart_disease_uci_cleaned.csv"
+    shutil.copy(SOURCE, path)
+    return str(path)
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_cache_is_written_and_reused(csv_path, fmt):
+    first = read_dataset(csv_path, fmt)
+    path = cache_path(csv_path, fmt)
+    assert os.path.exists(path) and cached_hash(path) == source_hash(csv_path)
+    assert isinstance(first["thal"].dtype, pd.CategoricalDtype) and first["fbs"].dtype == bool
+
+    mtime = os.path.getmtime(path)
+    pd.testing.assert_frame_equal(read_dataset(csv_path, fmt), first)
+    assert os.path.getmtime(path) == mtime, "cache yang masih valid tidak boleh ditulis ulang"
+
+def test_stale_cache_falls_back_to_csv(csv_path):
+    read_dataset(csv_path)
+    df = pd.read_csv(csv_path).head(10)
+    df.to_csv(csv_path, index=False)
+    assert len(read_dataset(csv_path)) == 10
+    assert cached_hash(cache_path(csv_path)) == source_hash(csv_path)
+
+def test_chunked_cache_and_training_split_match_csv(csv_path):
+    build_cache(csv_path, chunksize=50)
+    X_cached, _, y_cached, _ = load_training_data(csv_path)
+    os.remove(cache_path(csv_path))
+    X_csv, _, y_csv, _ = load_training_data(csv_path)
+    pd.testing.assert_frame_equal(X_cached, X_csv)
+    pd.testing.assert_series_equal(y_cached, y_csv)
@@ -0,0 +1,81 @@
+import os
+import sys
+import pytest # type: ignore
+import numpy as np # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib # type: ignore
+
+from src.model_training import load_training_data, build_pipelines
+from src.incremental import warm_update, incremental_retrain
+
+DATA_PATH = "../data/processed/heart_disease_uci_cleaned.csv"
+
+
+@pytest.fixture(scope="module")
+def split():
+    X_train, X_test, y_train, y_test = load_training_data(DATA_PATH)
+    # 2/3 data train sebagai data "lama", sisanya data berlabel baru
+    cut = len(X_train) * 2 // 3
+    return X_train[:cut], y_train[:cut], X_train[cut:], y_train[cut:], X_test, y_test
+
+
+def dense(X):
+    return X.toarray() if hasattr(X, "toarray") else X
+
+
+def fitted(family, X, y, **params):
+    return build_pipelines([family])[family].set_params(**params).fit(X, y)
+
+
+@pytest.mark.parametrize("family,param,extra", [
+    ("randomforestclassifier", "n_estimators", 5),
+    ("gradientboostingclassifier", "n_estimators", 5),
+])
+def test_warm_update_adds_estimators_and_keeps_preprocessor(split, family, param, extra):
+    X_old, y_old, X_new, y_new, _, _ = split
+    model = fitted(family, X_old, y_old, **{f"classifier__{param}": 10})
+    updated = warm_update(model, X_new, y_new, extra_estimators=extra, extra_rounds=extra)
+
+    assert updated.named_steps['classifier'].get_params()[param] == 10 + extra
+    assert updated.named_steps['classifier'].warm_start is False
+    # Model asli tidak berubah, preprocessor tetap memakai statistik data lama
+    assert model.named_steps['classifier'].get_params()[param] == 10
+    np.testing.assert_array_equal(dense(updated[:-1].transform(X_new)), dense(model[:-1].transform(X_new)))
+
+
+def test_xgb_continues_boosting(split):
+    pytest.importorskip("xgboost")
+    X_old, y_old, X_new, y_new, _, _ = split
+    model = fitted("xgbclassifier", X_old, y_old, classifier__n_estimators=20)
+    updated = warm_update(model, X_new, y_new, extra_rounds=10)
+    assert updated.named_steps['classifier'].get_booster().num_boosted_rounds() == 30
+
+
+def test_unsupported_classifier_raises(split):
+    X_old, y_old, X_new, y_new, _, _ = split
+    with pytest.raises(ValueError):
+        warm_update(fitted("svc", X_old, y_old), X_new, y_new)
+
+
+def test_promotion_gate(split, tmp_path):
+    X_old, y_old, X_new, y_new, X_test, y_test = split
+    path = tmp_path / "logisticregression_best_pipeline.joblib"
+    joblib.dump(fitted("logisticregression", X_old, y_old), path)
+    mtime = os.path.getmtime(path)
+
+    report = incremental_retrain("logisticregression", X_new, y_new, X_test, y_test, X_old, y_old,
+                                 model_dir=str(tmp_path), tolerance=1.0, dry_run=True, log=None)
+    assert report["promoted"] and not report["saved"]
+    assert os.path.getmtime(path) == mtime
+
+    report = incremental_retrain("logisticregression", X_new, y_new, X_test, y_test, X_old, y_old,
+                                 model_dir=str(tmp_path), tolerance=1.0, log=None)
+    assert report["saved"]
+    assert joblib.load(path).named_steps['classifier'].warm_start is False
+
+    # Tolerance -1: model baru harus 1.0 lebih akurat dari model lama, jadi selalu ditolak
+    report = incremental_retrain("logisticregression", X_new, y_new, X_test, y_test,
+                                 model_dir=str(tmp_path), tolerance=-1.0, log=None)
+    assert not report["promoted"]
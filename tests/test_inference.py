@@ -0,0 +1,47 @@
+import sys, os
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import joblib # type: ignore
+from sklearn.svm import SVC # type: ignore
+from sklearn.base import clone # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.inference import predict_with_proba
+
+MODEL_PATH = "../models/python-models/logisticregression_best_pipeline.joblib"
+
+def test_predict_with_proba_matches_pipeline():
+    model = joblib.load(MODEL_PATH)
+    X = pd.read_csv("../data/test-data/X_test_raw.csv")
+    preds, proba = predict_with_proba(model, X)
+    np.testing.assert_allclose(proba, model.predict_proba(X))
+    assert (preds == model.predict(X)).all()
+
+def test_threshold_changes_labels():
+    model = joblib.load(MODEL_PATH)
+    X = pd.read_csv("../data/test-data/X_test_raw.csv")
+    preds_low, _ = predict_with_proba(model, X, threshold=0.0)
+    preds_high, _ = predict_with_proba(model, X, threshold=1.01)
+    assert (preds_low == 1).all()
+    assert (preds_high == 0).all()
+
+def test_decision_function_fallback_matches_predict():
+    from src.model_training import load_training_data
+    X_train, X_test, y_train, _ = load_training_data()
+    # Preprocessor artefak asli + SVC tanpa probability -> jalur decision_function
+    model = clone(joblib.load("../models/python-models/svc_best_pipeline.joblib"))
+    model.set_params(classifier=SVC()).fit(X_train, y_train)
+    assert not hasattr(model.steps[-1][1], "predict_proba")
+    preds, proba = predict_with_proba(model, X_test)
+    assert proba.shape == (len(X_test), 2)
+    assert (preds == model.predict(X_test)).all()
+
+def test_decision_function_fallback_zero_margin_is_negative_class():
+    from sklearn.svm import LinearSVC # type: ignore
+    model = LinearSVC().fit(np.array([[-1.0], [1.0]]), np.array([0, 1]))
+    model.coef_, model.intercept_ = np.array([[1.0]]), np.array([0.0])
+    X = np.array([[-1.0], [0.0], [1.0]])
+    preds, proba = predict_with_proba(model, X)
+    assert proba[1, 1] == 0.5
+    assert (preds == model.predict(X)).all() and preds[1] == 0
@@ -0,0 +1,103 @@
+import sys, os, time, asyncio, threading
+import pytest # type: ignore
+
+pytest.importorskip("httpx")
+import httpx # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.inference_pool import InferencePool, QueueFullError
+import src.api_doc as api_doc
+
+VALID_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0,
+    "restecg": 1, "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+def test_pool_rejects_when_queue_full():
+    pool = InferencePool(workers=1, max_queue=1, retry_after_s=2)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(QueueFullError) as info:
+            await pool.run(time.sleep, 0)
+        assert info.value.retry_after_s == 2
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["completed"] == 2 and stats["rejected"] == 1 and stats["in_flight"] == 0
+    pool.shutdown()
+
+def test_pool_without_workers_runs_inline():
+    pool = InferencePool(workers=0)
+    assert asyncio.run(pool.run(threading.current_thread)) is threading.main_thread()
+
+def _serve(requests):
+    async def run():
+        transport = httpx.ASGITransport(app=api_doc.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await requests(client)
+    return asyncio.run(run())
+
+def test_health_check_stays_responsive_during_inference(monkeypatch):
+    def slow_predict(rows, model_name=None):
+        time.sleep(0.3)
+        return [0] * len(rows), [[0.9, 0.1]] * len(rows)
+    monkeypatch.setattr(api_doc, "predict_rows", slow_predict)
+    monkeypatch.setattr(api_doc, "inference_pool", InferencePool(workers=4, max_queue=4))
+
+    async def requests(client):
+        diagnoses = [asyncio.ensure_future(client.post("/diagnose", json={"features": VALID_RECORD}))
+                     for _ in range(4)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        health = await client.get("/")
+        health_s = time.perf_counter() - started
+        return health, health_s, await asyncio.gather(*diagnoses)
+
+    health, health_s, diagnoses = _serve(requests)
+    assert health.status_code == 200 and health_s < 0.2
+    assert [r.status_code for r in diagnoses] == [200] * 4
+
+def test_full_queue_returns_503_with_retry_after(monkeypatch):
+    release = threading.Event()
+
+    def blocked_predict(rows, model_name=None):
+        release.wait()
+        return [0], [[1.0, 0.0]]
+    monkeypatch.setattr(api_doc, "predict_rows", blocked_predict)
+    monkeypatch.setattr(api_doc, "inference_pool", InferencePool(workers=1, max_queue=0, retry_after_s=3))
+
+    async def requests(client):
+        first = asyncio.ensure_future(client.post("/diagnose", json={"features": VALID_RECORD}))
+        await asyncio.sleep(0.05)
+        rejected = await client.post("/diagnose", json={"features": VALID_RECORD})
+        release.set()
+        return rejected, await first
+
+    rejected, first = _serve(requests)
+    assert rejected.status_code == 503 and rejected.headers["retry-after"] == "3"
+    assert first.status_code == 200
+
+def test_admin_reload_does_not_block_event_loop(monkeypatch):
+    def slow_reload(name=None):
+        time.sleep(0.3)
+        return {"loads": 1}
+    monkeypatch.setattr(api_doc.registry, "reload", slow_reload)
+    monkeypatch.setattr(api_doc, "ADMIN_TOKEN", "secret")
+
+    async def requests(client):
+        # Diukur dari saat reload dikirim: reload yang memblok loop menahan health check >= 0.3 s
+        started = time.perf_counter()
+        reload = asyncio.ensure_future(client.post("/admin/reload", headers={"X-Admin-Token": "secret"}))
+        await asyncio.sleep(0.05)
+        health = await client.get("/")
+        return health, time.perf_counter() - started, await reload
+
+    health, health_s, reload = _serve(requests)
+    assert health.status_code == 200 and health_s < 0.2
+    assert reload.status_code == 200 and reload.json()["reloaded"] is True
@@ -0,0 +1,85 @@
+import sys, os, time
+import urllib.request
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.metrics import Metrics, Histogram, start_metrics_server, metrics
+
+VALID_RECORD = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0,
+    "restecg": 1, "thalch": 150, "exang": 0, "oldpeak": 1.2, "slope": 1, "ca": 0, "thal": 2
+}
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram(buckets=(0.001, 0.01))
+    for value in (0.0005, 0.001, 0.005, 1.0):
+        h.observe(value)
+    assert h.cumulative() == [(0.001, 2), (0.01, 3), (float("inf"), 4)]
+    assert h.count == 4 and h.sum == pytest.approx(1.0065)
+
+def test_render_prometheus_text():
+    m = Metrics(buckets=(0.01,))
+    with m.stage("preprocess"):
+        pass
+    m.count_request("/diagnose", 200)
+    m.count_error("/diagnose", 'Value"Error')
+    text = m.render()
+    assert '# TYPE heart_stage_duration_seconds histogram' in text
+    assert 'heart_stage_duration_seconds_bucket{stage="preprocess",le="+Inf"} 1' in text
+    assert 'heart_requests_total{endpoint="/diagnose",status="200"} 1' in text
+    assert 'heart_errors_total{endpoint="/diagnose",type="Value\\"Error"} 1' in text
+
+def test_disabled_metrics_skip_stages():
+    m = Metrics(enabled=False)
+    with m.stage("classifier"):
+        pass
+    assert m.snapshot()["stages"] == {}
+
+def test_stage_overhead_is_small():
+    m = Metrics()
+    started = time.perf_counter()
+    for _ in range(10000):
+        with m.stage("classifier"):
+            pass
+    assert (time.perf_counter() - started) / 10000 < 50e-6
+
+def test_fastapi_metrics_endpoint():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient # type: ignore
+    from src.api_doc import app
+    client = TestClient(app)
+    metrics.reset()
+    assert client.post("/diagnose", json={"features": VALID_RECORD}).status_code == 200
+    assert client.post("/diagnose", json={"features": dict(VALID_RECORD, age=5)}).status_code == 422
+    text = client.get("/metrics").text
+    for stage in ("validation", "dataframe", "preprocess", "classifier", "render", "request"):
+        assert f'heart_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'heart_requests_total{endpoint="/diagnose",status="422"} 1' in text
+    assert 'heart_errors_total{endpoint="/diagnose",type="RequestValidationError"} 1' in text
+    assert 'heart_model_info{model="logisticregression"' in text
+
+def test_flask_metrics_endpoint():
+    from app.app import app
+    client = app.test_client()
+    metrics.reset()
+    form = {k: str(v) for k, v in VALID_RECORD.items()}
+    assert client.post("/predict-form", data=form).status_code == 200
+    client.post("/predict-form", data=dict(form, age="abc"))
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert 'heart_stage_duration_seconds_count{stage="render"} 1' in text
+    assert 'heart_requests_total{endpoint="/predict-form",status="200"} 2' in text
+    assert 'heart_errors_total{endpoint="/predict-form",type="ValueError"} 1' in text
+
+def test_metrics_server():
+    m = Metrics()
+    m.count_request("predict", "ok")
+    server = start_metrics_server(0, host="127.0.0.1", metrics_=m)
+    try:
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+        assert 'heart_requests_total{endpoint="predict",status="ok"} 1' in body
+    finally:
+        server.shutdown()
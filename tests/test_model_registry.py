@@ -0,0 +1,115 @@
+import sys, os, shutil, time
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model_registry import ModelRegistry, model_name_from_path
+
+SOURCE = "../models/python-models/logisticregression_best_pipeline.joblib"
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for name in ["logisticregression", "svc"]:
+        shutil.copy(SOURCE, tmp_path / f"{name}_best_pipeline.joblib")
+    return str(tmp_path)
+
+def test_model_name_from_path():
+    assert model_name_from_path("models/xgbclassifier_best_pipeline.joblib") == "xgbclassifier"
+
+def test_discover_is_lazy(model_dir):
+    registry = ModelRegistry(model_dir, max_loaded=2)
+    assert registry.available() == ["logisticregression", "svc"]
+    assert registry.loaded() == []
+    registry.get()
+    assert registry.loaded() == ["logisticregression"]
+    stats = registry.stats()["logisticregression"]
+    assert stats["loaded"] and stats["load_time_s"] >= 0
+
+def test_lru_eviction(model_dir):
+    registry = ModelRegistry(model_dir, max_loaded=1)
+    first = registry.get("logisticregression")
+    assert registry.get("logisticregression") is first
+    registry.get("svc")
+    assert registry.loaded() == ["svc"]
+    assert registry.stats()["logisticregression"]["loaded"] is False
+
+def test_preload_more_models_than_cache_size(tmp_path):
+    names = ["logisticregression", "randomforest", "xgbclassifier"]
+    for name in names:
+        shutil.copy(SOURCE, tmp_path / f"{name}_best_pipeline.joblib")
+    registry = ModelRegistry(str(tmp_path), max_loaded=2)
+    registry.preload(names)
+    assert sorted(registry.loaded()) == names
+    assert registry.max_loaded == 3
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def touch(path, offset=10):
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime + offset, mtime + offset))
+
+def test_changed_file_is_swapped_in_background(model_dir):
+    registry = ModelRegistry(model_dir, max_loaded=2)
+    first = registry.get("svc")
+    touch(os.path.join(model_dir, "svc_best_pipeline.joblib"))
+    # Request selama reload tetap dilayani model lama
+    assert registry.get("svc") is first
+    assert wait_until(lambda: registry.stats()["svc"]["loads"] == 2)
+    assert registry.get("svc") is not first
+
+def test_failed_smoke_test_keeps_old_model(model_dir):
+    calls = []
+    def smoke_test(model):
+        calls.append(model)
+        if len(calls) > 1:
+            raise ValueError("output tidak valid")
+
+    registry = ModelRegistry(model_dir, smoke_test=smoke_test)
+    first = registry.get("svc")
+    touch(os.path.join(model_dir, "svc_best_pipeline.joblib"))
+    with pytest.raises(ValueError):
+        registry.reload("svc")
+    assert registry.get("svc") is first
+    assert "output tidak valid" in registry.stats()["svc"]["last_error"]
+
+def test_watcher_detects_changes(model_dir):
+    registry = ModelRegistry(model_dir, watch_interval=0.05)
+    first = registry.get()
+    touch(os.path.join(model_dir, "logisticregression_best_pipeline.joblib"))
+    assert wait_until(lambda: registry.get() is not first)
+
+def test_unknown_model(model_dir):
+    registry = ModelRegistry(model_dir)
+    with pytest.raises(KeyError):
+        registry.get("xgbclassifier")
+
+def test_mmap_mode_gives_same_predictions(model_dir):
+    from src.inference import smoke_test, predict_records, FEATURE_NAMES, SMOKE_RECORD
+    plain = ModelRegistry(model_dir).get()
+    mapped = ModelRegistry(model_dir, mmap_mode="r").get()
+    smoke_test(mapped)
+    _, expected = predict_records(plain, [SMOKE_RECORD], FEATURE_NAMES)
+    _, actual = predict_records(mapped, [SMOKE_RECORD], FEATURE_NAMES)
+    assert (expected == actual).all()
+
+def test_embedded_cleaner_is_served_and_legacy_preprocessor_ignored(model_dir):
+    from src.model_training import load_training_data, build_pipelines, save_model
+    from src.utils import build_cleaner
+    X_train, _, y_train, _ = load_training_data("../data/processed/heart_disease_uci_cleaned.csv")
+    cleaned = build_pipelines(["svc"], winsorize=True)["svc"].fit(X_train, y_train)
+    save_model(cleaned, os.path.join(model_dir, "svc_best_pipeline.joblib"))
+    # File <nama>_preprocessor.joblib dari versi lama tidak terdaftar sebagai model
+    save_model(build_cleaner().fit(X_train), os.path.join(model_dir, "svc_preprocessor.joblib"))
+
+    registry = ModelRegistry(model_dir)
+    assert registry.available() == ["logisticregression", "svc"]
+    model = registry.get("svc")
+    assert list(model.named_steps) == ["cleaner", "preprocessor", "classifier"]
+    assert "cleaner" not in registry.get("logisticregression").named_steps
+    assert (model.predict_proba(X_train.head()) == cleaned.predict_proba(X_train.head())).all()
@@ -0,0 +1,82 @@
+import sys, os, glob, shutil
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import pytest # type: ignore
+
+pytest.importorskip("skl2onnx")
+pytest.importorskip("onnxruntime")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.onnx_export import export_model, input_spec, estimator_to_onnx
+from src.onnx_backend import OnnxPipeline, onnx_path
+from src.inference import prepare_model, predict_records, smoke_test, FEATURE_NAMES
+
+MODEL_DIR = "../models/python-models"
+
+@pytest.fixture(scope="module")
+def X():
+    return pd.read_csv("../data/test-data/X_test_raw.csv")
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "logisticregression_best_pipeline.joblib"
+    shutil.copy(os.path.join(MODEL_DIR, "logisticregression_best_pipeline.joblib"), path)
+    return str(path)
+
+def test_input_spec_marks_boolean_columns():
+    import joblib # type: ignore
+    spec = dict(input_spec(joblib.load(os.path.join(MODEL_DIR, "logisticregression_best_pipeline.joblib"))))
+    assert spec["age"] == "num" and spec["cp"] == "str"
+    assert spec["fbs"] == "bool" and spec["exang"] == "bool"
+
+def test_export_parity_and_records(model_path, X):
+    import joblib # type: ignore
+    report = export_model(model_path, X)
+    assert report["passed"] and report["max_abs_diff"] < 1e-4
+    assert report["path"] == onnx_path(model_path)
+
+    model = joblib.load(model_path)
+    onnx_model = prepare_model(model, mode="onnx", path=model_path)
+    assert isinstance(onnx_model, OnnxPipeline)
+    smoke_test(onnx_model)
+    records = X.head(10).astype(object).where(X.head(10).notna(), None).to_dict("records")
+    records[0]["fbs"], records[1]["exang"], records[2]["chol"] = 1, np.nan, None
+    _, expected = predict_records(model, records, FEATURE_NAMES)
+    _, actual = predict_records(onnx_model, records, FEATURE_NAMES)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+
+def test_estimator_only_graph_keeps_java_contract(model_path, X):
+    import joblib # type: ignore
+    import onnxruntime as ort # type: ignore
+    model = joblib.load(model_path)
+    session = ort.InferenceSession(estimator_to_onnx(model).SerializeToString(),
+                                   providers=["CPUExecutionProvider"])
+    (feed,) = session.get_inputs()
+    features = model[:-1].transform(X)
+    assert feed.name == "float_input" and feed.shape[1] == features.shape[1]
+    labels, proba = session.run(None, {"float_input": np.asarray(features, dtype=np.float32)})
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_allclose([[p[c] for c in model.classes_] for p in proba], model.predict_proba(X), atol=1e-4)
+
+def test_missing_or_stale_onnx_falls_back_to_sklearn(model_path, X):
+    import joblib # type: ignore
+    model = joblib.load(model_path)
+    with pytest.warns(UserWarning, match="ONNX mode"):
+        assert prepare_model(model, mode="onnx", path=model_path) is model
+
+    export_model(model_path, X)
+    with open(model_path, "ab") as f:
+        f.write(b"\0")  # artefak joblib berubah -> file ONNX basi
+    with pytest.warns(UserWarning, match="basi"):
+        assert prepare_model(model, mode="onnx", path=model_path) is model
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(MODEL_DIR, "*_pipeline.onnx")) +
+                                        glob.glob("../app/models/*_pipeline.onnx")))
+def test_committed_onnx_artifacts_match_joblib(path, X):
+    import joblib # type: ignore
+    from src.onnx_backend import load_onnx, ONNX_SUFFIX
+    model_path = path.replace(ONNX_SUFFIX, "_best_pipeline.joblib")
+    onnx_model = load_onnx(model_path)  # ValueError jika file ONNX basi
+    expected = joblib.load(model_path).predict_proba(X)
+    np.testing.assert_allclose(onnx_model.predict_proba(X), expected, atol=1e-4)
@@ -0,0 +1,123 @@
+import os
+import sys
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib # type: ignore
+from sklearn.model_selection import GridSearchCV # type: ignore
+
+from src.model_training import load_training_data, build_pipelines
+from src.orchestrator import TrainingOrchestrator, plan_candidates
+
+DATA_PATH = "../data/processed/heart_disease_uci_cleaned.csv"
+
+GRIDS = {
+    'logisticregression': {'classifier__C': [0.1, 1, 10]},
+    'randomforestclassifier': {'classifier__n_estimators': [10, 20], 'classifier__max_depth': [3]},
+}
+
+
+@pytest.fixture(scope="module")
+def split():
+    return load_training_data(DATA_PATH)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_orchestrator_matches_grid_search_and_saves(split, tmp_path, n_jobs):
+    X_train, X_test, y_train, y_test = split
+    lines = []
+    orchestrator = TrainingOrchestrator(build_pipelines(['logisticregression']),
+                                        {'logisticregression': GRIDS['logisticregression']},
+                                        n_jobs=n_jobs, cv=3, output_dir=str(tmp_path), log=lines.append)
+    results = orchestrator.run(X_train, y_train, X_test, y_test)
+
+    reference = GridSearchCV(build_pipelines(['logisticregression'])['logisticregression'],
+                             GRIDS['logisticregression'], cv=3).fit(X_train, y_train)
+    result = results['logisticregression']
+    assert result['best_params'] == reference.best_params_
+    assert result['best_score'] == pytest.approx(reference.best_score_)
+    assert 0 <= result['test_accuracy'] <= 1
+
+    saved = joblib.load(tmp_path / "logisticregression_best_pipeline.joblib")
+    assert saved.named_steps['classifier'].C == reference.best_params_['classifier__C']
+    assert any("Timeline" in line for line in lines)
+
+
+def test_timeline_records_every_family(split):
+    X_train, _, y_train, _ = split
+    orchestrator = TrainingOrchestrator(build_pipelines(list(GRIDS)), GRIDS, n_jobs=1, cv=3, log=None)
+    results = orchestrator.run(X_train, y_train)
+    assert set(results) == set(GRIDS)
+    # RandomForest dipaksa 1 thread: budget core diatur orkestrator
+    assert results['randomforestclassifier']['model'].named_steps['classifier'].n_jobs == 1
+    for family in GRIDS:
+        events = [e['event'] for e in orchestrator.timeline if e['family'] == family]
+        assert events == ['start', 'cv_done', 'refit_done']
+
+
+def test_plan_candidates_rejects_halving():
+    assert len(plan_candidates(GRIDS['logisticregression'], "random", n_iter=10)) == 3
+    with pytest.raises(ValueError):
+        plan_candidates(GRIDS['logisticregression'], "halving-grid")
+
+
+def test_boosting_rounds_chosen_from_single_fit(split):
+    X_train, _, y_train, _ = split
+    grid = {'gradientboostingclassifier': {'classifier__n_estimators': [20, 40], 'classifier__max_depth': [2, 3]}}
+    orchestrator = TrainingOrchestrator(build_pipelines(list(grid)), grid, n_jobs=1, cv=3, log=None, round_step=10)
+    result = orchestrator.run(X_train, y_train)['gradientboostingclassifier']
+    # n_estimators bukan lagi dimensi grid: 2 kandidat (max_depth), bukan 4
+    assert result['n_candidates'] == 2
+    assert result['best_params']['classifier__n_estimators'] in (10, 20, 30, 40)
+    assert result['model'].named_steps['classifier'].n_estimators == result['best_params']['classifier__n_estimators']
+
+
+def test_winsorize_cleaner_is_fit_per_fold(split, tmp_path):
+    from src.train import main
+    X_train, X_test, y_train, y_test = split
+    grid = GRIDS['logisticregression']
+    results = TrainingOrchestrator(build_pipelines(['logisticregression'], winsorize=True),
+                                   {'logisticregression': grid}, n_jobs=1, cv=3, log=None).run(X_train, y_train)
+    # GridSearchCV mem-fit seluruh pipeline (termasuk cleaner) per fold
+    reference = GridSearchCV(build_pipelines(['logisticregression'], winsorize=True)['logisticregression'],
+                             grid, cv=3).fit(X_train, y_train)
+    assert results['logisticregression']['best_score'] == pytest.approx(reference.best_score_)
+
+    main(["--data", DATA_PATH, "--output-dir", str(tmp_path), "--families", "logisticregression",
+          "--grid", "quick", "--cv", "3", "--no-store", "--winsorize"])
+    path = str(tmp_path / "logisticregression_best_pipeline.joblib")
+    assert joblib.load(path).steps[0][0] == "cleaner"
+    assert os.listdir(tmp_path) == ["logisticregression_best_pipeline.joblib"]
+
+
+def test_failed_candidates_score_nan_without_aborting_other_families(split, tmp_path):
+    from sklearn.exceptions import FitFailedWarning # type: ignore
+    X_train, X_test, y_train, y_test = split
+    grids = {
+        'logisticregression': {'classifier__C': [1], 'classifier__l1_ratio': [0, 2.0]},
+        'randomforestclassifier': {'classifier__n_estimators': [10], 'classifier__max_depth': [-1]},
+    }
+    orchestrator = TrainingOrchestrator(build_pipelines(list(grids)), grids, n_jobs=1, cv=3,
+                                        output_dir=str(tmp_path), log=None)
+    with pytest.warns(FitFailedWarning):
+        results = orchestrator.run(X_train, y_train, X_test, y_test)
+
+    reference = GridSearchCV(build_pipelines(['logisticregression'])['logisticregression'],
+                             grids['logisticregression'], cv=3).fit(X_train, y_train)
+    assert results['logisticregression']['best_params'] == reference.best_params_
+    assert os.path.exists(tmp_path / "logisticregression_best_pipeline.joblib")
+    assert "error" in results['randomforestclassifier']
+    assert not os.path.exists(tmp_path / "randomforestclassifier_best_pipeline.joblib")
+
+
+def test_fold_features_follow_each_family_preprocessor(split):
+    X_train, _, y_train, _ = split
+    grid = GRIDS['logisticregression']
+    pipelines = {'plain': build_pipelines(['logisticregression'])['logisticregression'],
+                 'cleaned': build_pipelines(['logisticregression'], winsorize=True)['logisticregression']}
+    results = TrainingOrchestrator(pipelines, {family: grid for family in pipelines},
+                                   n_jobs=1, cv=3, log=None).run(X_train, y_train)
+    for family, pipeline in pipelines.items():
+        reference = GridSearchCV(pipeline, grid, cv=3).fit(X_train, y_train)
+        assert results[family]['best_score'] == pytest.approx(reference.best_score_)
@@ -0,0 +1,65 @@
+import sys, os, time
+import numpy as np # type: ignore
+import joblib # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.prediction_cache import PredictionCache, canonical_key
+from src.inference import predict_records, predict_records_cached, FEATURE_NAMES, SMOKE_RECORD
+
+MODEL_PATH = "../models/python-models/logisticregression_best_pipeline.joblib"
+
+def test_canonical_key_ignores_int_float_difference():
+    assert canonical_key({"age": 55, "oldpeak": 1.0}, ["age", "oldpeak"]) == \
+        canonical_key({"age": 55.0, "oldpeak": 1}, ["age", "oldpeak"])
+
+def test_cached_predictions_match_model():
+    model = joblib.load(MODEL_PATH)
+    cache = PredictionCache(100)
+    version = ("logisticregression", 1.0)
+    records = [SMOKE_RECORD, dict(SMOKE_RECORD, age=70), SMOKE_RECORD]
+    expected_labels, expected = predict_records(model, records, FEATURE_NAMES)
+
+    labels, proba = predict_records_cached(model, records, FEATURE_NAMES, cache, version)
+    np.testing.assert_allclose(proba, expected)
+    assert (labels == expected_labels).all()
+    # Record ketiga sudah dihitung di batch yang sama, tapi belum ada di cache saat lookup
+    assert cache.stats()["misses"] == 3
+
+    predict_records_cached(model, records, FEATURE_NAMES, cache, version)
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["size"] == 2
+
+def test_new_model_version_is_keyed_without_flushing():
+    cache = PredictionCache(100)
+    cache.put(("lr", 1.0), (1,), np.array([0.2, 0.8]))
+    cache.put(("svc", 1.0), (1,), np.array([0.3, 0.7]))
+    assert cache.get(("lr", 2.0), (1,)) is None
+    cache.put(("lr", 2.0), (1,), np.array([0.4, 0.6]))
+    # Request yang masih dilayani model lama tetap hit, entri model lain utuh
+    assert cache.get(("lr", 1.0), (1,))[0] == 0.2
+    assert cache.get(("lr", 2.0), (1,))[0] == 0.4
+    assert cache.get(("svc", 1.0), (1,)) is not None
+    # Put dari versi lama setelah versi baru terlihat diabaikan
+    cache.put(("lr", 1.0), (2,), np.array([0.5, 0.5]))
+    assert cache.get(("lr", 1.0), (2,)) is None
+    assert cache.stats()["stale_puts"] == 1
+
+def test_cached_rows_do_not_pin_the_batch():
+    model = joblib.load(MODEL_PATH)
+    cache = PredictionCache(100)
+    records = [SMOKE_RECORD, dict(SMOKE_RECORD, age=70)]
+    predict_records_cached(model, records, FEATURE_NAMES, cache, ("lr", 1.0))
+    cached = cache.get(("lr", 1.0), canonical_key(SMOKE_RECORD, FEATURE_NAMES))
+    assert cached.base is None and cached.shape == (2,)
+
+def test_lru_and_ttl():
+    cache = PredictionCache(2, ttl_s=0.05)
+    for i in range(3):
+        cache.put("lr", (i,), i)
+    assert cache.get("lr", (0,)) is None
+    assert cache.stats()["evictions"] == 1
+    time.sleep(0.06)
+    assert cache.get("lr", (2,)) is None
+    assert cache.stats()["expired"] == 1
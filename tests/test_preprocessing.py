@@ -22,4 +22,111 @@ def test_preprocess_features_shape():
     })
     df_proc = preprocess_features(df)
     assert df_proc.shape[0] == 3, "Jumlah baris berubah"
-    assert df_proc.shape[1] > 1, "Tidak ada fitur hasil encoding"
\ No newline at end of file
+    assert df_proc.shape[1] > 1, "Tidak ada fitur hasil encoding"
+
+def _reference_frame():
+    import numpy as np # type: ignore
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "a": rng.normal(size=500),
+        "b": rng.exponential(size=500),
+        "c": rng.integers(0, 100, size=500),
+        "cat": rng.choice(["x", "y", "z"], size=500).astype(object),
+    })
+    df.loc[::7, "a"] = None
+    df.loc[::11, "cat"] = None
+    return df
+
+
+def test_handle_missing_values_matches_per_column_fill():
+    df = _reference_frame()
+    expected = df.copy()
+    for col in ["a", "b", "c"]:
+        expected[col] = expected[col].fillna(expected[col].mean())
+    expected["cat"] = expected["cat"].fillna(expected["cat"].mode()[0])
+    for n_jobs, chunksize in ((1, None), (2, None), (3, 17)):
+        result = handle_missing_values(df.copy(), n_jobs=n_jobs, chunksize=chunksize)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_winsorize_data_matches_scipy():
+    from scipy.stats.mstats import winsorize # type: ignore
+    import numpy as np # type: ignore
+    df = handle_missing_values(_reference_frame())
+    df.loc[3, "b"] = float("nan")  # kolom dengan NaN tetap lewat jalur scipy
+    expected = df.copy()
+    for col in ["a", "b", "c"]:
+        expected[col] = np.asarray(winsorize(expected[col], limits=(0.05, 0.05)))
+    for n_jobs in (1, 2):
+        result = winsorize_data(df.copy(), n_jobs=n_jobs, chunksize=64)
+        for col in ["a", "b", "c"]:
+            np.testing.assert_array_equal(np.asarray(result[col]), expected[col].to_numpy())
+        assert result["c"].dtype == df["c"].dtype
+
+
+def test_fitted_preprocessor_reuses_training_statistics(tmp_path):
+    import joblib # type: ignore
+    from src.utils import FeaturePreprocessor, build_cleaner, preprocess_entire_datasheet
+    train = handle_missing_values(_reference_frame())
+    train.loc[::7, "a"] = None
+    serving = pd.DataFrame({"a": [None, 1e6], "b": [-5.0, 0.5], "c": [50, 10_000], "cat": [None, "new"]})
+
+    cleaner = build_cleaner().fit(train)
+    cleaned = cleaner.transform(serving)
+    assert cleaned.loc[0, "a"] == train["a"].mean()
+    assert cleaned.loc[0, "cat"] == train["cat"].mode()[0]
+    assert cleaned.loc[1, "a"] == cleaner["winsorizer"].upper_["a"]
+    assert cleaned["c"].dtype == serving["c"].dtype and cleaned.loc[1, "c"] <= train["c"].max()
+
+    expected, _ = preprocess_entire_datasheet(train.assign(num=0), target_col="num")
+    preprocessor = FeaturePreprocessor().fit(train)
+    path = tmp_path / "feature_preprocessor.joblib"
+    joblib.dump(preprocessor, path)
+    restored = joblib.load(path)
+    pd.testing.assert_frame_equal(restored.transform(train), expected)
+    assert restored.transform(serving).shape == (2, expected.shape[1])
+
+
+def test_streaming_cleaning_matches_in_memory_and_chunking(tmp_path):
+    from src.preprocessing import run_streaming
+    raw = "../data/raw/heart_disease_uci.csv"
+    small, large = tmp_path / "small", tmp_path / "large"
+    counts = run_streaming(raw, str(small), chunksize=97)
+    run_streaming(raw, str(large), chunksize=10_000)
+
+    with open("../data/processed/heart_disease_uci_cleaned.csv") as f:
+        expected = f.read()
+    with open(small / "heart_disease_uci_cleaned.csv") as f:
+        assert f.read() == expected
+    for name in ["X_train", "X_test", "y_train", "y_test"]:
+        with open(small / f"{name}.csv") as a, open(large / f"{name}.csv") as b:
+            assert a.read() == b.read(), f"{name} bergantung pada ukuran chunk"
+    assert counts["train"] + counts["test"] == counts["rows_out"] == 299
+    assert 0.1 < counts["test"] / counts["rows_out"] < 0.3
+
+
+def test_streaming_writes_one_header_when_leading_chunks_are_empty(tmp_path):
+    from src.preprocessing import run_streaming
+    # Urutan terbalik: chunk awal kosong setelah dropna
+    source = tmp_path / "reversed.csv"
+    raw = pd.read_csv("../data/raw/heart_disease_uci.csv", dtype=str)
+    raw.iloc[::-1].to_csv(source, index=False)
+    run_streaming(str(source), str(tmp_path / "out"), chunksize=50, cache_format=None)
+    for name in ["heart_disease_uci_cleaned", "X_train", "X_test", "y_train", "y_test"]:
+        with open(tmp_path / "out" / f"{name}.csv") as f:
+            lines = f.read().splitlines()
+        assert lines.count(lines[0]) == 1, f"header {name} ditulis lebih dari sekali"
+    assert len(pd.read_csv(tmp_path / "out" / "heart_disease_uci_cleaned.csv")) == 299
+
+
+def test_stream_split_is_stratified_per_class():
+    from src.preprocessing import StratifiedStreamSplit
+    import numpy as np # type: ignore
+    labels = np.random.default_rng(0).choice([0, 1], size=1000, p=[0.8, 0.2])
+    whole = StratifiedStreamSplit(0.2)(labels)
+    split = StratifiedStreamSplit(0.2)
+    chunked = np.concatenate([split(labels[start:start + 37]) for start in range(0, len(labels), 37)])
+    assert (whole == chunked).all()
+    for label in (0, 1):
+        n = (labels == label).sum()
+        assert abs(whole[labels == label].sum() - 0.2 * n) < 1
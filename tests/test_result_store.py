@@ -0,0 +1,99 @@
+import os
+import sys
+import pytest # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model_training import load_training_data, build_pipelines
+from src.orchestrator import TrainingOrchestrator
+from src.result_store import ResultStore, dataset_hash, params_key
+
+DATA_PATH = "../data/processed/heart_disease_uci_cleaned.csv"
+GRIDS = {'logisticregression': {'classifier__C': [0.1, 1, 10], 'classifier__class_weight': [None, 'balanced']}}
+
+
+@pytest.fixture(scope="module")
+def split():
+    return load_training_data(DATA_PATH)
+
+
+def run(store, split, log):
+    X_train, _, y_train, _ = split
+    orchestrator = TrainingOrchestrator(build_pipelines(list(GRIDS)), GRIDS, n_jobs=1, cv=3,
+                                        log=log.append, store=store)
+    return orchestrator.run(X_train, y_train)['logisticregression']
+
+
+def test_repeated_search_skips_stored_fits(split, tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    first_log, second_log = [], []
+    first = run(store, split, first_log)
+    second = run(ResultStore(store.path), split, second_log)
+
+    assert any(line.endswith("0 task untuk 1 family, budget 1 core, 18 fit diambil dari store")
+               for line in second_log)
+    assert second['best_params'] == first['best_params']
+    assert second['best_score'] == pytest.approx(first['best_score'])
+
+
+def test_interrupted_search_resumes(split, tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    reference = run(None, split, [])
+
+    # Simulasi crash: hanya sebagian fold yang sempat tersimpan
+    run(store, split, [])
+    with store._conn:
+        store._conn.execute("DELETE FROM fold_results WHERE fold = 2")
+    log = []
+    resumed = run(store, split, log)
+    assert any(line.endswith("6 task untuk 1 family, budget 1 core, 12 fit diambil dari store") for line in log)
+    assert resumed['best_params'] == reference['best_params']
+
+
+def test_summary_and_shrink_grid(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    pipeline = store.register_pipeline("svc", "{}")
+    for fold in range(2):
+        store.record("data", pipeline, "svc", {"classifier__C": 1, "classifier__kernel": "rbf"}, fold, 0.9, 0.1)
+        store.record("data", pipeline, "svc", {"classifier__C": 10, "classifier__kernel": "rbf"}, fold, 0.7, 0.1)
+        store.record("data", pipeline, "svc", {"classifier__C": 0.1, "classifier__kernel": "linear"}, fold, 0.8, 0.1)
+
+    summary = store.summary("svc")
+    assert list(summary["mean_score"]) == pytest.approx([0.9, 0.8, 0.7])
+    assert set(summary["folds"]) == {2}
+
+    grid = {'classifier__C': [0.1, 1, 10], 'classifier__kernel': ['linear', 'rbf'], 'classifier__gamma': ['scale', 'auto']}
+    assert store.shrink_grid("svc", grid, top=2) == {
+        'classifier__C': [0.1, 1], 'classifier__kernel': ['linear', 'rbf'], 'classifier__gamma': ['scale', 'auto']
+    }
+    assert params_key({"b": 1, "a": None}) == '{"a": null, "b": 1}'
+
+
+def test_shrink_grid_ranks_only_matching_complete_runs(split, tmp_path):
+    X_train, _, y_train, _ = split
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    run(store, split, [])
+    orchestrator = TrainingOrchestrator(build_pipelines(list(GRIDS)), GRIDS, n_jobs=1, cv=3, log=None, store=store)
+    definition = orchestrator._definition('logisticregression')
+    data_key = dataset_hash(X_train, y_train)
+    pipeline = store.pipeline_hashes(definition, 'logisticregression')[0]
+    other = store.register_pipeline('logisticregression', '{"params": {}, "context": {}}')
+    best_C = {'classifier__C': 1000, 'classifier__class_weight': None}
+    # Skor sempurna dari data lain, pipeline lain dan kandidat yang baru 1 dari 3 fold
+    store.record("data-lain", pipeline, 'logisticregression', best_C, 0, 1.0, 0.1)
+    store.record(data_key, other, 'logisticregression', best_C, 0, 1.0, 0.1)
+    store.record(data_key, pipeline, 'logisticregression', best_C, 0, 1.0, 0.1)
+
+    ranked = store.summary('logisticregression', data_key, definition, folds=3)
+    assert len(ranked) == 6 and set(ranked["folds"]) == {3}
+    assert ranked["mean_score"].max() < 1.0
+    grid = dict(GRIDS['logisticregression'], classifier__C=[0.1, 1, 10, 1000])
+    orchestrator.param_grids = {'logisticregression': grid}
+    shrunk = orchestrator.shrink_grids(X_train, y_train, top=1)['logisticregression']
+    assert 1000 not in shrunk['classifier__C'] and len(shrunk['classifier__C']) == 1
+
+
+def test_dataset_hash_ignores_index(split):
+    X_train, _, y_train, _ = split
+    assert dataset_hash(X_train, y_train) == dataset_hash(X_train.reset_index(drop=True), y_train.values)
+    assert dataset_hash(X_train, y_train) != dataset_hash(X_train.iloc[1:], y_train.iloc[1:])
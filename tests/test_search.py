@@ -0,0 +1,119 @@
+import os
+import sys
+import pytest # type: ignore
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sklearn.pipeline import Pipeline # type: ignore
+from sklearn.preprocessing import StandardScaler # type: ignore
+from sklearn.linear_model import LogisticRegression # type: ignore
+from sklearn.ensemble import RandomForestClassifier # type: ignore
+
+from src.search import make_search, count_candidates, grid_size
+from src.model_training import tune_models
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(120, 4)), columns=["a", "b", "c", "d"])
+    y = (X["a"] + X["b"] > 0).astype(int)
+    return X, y
+
+
+def lr_pipeline():
+    return Pipeline([('scaler', StandardScaler()), ('classifier', LogisticRegression())])
+
+
+LR_GRID = {'classifier__C': [0.01, 0.1, 1, 10], 'classifier__class_weight': [None, 'balanced']}
+
+
+def test_random_search_respects_budget(data):
+    X, y = data
+    search = make_search(lr_pipeline(), LR_GRID, strategy="random", cv=3, n_iter=3, n_jobs=1, verbose=0)
+    search.fit(X, y)
+    assert count_candidates(search) == 3
+
+    # Budget lebih besar dari grid dibatasi ke ukuran grid
+    search = make_search(lr_pipeline(), LR_GRID, strategy="random", n_iter=100)
+    assert search.n_iter == grid_size(LR_GRID) == 8
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValueError):
+        make_search(lr_pipeline(), LR_GRID, strategy="bayes")
+
+
+def test_halving_with_n_estimators_resource(data):
+    X, y = data
+    pipeline = Pipeline([('classifier', RandomForestClassifier(random_state=0))])
+    grid = {'classifier__n_estimators': [10, 30], 'classifier__max_depth': [2, 4, None]}
+    search = make_search(pipeline, grid, strategy="halving-grid", cv=3,
+                         resource="classifier__n_estimators", n_jobs=1, verbose=0)
+    search.fit(X, y)
+    assert search.min_resources_ == 10 and search.max_resources_ == 30
+    assert 'classifier__n_estimators' in search.best_params_
+    assert 'classifier__max_depth' in search.best_params_
+
+
+@pytest.mark.parametrize("strategy", ["grid", "halving-grid", "halving-random"])
+def test_tune_models_reports_time(data, strategy):
+    X, y = data
+    reports = {}
+    best = tune_models({'lr': lr_pipeline()}, {'lr': LR_GRID}, X, y, cv=3,
+                       search=strategy, reports=reports)
+    assert best['lr'].predict(X).shape == (len(X),)
+    report = reports['lr']
+    assert report['search'] == strategy
+    assert report['seconds'] > 0
+    assert report['n_candidates'] >= grid_size(LR_GRID)
+    assert 0.5 <= report['best_score'] <= 1.0
+
+
+def test_fold_cached_search_matches_grid_search(data):
+    from sklearn.model_selection import GridSearchCV # type: ignore
+    from src.search import FoldCachedSearchCV
+
+    X, y = data
+    reference = GridSearchCV(lr_pipeline(), LR_GRID, cv=3).fit(X, y)
+    cached = FoldCachedSearchCV(lr_pipeline(), LR_GRID, cv=3, n_jobs=1).fit(X, y)
+    assert cached.best_params_ == reference.best_params_
+    assert cached.best_score_ == pytest.approx(reference.best_score_)
+    np.testing.assert_allclose(cached.cv_results_["mean_test_score"], reference.cv_results_["mean_test_score"])
+    np.testing.assert_array_equal(cached.predict(X), reference.predict(X))
+
+
+def test_cache_folds_only_for_classifier_grids():
+    from src.search import FoldCachedSearchCV
+
+    search = make_search(lr_pipeline(), LR_GRID, strategy="random", n_iter=3, cache_folds=True)
+    assert isinstance(search, FoldCachedSearchCV) and search.n_iter == 3
+    # Parameter preprocessor ikut di-tuning -> search sklearn biasa
+    grid = dict(LR_GRID, scaler__with_mean=[True, False])
+    assert not isinstance(make_search(lr_pipeline(), grid, cache_folds=True), FoldCachedSearchCV)
+    assert not isinstance(make_search(lr_pipeline(), LR_GRID, strategy="halving-grid", cache_folds=True),
+                          FoldCachedSearchCV)
+
+
+def test_fold_cached_search_scores_failed_fits_like_grid_search(data):
+    from sklearn.exceptions import FitFailedWarning # type: ignore
+    from sklearn.model_selection import GridSearchCV # type: ignore
+    from src.search import FoldCachedSearchCV
+
+    X, y = data
+    # penalty='l1' tidak didukung solver lbfgs -> fit gagal untuk kandidat tsb.
+    grid = {'classifier__C': [0.1, 1], 'classifier__penalty': ['l2', 'l1']}
+    with pytest.warns(FitFailedWarning):
+        reference = GridSearchCV(lr_pipeline(), grid, cv=3).fit(X, y)
+    with pytest.warns(FitFailedWarning):
+        cached = FoldCachedSearchCV(lr_pipeline(), grid, cv=3, n_jobs=1).fit(X, y)
+    np.testing.assert_array_equal(np.isnan(cached.cv_results_["mean_test_score"]),
+                                  np.isnan(reference.cv_results_["mean_test_score"]))
+    np.testing.assert_array_equal(cached.cv_results_["rank_test_score"], reference.cv_results_["rank_test_score"])
+    assert cached.best_params_ == reference.best_params_
+    assert (cached.cv_results_["mean_fit_time"] > 0).all() and "std_fit_time" in cached.cv_results_
+
+    with pytest.raises(ValueError):
+        FoldCachedSearchCV(lr_pipeline(), grid, cv=3, n_jobs=1, error_score="raise").fit(X, y)
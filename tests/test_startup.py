@@ -0,0 +1,26 @@
+import sys, os, json, subprocess
+import pytest # type: ignore
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ("sklearn", "scipy", "pandas", "xgboost", "joblib")
+
+def _modules_after(code, env=None):
+    # Subprocess baru: sys.modules proses pytest sudah berisi sklearn dkk.
+    script = f"import sys, json\n{code}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=ROOT_DIR,
+                          env={**os.environ, "PYTHONWARNINGS": "ignore", **(env or {})})
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("module", ["app.app", "src.api_doc"])
+def test_entry_point_import_skips_heavy_modules(module):
+    pytest.importorskip("fastapi" if module == "src.api_doc" else "flask")
+    assert _modules_after(f"import {module}") == []
+
+def test_onnx_mode_first_prediction_skips_sklearn():
+    pytest.importorskip("onnxruntime")
+    code = ("import src.api_doc as api\n"
+            "from src.inference import SMOKE_RECORD\n"
+            "labels, proba = api.predict_rows([SMOKE_RECORD], None)\n"
+            "assert type(api.registry.get()).__name__ == 'OnnxPipeline'")
+    assert _modules_after(code, env={"INFERENCE_MODE": "onnx"}) == []